@@ -0,0 +1,313 @@
+"""
+Matrix Engine Benchmarks
+Usage: python -m test_gen.benchmark --schema output/schema_input.json --copies 200
+       python -m test_gen.benchmark --suite --tiers small,medium --baseline test_gen/benchmark_baseline.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import typing
+from typing import Any, Dict, List
+
+try:
+    from .schema_models import SmartSchema, FieldType
+    from .schema_loader import load_schema
+    from .matrix_engine import MatrixEngine
+except ImportError:
+    from schema_models import SmartSchema, FieldType
+    from schema_loader import load_schema
+    from matrix_engine import MatrixEngine
+
+# Every FieldType.type, so synthetic schemas reach every type expander
+FIELD_TYPES = typing.get_args(FieldType.model_fields["type"].annotation)
+
+# name: (sections, fields per section, business rules, visual rules)
+SIZE_TIERS = {
+    "small": (4, 6, 8, 2),
+    "medium": (20, 12, 40, 10),
+    "large": (80, 23, 160, 40),
+}
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Section name suffixes that trigger the section-level expanders (filters, E2E create / list flows)
+_SECTION_KINDS = ["Create Form", "List", "Filter", "Detail"]
+# (description, condition, expected result) - hit roles, negative, group, permission and status features
+_RULE_TEMPLATES = [
+    ("Manager can approve request {i}", "User submits request {i}", "Status changes to Approved"),
+    ("User cannot edit locked record {i}", "Record {i} is locked", "Error message displayed"),
+    ("Any approver in the group can approve level {i}", "Group member approves level {i}", "Request moves to the next level"),
+    ("Admin permission required to delete item {i}", "Non-admin deletes item {i}", "Action blocked"),
+    ("Creator can reject request {i} with a reason", "Approver rejects request {i}", "Status changes to Rejected"),
+]
+# English titles for the translator benchmark (scenario part, as the expanders write them)
+_TITLE_SCENARIOS = ["Empty (Required)", "Min Length (-1)", "Max Length (+1)", "XSS Injection (<script>)",
+                    "Sort by Name (A-Z)", "Pagination Next/Prev", "Invalid Option (Param Tampering)", "Tooltip/Help Text"]
+
+
+def replicate_schema(schema: SmartSchema, copies: int) -> SmartSchema:
+    """ Scales a real schema up by cloning its sections/rules with unique names (no dedupe collapse). """
+    data = schema.model_dump()
+    sections, rules, visuals = [], [], []
+    for i in range(copies):
+        for sec in data["sections"]:
+            fields = [dict(f, name=f"{f['name']} #{i}") for f in sec["fields"]]
+            sections.append(dict(sec, name=f"{sec['name']} #{i}", fields=fields))
+        rules.extend(dict(r, condition=f"{r['condition']} #{i}") for r in data["business_rules"])
+        visuals.extend(dict(v, element_name=f"{v['element_name']} #{i}") for v in data["visual_rules"])
+    data.update(sections=sections, business_rules=rules, visual_rules=visuals)
+    return SmartSchema(**data)
+
+
+def _field_constraints(field_type: str) -> Dict[str, Any]:
+    if field_type in ("text", "password", "textarea", "email"):
+        return {"min_length": 3, "max_length": 50}
+    if field_type == "number":
+        return {"min_value": 0, "max_value": 1000}
+    if field_type in ("select", "radio", "checkbox"):
+        return {"options": ["Option A", "Option B", "Option C"]}
+    if field_type in ("file", "file_upload"):
+        return {"allowed_extensions": ["pdf", "docx", "jpg"], "max_size_mb": 10}
+    if field_type == "table":
+        return {"extra_props": {"columns": ["Name", "Status", "Owner"], "row_actions": ["View", "Edit", "Delete"]}}
+    return {}
+
+
+def synthetic_schema(sections: int, fields: int, rules: int, visuals: int) -> SmartSchema:
+    """
+    [NEW v3.1] Parametric SmartSchema: sections x fields cycling through every FieldType.type
+    (with the constraints their expanders read), rules built from keyword templates and
+    visual rules. Deterministic: the same sizes always give the same schema.
+    """
+    data = {"feature_name": f"Synthetic {sections}x{fields}", "sections": [], "business_rules": [], "visual_rules": []}
+    for s in range(sections):
+        section_fields = []
+        for f in range(fields):
+            field_type = FIELD_TYPES[(s * fields + f) % len(FIELD_TYPES)]
+            section_fields.append(dict(_field_constraints(field_type), name=f"{field_type.replace('_', ' ').title()} {s + 1}-{f + 1}",
+                                       type=field_type, required=f % 3 != 2, description=f"Help text {f + 1}" if f % 4 == 0 else None))
+        data["sections"].append({"name": f"Section {s + 1} {_SECTION_KINDS[s % len(_SECTION_KINDS)]}", "fields": section_fields})
+    for r in range(rules):
+        description, condition, expected = (t.format(i=r + 1) for t in _RULE_TEMPLATES[r % len(_RULE_TEMPLATES)])
+        data["business_rules"].append({"id": f"BR-{r + 1:03d}", "description": description, "condition": condition,
+                                       "expected_result": expected, "priority": ("P0", "P1", "P2")[r % 3]})
+    for v in range(visuals):
+        data["visual_rules"].append({"element_name": f"Widget {v + 1}", "description": f"Widget {v + 1} is aligned to the grid"})
+    return SmartSchema(**data)
+
+
+def _traced(build):
+    """ Runs build() under tracemalloc. Returns (result, retained bytes, seconds). """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def benchmark_case_memory(schema: SmartSchema) -> Dict[str, Any]:
+    """
+    Retained memory of the same suite held as compact TestCaseRecords (generate_records)
+    versus the list of dicts returned by generate_all.
+    """
+    # Warm-up: compiles the translator and fills its memo cache so both runs pay the same
+    MatrixEngine(schema).generate_records()
+
+    records, record_bytes, record_seconds = _traced(lambda: MatrixEngine(schema).generate_records())
+    count = len(records)
+    del records
+    dicts, dict_bytes, dict_seconds = _traced(lambda: MatrixEngine(schema).generate_all())
+    del dicts
+
+    return {
+        "test_cases": count,
+        "records": {"bytes": record_bytes, "bytes_per_case": round(record_bytes / max(count, 1), 1), "seconds": round(record_seconds, 3)},
+        "dicts": {"bytes": dict_bytes, "bytes_per_case": round(dict_bytes / max(count, 1), 1), "seconds": round(dict_seconds, 3)},
+        "reduction": round(dict_bytes / max(record_bytes, 1), 2)
+    }
+
+
+def _best_time(run, repeat: int) -> float:
+    """ Best of N runs with the cyclic GC paused, like timeit. """
+    best = None
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            gc.collect()
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def _peak_bytes(run) -> int:
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark_tier(schema: SmartSchema, repeat: int = 3) -> Dict[str, Any]:
+    """
+    [NEW v3.1] generate_all (best-of-N time, tracemalloc peak), deduplicate_test_cases over
+    the raw expansion fed twice (every case has a duplicate) and _translate_title_to_vietnamese
+    cold (empty memo cache) and warm.
+    """
+    fields = [f for section in schema.sections for f in section.fields]
+    engine = MatrixEngine(schema)
+    cases = len(engine.generate_all())  # Warm-up (translator compile, imports)
+
+    def generate():
+        # Cold title memo, as in a fresh `--step explode` process
+        engine.translator.clear_cache()
+        MatrixEngine(schema).generate_all()
+
+    generate_seconds = _best_time(generate, repeat)
+    generate_peak = _peak_bytes(generate)
+
+    raw = [tc.to_dict() for tc in engine._run_steps(list(engine._expansion_plan()))]
+    doubled = raw + raw
+    inputs = [[dict(tc) for tc in doubled] for _ in range(max(1, repeat))]
+    deduped = len(engine.deduplicate_test_cases([dict(tc) for tc in doubled]))
+    dedupe_seconds = _best_time(lambda: engine.deduplicate_test_cases(inputs.pop()), len(inputs))
+
+    titles = [f"Verify {f.name} - {scenario}" for f in fields for scenario in _TITLE_SCENARIOS]
+
+    def translate_all():
+        for title in titles:
+            engine._translate_title_to_vietnamese(title)
+
+    def translate_cold():
+        engine.translator.clear_cache()
+        translate_all()
+
+    cold_seconds = _best_time(translate_cold, repeat)
+    warm_seconds = _best_time(translate_all, repeat)
+
+    return {
+        "schema": {"sections": len(schema.sections), "fields": len(fields),
+                   "business_rules": len(schema.business_rules), "visual_rules": len(schema.visual_rules)},
+        "generate_all": {"cases": cases, "seconds": round(generate_seconds, 6), "peak_bytes": generate_peak},
+        "deduplicate": {"input": len(doubled), "output": deduped, "seconds": round(dedupe_seconds, 6)},
+        "translate": {"titles": len(titles), "cold_seconds": round(cold_seconds, 6), "warm_seconds": round(warm_seconds, 6),
+                      "cold_us_per_title": round(1e6 * cold_seconds / max(len(titles), 1), 2)}
+    }
+
+
+def run_suite(tiers: List[str], repeat: int = 3) -> Dict[str, Any]:
+    """ [NEW v3.1] benchmark_tier over synthetic schemas of the given SIZE_TIERS. """
+    results = {}
+    for name in tiers:
+        results[name] = benchmark_tier(synthetic_schema(*SIZE_TIERS[name]), repeat)
+    return {
+        "engine_version": MatrixEngine.ENGINE_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "tiers": results
+    }
+
+
+# Compared metrics: (section, key); lower is better for all of them
+BASELINE_METRICS = [("generate_all", "seconds"), ("generate_all", "peak_bytes"), ("deduplicate", "seconds"),
+                    ("translate", "cold_seconds"), ("translate", "warm_seconds")]
+# Timing differences below this are scheduler noise, never a regression
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    [NEW v3.1] One row per tier and metric present in both runs: ratio = current / baseline,
+    regression when ratio > 1 + tolerance (and, for timings, the slowdown exceeds
+    NOISE_FLOOR_SECONDS). A changed case count is reported as "output_changed".
+    """
+    rows = []
+    for tier, current in results.get("tiers", {}).items():
+        previous = baseline.get("tiers", {}).get(tier)
+        if not previous:
+            continue
+        for section, key in BASELINE_METRICS:
+            old, new = previous.get(section, {}).get(key), current.get(section, {}).get(key)
+            if not old or new is None:
+                continue
+            ratio = new / old
+            regression = ratio > 1 + tolerance and (key.endswith("bytes") or new - old > NOISE_FLOOR_SECONDS)
+            rows.append({"tier": tier, "metric": f"{section}.{key}", "baseline": old, "current": new,
+                         "ratio": round(ratio, 3), "regression": regression})
+        old_cases, new_cases = previous["generate_all"].get("cases"), current["generate_all"].get("cases")
+        if old_cases != new_cases:
+            rows.append({"tier": tier, "metric": "generate_all.cases", "baseline": old_cases, "current": new_cases,
+                         "ratio": round(new_cases / old_cases, 3) if old_cases else None, "regression": False, "output_changed": True})
+    return rows
+
+
+def _print_comparison(rows: List[Dict[str, Any]]):
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ("OUTPUT CHANGED" if row.get("output_changed") else "ok")
+        print(f"{row['tier']:>8} {row['metric']:<28} {row['baseline']:>14} -> {row['current']:<14} x{row['ratio']}  {flag}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matrix Engine Benchmarks")
+    parser.add_argument("--schema", default="output/schema_input.json", help="Schema to scale up")
+    parser.add_argument("--copies", type=int, default=100, help="How many times to clone the schema content")
+    parser.add_argument("--output", help="Optional JSON file for results")
+    parser.add_argument("--suite", action="store_true", help="Run the synthetic-schema suite (generate_all / dedupe / translate per size tier)")
+    parser.add_argument("--tiers", default="small,medium", help=f"Suite: comma-separated size tiers ({', '.join(SIZE_TIERS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Suite: timings are the best of N runs")
+    parser.add_argument("--baseline", default=None, help=f"Suite: compare against this results file (e.g. {os.path.relpath(DEFAULT_BASELINE)})")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Suite: allowed slowdown before a metric counts as a regression")
+    parser.add_argument("--save-baseline", default=None, help="Suite: also write the results as a new baseline file")
+    parser.add_argument("--strict", action="store_true", help="Suite: exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    if args.suite:
+        tiers = [t.strip() for t in args.tiers.split(",") if t.strip()]
+        unknown = [t for t in tiers if t not in SIZE_TIERS]
+        if unknown:
+            parser.error(f"unknown tier(s): {', '.join(unknown)}")
+        result = run_suite(tiers, args.repeat)
+        regressions = []
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                rows = compare_to_baseline(result, json.load(f), args.tolerance)
+            result["baseline_comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "rows": rows}
+            regressions = [row for row in rows if row["regression"]]
+            _print_comparison(rows)
+        if args.save_baseline:
+            with open(args.save_baseline, 'w', encoding='utf-8') as f:
+                json.dump({k: v for k, v in result.items() if k != "baseline_comparison"}, f, indent=2)
+        text = json.dumps(result, indent=2)
+        print(text)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        if regressions and args.strict:
+            sys.exit(1)
+        return
+
+    schema = replicate_schema(load_schema(args.schema), args.copies)
+
+    result = {"case_memory": benchmark_case_memory(schema)}
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Case Budget
+Caps an explosion at --max-cases and/or per-category budgets in one streaming pass.
+Every P0 is kept; the remaining room is filled by priority-weighted reservoir
+sampling (Efraimidis-Spirakis A-Res: key = u ** (1 / weight), keep the largest keys),
+so memory is bounded by the budget, never by the size of the explosion.
+With both kinds of budget, the kept sample is the largest keys that fit both.
+Cases kept regardless of sampling (P0s, categories without a budget) are spilled
+to a temporary file in generation order and merged back with the sampled ones.
+"""
+import heapq
+import pickle
+import random
+import tempfile
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+# Sampling weight per priority (P0 is never sampled: always kept)
+PRIORITY_WEIGHTS = {"P1": 4.0, "P2": 2.0, "P3": 1.0}
+MUST_KEEP = "P0"
+
+
+def parse_category_budget(spec: str) -> Dict[str, int]:
+    """ "Security=50,UI=20" -> {"Security": 50, "UI": 20} """
+    budget = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        if "=" not in item:
+            raise ValueError(f"Invalid category budget '{item}' (expected Category=N)")
+        name, limit = item.rsplit("=", 1)
+        budget[name.strip()] = int(limit)
+    return budget
+
+
+def _read_spill(spill: BinaryIO) -> Iterator[tuple]:
+    """ (seq, case) pairs pickled to spill, in the order they were written. """
+    spill.seek(0)
+    while True:
+        try:
+            yield pickle.load(spill)
+        except EOFError:
+            return
+
+
+class _Reservoir:
+    """
+    Largest-key reservoir whose capacity shrinks as must-keep cases use up the budget.
+    slack keeps that many extra runners-up: an entry evicted by a nested (category)
+    budget leaves a hole that the best runner-up fills, so the budget stays full.
+    """
+
+    def __init__(self, limit: int, slack: int = 0):
+        self.limit = limit
+        self.slack = slack
+        self.reserved = 0
+        self.heap: List[list] = []  # [key, seq, entry]
+        self.alive = 0
+
+    def _trim(self):
+        while self.alive > max(0, self.limit - self.reserved) + self.slack:
+            _, _, entry = heapq.heappop(self.heap)
+            if entry[2]:
+                # Evicted here -> leaves every reservoir that holds it (others keep a tombstone)
+                entry[1], entry[2] = None, False
+                for reservoir in entry[3]:
+                    reservoir.alive -= 1
+                    reservoir._compact()
+
+    def _compact(self):
+        """ Rebuilds the heap once tombstones outnumber live entries. """
+        if len(self.heap) > 2 * self.alive + 64:
+            self.heap = [item for item in self.heap if item[2][2]]
+            heapq.heapify(self.heap)
+
+    def reserve(self):
+        self.reserved += 1
+        self._trim()
+
+    def offer(self, key: float, entry: list):
+        heapq.heappush(self.heap, [key, entry[0], entry])
+        entry[3].append(self)
+        self.alive += 1
+        self._trim()
+
+    def survivors(self) -> List[tuple]:
+        """ (seq, case) of the live entries within the budget (largest keys, runners-up excluded). """
+        live = [item for item in self.heap if item[2][2]]
+        return [(seq, entry[1]) for _, seq, entry in heapq.nlargest(max(0, self.limit - self.reserved), live)]
+
+
+class CaseBudget:
+    """
+    [NEW v3.1] Streaming budget over deduplicated test cases (records or dicts).
+    apply() yields the kept cases in their original order with sequential IDs;
+    report() summarises what was seen, kept and dropped per category and priority.
+    Only the reservoirs live in memory: cases that are kept whatever happens are
+    spilled to disk (cases are picklable) until the input ends.
+    """
+
+    def __init__(self, max_cases: Optional[int] = None, per_category: Optional[Dict[str, int]] = None,
+                 weights: Optional[Dict[str, float]] = None, seed: int = 0):
+        self.max_cases = max_cases
+        self.per_category = dict(per_category or {})
+        self.weights = dict(PRIORITY_WEIGHTS, **(weights or {}))
+        self.rng = random.Random(seed)
+        self.seen: Dict[str, Dict[str, int]] = {}
+        self.kept: Dict[str, Dict[str, int]] = {}
+        # Original ID -> final ID of every kept case (e.g. to remap other reports)
+        self.id_map: Dict[str, str] = {}
+
+    def _count(self, table: Dict[str, Dict[str, int]], tc):
+        row = table.setdefault(tc['category'], {})
+        row[tc['priority']] = row.get(tc['priority'], 0) + 1
+
+    def apply(self, test_cases: Iterable[Any]) -> Iterator[Any]:
+        # Category budgets are nested in the total: at most sum(limits) live entries can be
+        # evicted by a category, so that many runners-up keep the total reservoir full
+        total = _Reservoir(self.max_cases, slack=sum(self.per_category.values())) if self.max_cases is not None else None
+        categories = {name: _Reservoir(limit) for name, limit in self.per_category.items()}
+
+        with tempfile.TemporaryFile() as spill:
+            for seq, tc in enumerate(test_cases):
+                self._count(self.seen, tc)
+                # Category first: the total only ever ranks cases their category still keeps
+                scopes = [r for r in (categories.get(tc['category']), total) if r is not None]
+                if not scopes or tc['priority'] == MUST_KEEP:
+                    # Kept whatever happens: written out now instead of held until the input ends
+                    pickle.dump((seq, tc), spill, pickle.HIGHEST_PROTOCOL)
+                    for reservoir in scopes:
+                        reservoir.reserve()
+                else:
+                    # entry: [seq, case, alive, reservoirs it was admitted to]
+                    entry = [seq, tc, True, []]
+                    key = self.rng.random() ** (1.0 / self.weights.get(tc['priority'], 1.0))
+                    for reservoir in scopes:
+                        if entry[2]:
+                            reservoir.offer(key, entry)
+
+            sampled = {}
+            # Every sampled case competes in the total reservoir when there is one
+            for reservoir in [total] if total else categories.values():
+                sampled.update(reservoir.survivors())
+
+            yield from self._renumber(heapq.merge(_read_spill(spill), sorted(sampled.items()), key=lambda pair: pair[0]))
+
+    def _renumber(self, survivors: Iterable[tuple]) -> Iterator[Any]:
+        """ Sequential IDs over the (seq, case) survivors, in seq order. """
+        count = 0
+        for _, tc in survivors:
+            self._count(self.kept, tc)
+            count += 1
+            new_id = f"TC-{tc['category'][:4].upper()}-{count:03d}"
+            self.id_map[tc['id']] = new_id
+            tc['id'] = new_id
+            yield tc
+
+    def report(self) -> Dict[str, Any]:
+        rows = []
+        for category, seen in self.seen.items():
+            kept = self.kept.get(category, {})
+            for priority in sorted(seen):
+                rows.append({"category": category, "priority": priority, "seen": seen[priority],
+                             "kept": kept.get(priority, 0), "dropped": seen[priority] - kept.get(priority, 0)})
+        seen_total = sum(r["seen"] for r in rows)
+        kept_total = sum(r["kept"] for r in rows)
+        over = [name for name, limit in self.per_category.items()
+                if sum(self.kept.get(name, {}).values()) > limit]
+        if self.max_cases is not None and kept_total > self.max_cases:
+            over.append("<total>")
+        return {
+            "max_cases": self.max_cases,
+            "per_category": self.per_category,
+            "weights": self.weights,
+            "seen": seen_total,
+            "kept": kept_total,
+            "dropped": seen_total - kept_total,
+            # Budgets exceeded because they hold more P0 cases than their limit
+            "over_budget_p0": over,
+            "by_category": rows
+        }
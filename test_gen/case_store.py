@@ -0,0 +1,170 @@
+"""
+Case Store
+Append-only, process-safe writes to a raw test case file.
+A JSON Lines file is appended to directly. A JSON document gets a journal next to
+it (<stem>.journal.jsonl, merged in by testcase_io readers) that is folded back
+into the document every `compact_every` cases, so adds never rewrite the suite.
+The journal header records the document's size and mtime: once the document is
+replaced by anything else (explode, the agent), the journal is stale, readers
+ignore it and the next add starts a new one.
+All writes hold an exclusive lock on .locks/<file>.lock next to the file (lock files
+stay in that ignored directory: removing them on release would race with waiters).
+"""
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    from .testcase_io import (JOURNAL_HEADER, append_test_cases_jsonl, count_test_cases, document_stamp, is_jsonl,
+                              journal_is_current, journal_path, load_test_cases_document, write_test_cases_jsonl)
+except ImportError:
+    from testcase_io import (JOURNAL_HEADER, append_test_cases_jsonl, count_test_cases, document_stamp, is_jsonl,
+                             journal_is_current, journal_path, load_test_cases_document, write_test_cases_jsonl)
+
+COMPACT_EVERY = 500
+LOCK_DIR = ".locks"
+
+
+def lock_path(path: str) -> str:
+    """ output/raw_testcases.json -> output/.locks/raw_testcases.json.lock """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, LOCK_DIR, name + ".lock")
+
+
+@contextmanager
+def file_lock(path: str):
+    """ Exclusive inter-process lock on lock_path(path) (flock on POSIX, msvcrt on Windows). """
+    lock_file = lock_path(path)
+    os.makedirs(os.path.dirname(lock_file), exist_ok=True)
+    with open(lock_file, "a+") as handle:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10s with OSError; keep waiting
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_document(path: str, data: Any):
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if is_jsonl(path):
+                write_test_cases_jsonl(data.get("test_cases", []) if isinstance(data, dict) else data, f)
+            else:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def replace_document(path: str, data: Any):
+    """ Rewrites the whole file (data includes any journaled cases) and drops the journal. Call under file_lock(path). """
+    _write_document(path, data)
+    if os.path.exists(journal_path(path)):
+        os.remove(journal_path(path))
+
+
+class CaseStore:
+    """
+    [NEW v3.1] Appends test cases to a raw file under a file lock.
+    The journal's header line records how many cases the document held when it was
+    started, so counting (for sequential IDs) only reads the journal, never the document.
+    """
+
+    def __init__(self, path: str, compact_every: int = COMPACT_EVERY):
+        self.path = path
+        self.jsonl = is_jsonl(path)
+        self.journal = journal_path(path)
+        self.compact_every = compact_every
+
+    def _journal_state(self):
+        """ (document cases when the journal was started, journaled cases) """
+        base, entries = 0, 0
+        with open(self.journal, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if entries == 0 and JOURNAL_HEADER in line:
+                    header = json.loads(line)
+                    if JOURNAL_HEADER in header:
+                        base = header.get("base_count", 0)
+                        continue
+                entries += 1
+        return base, entries
+
+    def _drop_stale_journal(self):
+        """ Removes a journal started for an earlier version of the document (call under the lock). """
+        if not self.jsonl and os.path.exists(self.journal) and not journal_is_current(self.path):
+            os.remove(self.journal)
+
+    def count(self) -> int:
+        if not self.jsonl and journal_is_current(self.path):
+            base, entries = self._journal_state()
+            return base + entries
+        return count_test_cases(self.path)
+
+    def append(self, test_cases: List[Dict[str, Any]], assign_id: Optional[Callable[[int], str]] = None) -> List[Dict[str, Any]]:
+        """
+        Appends the cases in one locked write. assign_id(n) names the n-th case of the
+        file (1-based); numbering is read under the same lock, so concurrent adds never collide.
+        """
+        with file_lock(self.path):
+            self._drop_stale_journal()
+            start = self.count()
+            if assign_id:
+                for offset, tc in enumerate(test_cases, 1):
+                    tc['id'] = assign_id(start + offset)
+            if self.jsonl:
+                append_test_cases_jsonl(self.path, test_cases)
+                return test_cases
+
+            started = os.path.exists(self.journal)
+            entries = self._journal_state()[1] if started else 0
+            with open(self.journal, "a", encoding="utf-8") as f:
+                if not started:
+                    f.write(json.dumps({JOURNAL_HEADER: 1, "base_count": start, "document": document_stamp(self.path)}) + "\n")
+                write_test_cases_jsonl(test_cases, f)
+            if entries + len(test_cases) >= self.compact_every:
+                self._compact()
+        return test_cases
+
+    def _compact(self) -> int:
+        self._drop_stale_journal()
+        if self.jsonl or not os.path.exists(self.journal):
+            return 0
+        moved = self._journal_state()[1]
+        _write_document(self.path, load_test_cases_document(self.path))
+        os.remove(self.journal)
+        return moved
+
+    def compact(self) -> int:
+        """ Folds the journal into the document; returns the number of cases moved. """
+        with file_lock(self.path):
+            return self._compact()
+
+    def replace(self, data: Any):
+        """ Rewrites the whole file (data includes any journaled cases) and drops the journal. """
+        with file_lock(self.path):
+            replace_document(self.path, data)
@@ -0,0 +1,162 @@
+"""
+Covering Arrays (Combinatorial Testing)
+IPOG (In-Parameter-Order-General) construction of t-wise covering arrays:
+every combination of `strength` parameter values appears in at least one row,
+using close to the minimum number of rows.
+"""
+from itertools import combinations, product
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+# Constraint over a PARTIAL row: {parameter index: value} -> False if forbidden
+Constraint = Callable[[Dict[int, Any]], bool]
+
+
+def covering_array(domains: Sequence[Sequence[Any]], strength: int = 2, constraint: Optional[Constraint] = None) -> List[Tuple[Any, ...]]:
+    """
+    Builds a t-wise covering array.
+
+    Args:
+        domains: One list of values per parameter (empty lists are not allowed)
+        strength: t (2 = pairwise, 3 = 3-wise). Capped at the number of parameters.
+        constraint: Optional validity check on partial rows. Forbidden tuples are not
+            required, and no row ever contains a forbidden combination.
+
+    Returns:
+        Rows as tuples of values, in the original parameter order. Deterministic.
+    """
+    n = len(domains)
+    if n == 0:
+        return []
+    if any(len(d) == 0 for d in domains):
+        raise ValueError("Every parameter needs at least one value")
+    t = max(1, min(strength, n))
+
+    # IPOG grows the array one parameter at a time; largest domains first keeps it small
+    order = sorted(range(n), key=lambda i: -len(domains[i]))
+    sizes = [len(domains[p]) for p in order]
+
+    def allowed(row: List[Any]) -> bool:
+        return constraint({order[pos]: domains[order[pos]][idx] for pos, idx in enumerate(row) if idx is not None})
+
+    completions: Dict[Tuple, Optional[List[int]]] = {}
+
+    def complete(row: List[Any]) -> Optional[List[int]]:
+        """ First valid full row extending `row` (depth-first, pruned on partial rows), or None. """
+        key = tuple(row) + (None,) * (n - len(row))
+        if key not in completions:
+            full = list(key)
+            free = [pos for pos in range(n) if full[pos] is None]
+            found = None
+            if allowed(full):
+                choice = [0] * len(free)
+                depth = 0
+                while 0 <= depth < len(free):
+                    if choice[depth] >= sizes[free[depth]]:
+                        full[free[depth]] = None
+                        choice[depth] = 0
+                        depth -= 1
+                        if depth >= 0:
+                            choice[depth] += 1
+                        continue
+                    full[free[depth]] = choice[depth]
+                    if allowed(full):
+                        depth += 1
+                    else:
+                        choice[depth] += 1
+                if depth == len(free):
+                    found = full
+            completions[key] = found
+        return completions[key]
+
+    def valid(row: List[Any]) -> bool:
+        # Partial rows must extend to a full valid row, which also rules out implied constraints
+        return constraint is None or complete(row) is not None
+
+    # Rows hold value INDICES in `order` positions; None = don't care (filled at the end)
+    rows: List[List[Any]] = [list(combo) for combo in product(*(range(s) for s in sizes[:t]))]
+    rows = [row for row in rows if valid(row)]
+
+    for k in range(t, n):
+        size = sizes[k]
+        col_sets = list(combinations(range(k), t - 1))
+
+        # Uncovered t-tuples involving column k: (cols, vals) -> values of column k still missing
+        uncovered: Dict[Tuple, Set[int]] = {}
+        for cols in col_sets:
+            for vals in product(*(range(sizes[c]) for c in cols)):
+                if constraint is None:
+                    missing = set(range(size))
+                else:
+                    partial = [None] * (k + 1)
+                    for c, val in zip(cols, vals):
+                        partial[c] = val
+                    missing = set()
+                    for v in range(size):
+                        partial[k] = v
+                        if valid(partial):
+                            missing.add(v)
+                if missing:
+                    uncovered[(cols, vals)] = missing
+
+        # 1. Horizontal growth: extend each row with the value covering most new tuples
+        for row in rows:
+            gain = [0] * size
+            keys = []
+            for cols in col_sets:
+                vals = tuple(row[c] for c in cols)
+                if None in vals:
+                    continue
+                missing = uncovered.get((cols, vals))
+                if missing:
+                    keys.append((cols, vals))
+                    for v in missing:
+                        gain[v] += 1
+            row.append(None)
+            best = None
+            for v in sorted(range(size), key=lambda v: -gain[v]):
+                row[k] = v
+                if valid(row):
+                    best = v
+                    break
+            row[k] = best
+            if best is None:
+                continue
+            for key in keys:
+                missing = uncovered[key]
+                missing.discard(best)
+                if not missing:
+                    del uncovered[key]
+
+        # 2. Vertical growth: place each remaining tuple in a compatible row or a new one
+        for (cols, vals) in sorted(uncovered):
+            for v in sorted(uncovered[(cols, vals)]):
+                for row in rows:
+                    if row[k] in (None, v) and all(row[c] in (None, val) for c, val in zip(cols, vals)):
+                        candidate = list(row)
+                        candidate[k] = v
+                        for c, val in zip(cols, vals):
+                            candidate[c] = val
+                        if valid(candidate):
+                            row[:] = candidate
+                            break
+                else:
+                    row = [None] * (k + 1)
+                    row[k] = v
+                    for c, val in zip(cols, vals):
+                        row[c] = val
+                    rows.append(row)
+
+    result = []
+    for row in rows:
+        # Fill don't-cares: index 0, or the first valid completion under constraints
+        if constraint is None:
+            row = [0 if idx is None else idx for idx in row]
+        else:
+            row = complete(row)
+            if row is None:
+                continue
+        values = [None] * n
+        for pos, idx in enumerate(row):
+            values[order[pos]] = domains[order[pos]][idx]
+        result.append(tuple(values))
+    return result
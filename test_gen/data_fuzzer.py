@@ -1,90 +1,136 @@
-import json
 import os
 import random
 import string
 
+try:
+    from .keyword_classifier import KeywordClassifier, seeded_rng
+    from .testcase_io import is_jsonl, iter_test_cases, load_test_cases_document, write_test_cases_jsonl
+    from .case_store import file_lock, replace_document
+except ImportError:
+    from keyword_classifier import KeywordClassifier, seeded_rng
+    from testcase_io import is_jsonl, iter_test_cases, load_test_cases_document, write_test_cases_jsonl
+    from case_store import file_lock, replace_document
+
 # Simple data generators
-def gen_email():
+def gen_email(rng=random):
     domains = ["gmail.com", "yahoo.com", "outlook.com", "company.com"]
-    name = ''.join(random.choices(string.ascii_lowercase, k=8))
-    return f"{name}@{random.choice(domains)}"
+    name = ''.join(rng.choices(string.ascii_lowercase, k=8))
+    return f"{name}@{rng.choice(domains)}"
 
-def gen_int():
-    return random.randint(-100, 1000)
+def gen_int(rng=random):
+    return rng.randint(-100, 1000)
 
-def gen_text():
+def gen_text(rng=random):
     chars = string.ascii_letters + string.digits + " "
-    return ''.join(random.choices(chars, k=random.randint(5, 20)))
+    return ''.join(rng.choices(chars, k=rng.randint(5, 20)))
 
-def gen_xss():
+def gen_xss(rng=random):
     payloads = ["<script>alert(1)</script>", "<img src=x onerror=alert(1)>", "javascript:alert(1)"]
-    return random.choice(payloads)
-
-# Keyword mapping
-def get_example_for_keyword(text_content):
-    text_content = text_content.lower()
-    if "email" in text_content:
-        return gen_email()
-    if "age" in text_content or "quantity" in text_content or "number" in text_content:
-        return gen_int()
-    if "name" in text_content:
-        return gen_text()
-    if "xss" in text_content or "script" in text_content:
-        return gen_xss()
-    return None
-
-def enrich_test_cases(input_path="output/raw_testcases.json"):
+    return rng.choice(payloads)
+
+# Keyword mapping (EN + VI), highest priority first
+FUZZ_KEYWORDS = [
+    (gen_email, ["email", "thư điện tử"]),
+    (gen_int, ["age", "quantity", "number", "tuổi", "số lượng"]),
+    (gen_text, ["name", "tên"]),
+    (gen_xss, ["xss", "script"]),
+]
+FUZZ_CLASSIFIER = KeywordClassifier(FUZZ_KEYWORDS)
+
+def get_example_for_keyword(text_content, rng=None):
+    generator = FUZZ_CLASSIFIER.first(text_content)
+    return generator(rng or random) if generator else None
+
+def enrich_test_case(tc, seed=0):
+    """ Enriches one test case in place; returns True if its test data was changed. """
+    # Check Title or Test Data for keywords
+    target_text = tc.get('title', '') + " " + tc.get('test_data', '')
+    
+    # Generate 3 examples (classified once, seeded per case)
+    examples = []
+    generator = FUZZ_CLASSIFIER.first(target_text)
+    if generator:
+        rng = seeded_rng(seed, target_text)
+        examples = [str(generator(rng)) for _ in range(3)]
+    
+    if examples:
+        # Sanitize examples for markdown table compatibility
+        sanitized_examples = [sanitize_for_markdown(ex) for ex in examples]
+        
+        # Append to Test Data
+        current_data = tc.get('test_data', '')
+        if current_data == '-' or current_data == '':
+            current_data = "Auto-Generated:"
+        
+        # Check for existing enrichment to avoid duplication/spam
+        # [MODIFIED v3.1] Disabled Random Examples injection as per user feedback
+        # if "[Random Examples:" not in current_data and "[Hypothesis Examples:" not in current_data:
+        #     enrichment = f" <br> **[Random Examples]:** `{', '.join(sanitized_examples)}`"
+        #     tc['test_data'] = current_data + enrichment
+        #     return True
+    return False
+
+def _enrich_jsonl(input_path, seed=0):
+    """ [NEW v3.1] JSON Lines: cases are streamed through a temp file, one at a time. """
+    enriched_count = 0
+    scanned = 0
+    tmp_path = input_path + ".tmp"
+
+    def enriched():
+        nonlocal enriched_count, scanned
+        for tc in iter_test_cases(input_path):
+            scanned += 1
+            enriched_count += enrich_test_case(tc, seed)
+            yield tc
+
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            write_test_cases_jsonl(enriched(), f)
+        os.replace(tmp_path, input_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"🔍 Scanned {scanned} test cases for data enrichment potential...")
+    return enriched_count
+
+def enrich_test_cases(input_path="output/raw_testcases.json", seed=0):
     if not os.path.exists(input_path):
         print(f"❌ Input file not found: {input_path}")
         return False
+
+    if is_jsonl(input_path):
+        try:
+            # Locked: a concurrent --step add must not append to the file being rewritten
+            with file_lock(input_path):
+                enriched_count = _enrich_jsonl(input_path, seed)
+        except Exception as e:
+            print(f"❌ JSON Load Error: {e}")
+            return False
+        print(f"✅ Enriched {enriched_count} test cases with Hypothesis data.")
+        return True
     
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Locked from load to save: a --step add landing in between would be dropped with the journal
+        with file_lock(input_path):
+            # Includes manual cases still in the add journal (case_store.py)
+            data = load_test_cases_document(input_path)
+
+            # Process Functional Test Cases
+            enriched_count = 0
+            # Support both old and new schema
+            all_tcs = data.get('test_cases', []) + data.get('functional_testcases', []) + data.get('non_functional_testcases', [])
+
+            print(f"🔍 Scanning {len(all_tcs)} test cases for data enrichment potential...")
+
+            for tc in all_tcs:
+                enriched_count += enrich_test_case(tc, seed)
+
+            # Save back (folds the add journal into the document)
+            replace_document(input_path, data)
     except Exception as e:
         print(f"❌ JSON Load Error: {e}")
         return False
-    
-    # Process Functional Test Cases
-    enriched_count = 0
-    # Support both old and new schema
-    all_tcs = data.get('test_cases', []) + data.get('functional_testcases', []) + data.get('non_functional_testcases', [])
-    
-    print(f"🔍 Scanning {len(all_tcs)} test cases for data enrichment potential...")
-    
-    for tc in all_tcs:
-        # Check Title or Test Data for keywords
-        target_text = (tc.get('title', '') + " " + tc.get('test_data', '')).lower()
-        
-        # Generate 3 examples
-        examples = []
-        for _ in range(3):
-            val = get_example_for_keyword(target_text)
-            if val:
-                examples.append(str(val))
-        
-        if examples:
-            # Sanitize examples for markdown table compatibility
-            sanitized_examples = [sanitize_for_markdown(ex) for ex in examples]
-            
-            # Append to Test Data
-            current_data = tc.get('test_data', '')
-            if current_data == '-' or current_data == '':
-                current_data = "Auto-Generated:"
-            
-            # Check for existing enrichment to avoid duplication/spam
-            # [MODIFIED v3.1] Disabled Random Examples injection as per user feedback
-            # if "[Random Examples:" not in current_data and "[Hypothesis Examples:" not in current_data:
-            #     enrichment = f" <br> **[Random Examples]:** `{', '.join(sanitized_examples)}`"
-            #     tc['test_data'] = current_data + enrichment
-            #     enriched_count += 1
-            pass
-
-
-    # Save back
-    with open(input_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        
+
     print(f"✅ Enriched {enriched_count} test cases with Hypothesis data.")
     return True
 
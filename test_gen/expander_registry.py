@@ -0,0 +1,100 @@
+"""
+Expander Registry
+Declarative dispatch table for MatrixEngine expanders, plus per-expander statistics.
+Expanders are referenced by method NAME so subclasses can override them.
+"""
+import copy
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Predicate over the scope context (see ExpanderRegistry.DEFAULT_ARGS). None = always run.
+Predicate = Optional[Callable[[Any], bool]]
+
+
+class ExpanderRegistry:
+    """
+    [NEW v3.1] Maps field types and section/field/rule/visual/global hooks to expander methods.
+    Hooks run in registration order, which defines the order of generated cases.
+    """
+    SCOPES = ("section", "field", "rule", "visual", "global")
+
+    # Context passed to predicates/args builders, and the default expander arguments
+    DEFAULT_ARGS = {
+        "section": lambda section: (section,),
+        "field": lambda field, section: (field, f"Verify {field.name}"),
+        "rule": lambda rule: (rule,),
+        "visual": lambda vis: (vis,),
+        "global": lambda: (),
+    }
+
+    def __init__(self):
+        self.field_types: Dict[str, str] = {}
+        self.hooks: Dict[str, List[Tuple[str, Predicate, Optional[Callable]]]] = {scope: [] for scope in self.SCOPES}
+
+    def register_field_type(self, types, expander: str) -> "ExpanderRegistry":
+        """ Dispatch target of _expand_field for one or more FieldType.type values. """
+        for t in ([types] if isinstance(types, str) else types):
+            self.field_types[t] = expander
+        return self
+
+    def register(self, scope: str, expander: str, when: Predicate = None, args: Optional[Callable] = None) -> "ExpanderRegistry":
+        """
+        Adds an expander to a scope. `when` filters on the scope context, `args`
+        builds the call arguments from it (default: DEFAULT_ARGS[scope]).
+        """
+        if scope not in self.hooks:
+            raise ValueError(f"Unknown expander scope '{scope}'. Expected one of {self.SCOPES}")
+        self.hooks[scope].append((expander, when, args))
+        return self
+
+    def resolve(self, scope: str, *context) -> List[Tuple[str, tuple]]:
+        """ (expander name, call args) for every hook of the scope that applies to this context. """
+        steps = []
+        for name, when, args in self.hooks[scope]:
+            if when is None or when(*context):
+                steps.append((name, (args or self.DEFAULT_ARGS[scope])(*context)))
+        return steps
+
+    def field_expander(self, field_type: str) -> Optional[str]:
+        return self.field_types.get(field_type)
+
+    def copy(self) -> "ExpanderRegistry":
+        """ Independent copy, e.g. for a subclass that plugs in extra expanders. """
+        return copy.deepcopy(self)
+
+
+class ExpanderStats:
+    """
+    [NEW v3.1] Call count, produced cases and cumulative seconds per expander.
+    Times are inclusive: _expand_field includes the type expander it dispatched to.
+    """
+    __slots__ = ("calls", "cases", "seconds")
+
+    def __init__(self, calls: int = 0, cases: int = 0, seconds: float = 0.0):
+        self.calls = calls
+        self.cases = cases
+        self.seconds = seconds
+
+    def add(self, other: "ExpanderStats"):
+        self.calls += other.calls
+        self.cases += other.cases
+        self.seconds += other.seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "cases": self.cases, "seconds": round(self.seconds, 6)}
+
+    def __getstate__(self):
+        return (self.calls, self.cases, self.seconds)
+
+    def __setstate__(self, state):
+        self.calls, self.cases, self.seconds = state
+
+
+def merge_stats(target: Dict[str, ExpanderStats], source: Dict[str, ExpanderStats]):
+    for name, stats in source.items():
+        target.setdefault(name, ExpanderStats()).add(stats)
+
+
+def stats_report(stats: Dict[str, ExpanderStats]) -> List[Dict[str, Any]]:
+    """ Rows sorted by cumulative time (most expensive first). """
+    rows = [dict(expander=name, **s.to_dict()) for name, s in stats.items()]
+    return sorted(rows, key=lambda r: r["seconds"], reverse=True)
@@ -0,0 +1,50 @@
+"""
+Explode Cache
+On-disk cache of per-unit expansion output (one unit = a section, business rule,
+visual rule or the global flows), keyed by a canonical content hash of the unit
+plus the engine fingerprint. Lets a re-run re-expand only what changed.
+"""
+import hashlib
+import json
+import os
+from typing import Any, List, Optional
+
+
+class ExplosionCache:
+    def __init__(self, cache_dir: str, fingerprint: str):
+        self.cache_dir = cache_dir
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, element: Any) -> str:
+        """ sha256 over the engine fingerprint + canonical JSON of the unit's schema element(s). """
+        canonical = json.dumps(element, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{self.fingerprint}\n{canonical}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def has(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def load(self, key: str) -> Optional[List[list]]:
+        """ Cached raw rows (field lists, pre-dedupe) or None if missing/corrupt. """
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.hits += 1
+        return rows
+
+    def store(self, key: str, rows: List[list]):
+        """ Saves a freshly expanded unit (counted as a miss). """
+        self.misses += 1
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
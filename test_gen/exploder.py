@@ -1,57 +1,276 @@
+import contextlib
+import glob
+import itertools
 import json
 import os
 import sys
+import time
 
 # Support dual import for package/standalone
 try:
     from .schema_models import SmartSchema
     from .matrix_engine import MatrixEngine
     from .logger import log
+    from .testcase_io import journal_path, write_test_cases
+    from .near_dedupe import NearDuplicateFilter
+    from .schema_loader import load_schema
+    from .case_budget import CaseBudget
+    from .case_store import file_lock
+    from .traceability import TraceIndex, element_key, trace_index_path
+    from .memory_profile import MemoryProfiler, memory_report_path
 except ImportError:
     from schema_models import SmartSchema
     from matrix_engine import MatrixEngine
     from logger import log
+    from testcase_io import journal_path, write_test_cases
+    from near_dedupe import NearDuplicateFilter
+    from schema_loader import load_schema
+    from case_budget import CaseBudget
+    from case_store import file_lock
+    from traceability import TraceIndex, element_key, trace_index_path
+    from memory_profile import MemoryProfiler, memory_report_path
 
-def run_explode(schema_path="output/schema_input.json", output_path="output/raw_testcases.json"):
+def near_dup_report_path(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + "_near_duplicates.json"
+
+def budget_report_path(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + "_budget.json"
+
+def _staged_records(engine: MatrixEngine, near_dupes, budget, profiler: MemoryProfiler) -> list:
+    """
+    [NEW v3.1] --profile-memory: the stages the streaming path interleaves run one
+    after another (serial, no cache), each inside its own profiler phase:
+    expand:<group> per expander group, dedupe, then budget. Same cases as iter_records.
+    """
+    raw = []
+    groups = itertools.groupby(engine._expansion_units(), key=lambda unit: element_key(unit[0]).split(":", 1)[0])
+    for group, units in groups:
+        with profiler.phase(f"expand:{group}"):
+            for _, steps in units:
+                raw.extend(engine._run_steps(steps))
+    with profiler.phase("dedupe"):
+        records = engine.deduplicate_test_cases(raw, near_dupes)
+        del raw
+    if budget:
+        with profiler.phase("budget"):
+            records = list(budget.apply(records))
+    return records
+
+def _explode_to_file(schema: SmartSchema, output_path: str, workers: int = 1, cache_dir: str = None, near_dup_threshold: float = None, seed: int = 0,
+                     max_cases: int = None, category_budget: dict = None, profiler: MemoryProfiler = None) -> dict:
+    """
+    Streams the explosion of one schema to output_path.
+    Returns {"count", "engine", "cache", "near_dupes", "budget", "trace"} (unused features are None).
+    The traceability index (<output>_trace.json) is always written next to the output;
+    with near_dup_threshold / max_cases / category_budget, their reports are as well.
+    [NEW v3.1] With a profiler, the stages run one after another (see _staged_records)
+    and the JSON dump is profiled as its own phase.
+    """
+    # 2. Initialize Matrix Engine
+    engine = MatrixEngine(schema, seed)
+    cache = engine.open_cache(cache_dir) if cache_dir else None
+    near_dupes = NearDuplicateFilter(near_dup_threshold) if near_dup_threshold else None
+    budget = CaseBudget(max_cases, category_budget, seed=seed) if max_cases is not None or category_budget else None
+
+    if profiler:
+        records = _staged_records(engine, near_dupes, budget, profiler)
+    else:
+        records = engine.iter_records(workers, cache, near_dupes)
+        if budget:
+            # [NEW v3.1] Only the sampled cases (at most the budget) stay in memory while the explosion
+            # streams through; P0s and cases of unbudgeted categories are spilled to a temp file
+            records = budget.apply(records)
+
+    # 3. Generate & 4. Save to raw_testcases.json (or .jsonl: one case per line)
+    # [NEW v3.1] Streamed case by case: memory stays flat for huge explosions.
+    # Written to a temp file first so a failed run never leaves a truncated output.
+    tmp_path = output_path + ".tmp"
+    trace = TraceIndex()
+    with profiler.phase("json_dump") if profiler else contextlib.nullcontext():
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                count = write_test_cases((tc.to_dict() for tc in trace.track(records)), f, output_path)
+            # Under the add lock: manual cases journaled for the previous file (case_store.py)
+            # are replaced with it, and no concurrent add sees one without the other
+            with file_lock(output_path):
+                os.replace(tmp_path, output_path)
+                if os.path.exists(journal_path(output_path)):
+                    os.remove(journal_path(output_path))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        trace.save(trace_index_path(output_path))
+
+    if near_dupes:
+        report = near_dupes.report()
+        if budget:
+            # Kept IDs now refer to the budgeted suite (None = later dropped by the budget)
+            for merge in report["merged"]:
+                merge["kept"] = budget.id_map.get(merge["kept"])
+        with open(near_dup_report_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if budget:
+        with open(budget_report_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump(budget.report(), f, indent=2, ensure_ascii=False)
+    return {"count": count, "engine": engine, "cache": cache, "near_dupes": near_dupes, "budget": budget, "trace": trace}
+
+def run_explode(schema_path="output/schema_input.json", output_path="output/raw_testcases.json", workers=1, cache_dir=None, stats_path=None, near_dup_threshold=None, seed=0,
+                max_cases=None, category_budget=None, profile_memory=None):
+    """
+    [NEW v3.1] profile_memory: path of a tracemalloc report (peak / net memory and top
+    allocation sites for schema load, each expander group, dedupe and the JSON dump);
+    "" writes it next to the output as <output>_memory.json.
+    """
     log.info(f"🚀 Starting Phase: SMART EXPLOSION (Matrix Engine)...")
-    
+
     if not os.path.exists(schema_path):
         log.error(f"❌ Schema file not found: {schema_path}")
         return False
-        
+
+    profiler = None
+    if profile_memory is not None:
+        profiler = MemoryProfiler("explode")
+        profiler.notes = {"mode": "staged", "note": "stages run one after another; peaks are upper bounds for the streaming run"}
+        if workers > 1 or cache_dir:
+            log.warning("   ⚠️ --profile-memory runs serially without the explode cache")
+            workers, cache_dir = 1, None
+
     try:
         # 1. Load Schema
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Handle if schema is wrapped or raw
-        if "feature_name" not in data and "sections" not in data:
-            # Try finding nested key
-            keys = list(data.keys())
-            if keys:
-                data = data[keys[0]]
-
-        schema = SmartSchema(**data)
+        with profiler.phase("schema_load") if profiler else contextlib.nullcontext():
+            schema = load_schema(schema_path)
         log.info(f"   ✅ Schema Loaded: {schema.feature_name}")
-        
-        # 2. Initialize Matrix Engine
-        engine = MatrixEngine(schema)
-        
-        # 3. Generate
-        test_cases = engine.generate_all()
-        log.info(f"   💥 Matrix Engine Exploded: {len(test_cases)} Test Cases")
-        
-        # 4. Save to raw_testcases.json
-        output_data = {"test_cases": test_cases}
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
-            
+
+        if workers > 1:
+            log.info(f"   ⚙️ Parallel explosion: {workers} workers")
+        run = _explode_to_file(schema, output_path, workers, cache_dir, near_dup_threshold, seed, max_cases, category_budget, profiler)
+        cache, engine, near_dupes, budget = run["cache"], run["engine"], run["near_dupes"], run["budget"]
+        log.info(f"   💥 Matrix Engine Exploded: {run['count']} Test Cases")
+        log.info(f"   🧭 Traceability: {len(run['trace'].elements)} schema elements → {trace_index_path(output_path)}")
+        if near_dupes:
+            log.info(f"   🧬 Near-duplicates merged: {len(near_dupes.merged)} (similarity >= {near_dup_threshold}) → {near_dup_report_path(output_path)}")
+        if budget:
+            summary = budget.report()
+            log.info(f"   ✂️ Budget: kept {summary['kept']} of {summary['seen']}, dropped {summary['dropped']} → {budget_report_path(output_path)}")
+            if summary["over_budget_p0"]:
+                log.warning(f"   ⚠️ P0 cases alone exceed the budget of: {', '.join(summary['over_budget_p0'])}")
+        if cache:
+            log.info(f"   ♻️ Incremental cache: {cache.hits} units reused, {cache.misses} re-expanded ({cache_dir})")
+        if stats_path:
+            report = engine.expander_report()
+            with open(stats_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            log.info("   ⏱️ Top expanders (inclusive time):")
+            for row in report[:5]:
+                log.info(f"      {row['expander']}: {row['seconds']:.4f}s, {row['calls']} calls, {row['cases']} cases")
+            log.info(f"   ✅ Expander stats: {stats_path}")
+        if profiler:
+            report_path = profile_memory or memory_report_path(output_path)
+            profiler.save(report_path)
+            log.info("   🧠 Memory by phase (tracemalloc):")
+            for line in profiler.summary_lines():
+                log.info(f"      {line}")
+            log.info(f"   ✅ Memory report: {report_path}")
+
         log.info(f"   ✅ Saved to: {output_path}")
         return True
-        
+
     except Exception as e:
         log.error(f"❌ Explosion Failed: {e}")
         import traceback
         log.error(traceback.format_exc())
         return False
+    finally:
+        if profiler:
+            profiler.stop()
+
+# --- Batch Mode ---
+
+def is_batch_target(schema_arg: str) -> bool:
+    """ True if --schema points at a directory or a glob pattern instead of one file. """
+    return os.path.isdir(schema_arg) or glob.has_magic(schema_arg)
+
+def resolve_schema_paths(schema_arg: str) -> list:
+    if os.path.isdir(schema_arg):
+        return sorted(glob.glob(os.path.join(schema_arg, "*.json")))
+    return sorted(p for p in glob.glob(schema_arg, recursive=True) if os.path.isfile(p))
+
+def _batch_output_path(schema_path: str, output_dir: str) -> str:
+    stem = os.path.splitext(os.path.basename(schema_path))[0]
+    return os.path.join(output_dir, f"{stem}_raw_testcases.json")
+
+def _explode_batch_item(task) -> dict:
+    """ Pool task: explode one schema file and return its manifest record (never raises). """
+    schema_path, output_path, options = task
+    record = {"schema": schema_path, "output": output_path}
+    start = time.perf_counter()
+    try:
+        schema = load_schema(schema_path)
+        record["feature_name"] = schema.feature_name
+        run = _explode_to_file(schema, output_path, **options)
+        record["test_cases"] = run["count"]
+        record["trace"] = trace_index_path(output_path)
+        if run["cache"]:
+            record["cache"] = {"reused": run["cache"].hits, "expanded": run["cache"].misses}
+        if run["near_dupes"]:
+            record["near_duplicates_merged"] = len(run["near_dupes"].merged)
+        if run["budget"]:
+            record["budget_dropped"] = run["budget"].report()["dropped"]
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+def run_explode_batch(schema_arg: str, output_dir="output/exploded", workers=1, cache_dir=None, near_dup_threshold=None, seed=0,
+                      max_cases=None, category_budget=None):
+    """
+    [NEW v3.1] Explodes every schema matched by a directory or glob in one interpreter.
+    Pool workers are reused across schemas, so imports, pydantic models and the
+    compiled title translator are paid once per worker instead of once per schema.
+    Writes <stem>_raw_testcases.json per schema plus explode_manifest.json.
+    """
+    log.info("🚀 Starting Phase: SMART EXPLOSION (Batch)...")
+
+    schema_paths = resolve_schema_paths(schema_arg)
+    if not schema_paths:
+        log.error(f"❌ No schema files matched: {schema_arg}")
+        return False
+
+    os.makedirs(output_dir, exist_ok=True)
+    options = dict(cache_dir=cache_dir, near_dup_threshold=near_dup_threshold, seed=seed, max_cases=max_cases, category_budget=category_budget)
+    tasks = [(p, _batch_output_path(p, output_dir), options) for p in schema_paths]
+    outputs = [task[1] for task in tasks]
+    if len(set(outputs)) != len(outputs):
+        log.error("❌ Several schemas share the same file name; outputs would overwrite each other.")
+        return False
+
+    log.info(f"   📂 {len(tasks)} schemas, {workers} worker(s)")
+    start = time.perf_counter()
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(_explode_batch_item, tasks))
+    else:
+        records = [_explode_batch_item(t) for t in tasks]
+
+    failed = [r for r in records if r["status"] != "ok"]
+    for r in failed:
+        log.error(f"   ❌ {r['schema']}: {r['error']}")
+
+    manifest = {
+        "schemas": len(records),
+        "succeeded": len(records) - len(failed),
+        "failed": len(failed),
+        "total_test_cases": sum(r.get("test_cases", 0) for r in records),
+        "seconds": round(time.perf_counter() - start, 3),
+        "results": records
+    }
+    manifest_path = os.path.join(output_dir, "explode_manifest.json")
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    log.info(f"   💥 Exploded {manifest['total_test_cases']} Test Cases from {manifest['succeeded']}/{len(records)} schemas")
+    log.info(f"   ✅ Manifest: {manifest_path}")
+    return not failed
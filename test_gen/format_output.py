@@ -1,4 +1,5 @@
 import argparse
+import contextlib
 import json
 import os
 import pandas as pd
@@ -6,7 +7,10 @@ import sys
 from .logger import log
 sys.path.append(os.path.dirname(__file__))
 from exporter import Exporter
-from markdown_generator import generate_markdown_report
+from markdown_generator import write_markdown_report
+from memory_profile import MemoryProfiler
+from testcase_io import load_test_cases_document
+from traceability import match_keys, save_suite_ids
 
 def validate_json(data):
     required_keys = ["test_cases", "test_plan", "release_note"]
@@ -20,8 +24,14 @@ def main():
     parser.add_argument("--input", required=True, help="Path to raw JSON output from Agent")
     parser.add_argument("--output", default="output", help="Output directory")
     parser.add_argument("--filename", default=None, help="Custom filename for output")
+    parser.add_argument("--profile-memory", default=None, metavar="PATH", help="Write a tracemalloc report (peak memory, top allocation sites per phase) to PATH")
     
     args = parser.parse_args()
+
+    # [NEW v3.1] Per-phase memory profile: load_json, prepare, render_markdown
+    profiler = MemoryProfiler("format") if args.profile_memory else None
+    def phase(name):
+        return profiler.phase(name) if profiler else contextlib.nullcontext()
     
     log.info(f"🚀 Starting Formatting...")
     log.info(f"📂 Input JSON: {args.input}")
@@ -31,8 +41,9 @@ def main():
         return
 
     try:
-        with open(args.input, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # [NEW v3.1] raw_testcases.jsonl (one case per line) is read as {"test_cases": [...]}
+        with phase("load_json"):
+            data = load_test_cases_document(args.input)
     except json.JSONDecodeError as e:
         log.error(f"❌ Critical Error: Invalid JSON in {args.input}")
         log.error(f"   📍 Location: Line {e.lineno}, Column {e.colno}")
@@ -63,15 +74,16 @@ def main():
             fname = args.filename if args.filename.endswith('.md') else f"{args.filename}.md"
         
         # Prepare data using exporter's logic (reusing existing robust preparation)
-        prepared_data = exporter.prepare_data_for_template(data)
+        with phase("prepare"):
+            prepared_data = exporter.prepare_data_for_template(data)
         
         # Generate Markdown using Python Generator (No Jinja2)
-        md_content = generate_markdown_report(prepared_data)
-        
-        # Save output
+        # [NEW v3.1] Streamed straight into the output file
         out_path = os.path.join(args.output, fname)
-        with open(out_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        with phase("render_markdown"), open(out_path, 'w', encoding='utf-8') as f:
+            write_markdown_report(prepared_data, f)
+        # [NEW v3.1] Match key -> row ID map: impact deltas find their rows through it
+        save_suite_ids(out_path, {key: tc.get('id', '') for key, tc in match_keys(test_cases).items()})
             
         log.info(f"   -> Saved to: {out_path}")
     else:
@@ -107,6 +119,12 @@ def main():
   - Release Note (Markdown)
 """
     exporter.export_to_markdown(summary, "SUMMARY_REPORT.md")
+    if profiler:
+        profiler.save(args.profile_memory)
+        profiler.stop()
+        for line in profiler.summary_lines():
+            log.info(f"   🧠 {line}")
+        log.info(f"   -> Memory report: {args.profile_memory}")
     log.info("✅ Formatting Complete!")
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+"""
+Impact Analysis
+Structural diff of two SmartSchemas plus the exact test case delta it causes.
+Cases are matched across the two explosions by their provenance (element, expander,
+variant - see traceability.py), then unmatched ones by content, so a changed field
+shows up as the handful of cases it added, removed or modified instead of a full
+regeneration. The delta file is applied in place by updater.Updater.sync, which
+resolves cases to suite rows through the suite's ID map (never by positional ID).
+"""
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .logger import log
+    from .matrix_engine import MatrixEngine
+    from .schema_loader import load_schema
+    from .traceability import element_key, match_keys
+except ImportError:
+    from logger import log
+    from matrix_engine import MatrixEngine
+    from schema_loader import load_schema
+    from traceability import element_key, match_keys
+
+DELTA_KIND = "impact_delta"
+# Case content compared for "modified" (IDs are positional; provenance, then content, is the match key)
+COMPARED_FIELDS = ("category", "title", "steps", "test_data", "expected", "priority")
+
+_ID = re.compile(r"^(TC-.+)-(\d+)$")
+
+
+def schema_elements(schema) -> Dict[str, Any]:
+    """ Element key -> model_dump() of every field, section (without its fields), rule and visual rule. """
+    elements = {}
+    for section in schema.sections:
+        elements[element_key(section)] = section.model_dump(exclude={"fields"})
+        for field in section.fields:
+            elements[element_key(field)] = dict(field.model_dump(), section=section.name)
+    for rule in schema.business_rules:
+        elements[element_key(rule)] = rule.model_dump()
+    for vis in schema.visual_rules:
+        elements[element_key(vis)] = vis.model_dump()
+    return elements
+
+
+def diff_schemas(old, new) -> Dict[str, List[str]]:
+    """ {"added", "removed", "changed"} element keys between two SmartSchemas. """
+    before, after = schema_elements(old), schema_elements(new)
+    return {
+        "added": [key for key in after if key not in before],
+        "removed": [key for key in before if key not in after],
+        "changed": [key for key in after if key in before and after[key] != before[key]]
+    }
+
+
+def id_allocator(ids: Iterable[str]):
+    """ New-ID allocator continuing each ID prefix after the highest number in ids. """
+    highest: Dict[str, Tuple[int, int]] = {}
+    for case_id in ids:
+        match = _ID.match(case_id or '')
+        if match:
+            prefix, number = match.group(1), match.group(2)
+            value, width = highest.get(prefix, (0, 3))
+            highest[prefix] = (max(value, int(number)), max(width, len(number)))
+
+    def allocate(tc) -> str:
+        prefix = f"TC-{tc['category'][:4].upper()}"
+        value, width = highest.get(prefix, (0, 3))
+        highest[prefix] = (value + 1, width)
+        return f"{prefix}-{value + 1:0{width}d}"
+    return allocate
+
+
+def case_delta(old_cases: List[Dict[str, Any]], new_cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Exact delta between two explosions, keyed by provenance (traceability.match_keys).
+    A case whose provenance changed but whose content did not (the engine's dedupe key,
+    e.g. a deduped case now credited to another rule) is relinked, not removed and re-added.
+    Entries address suite rows by "key"; Updater resolves keys through the suite's ID map
+    ("old_ids", the old explosion's IDs, stands in for a suite rendered without one).
+    "id" of added cases is provisional: Updater numbers them after the suite's own IDs.
+    """
+    before, after = match_keys(old_cases), match_keys(new_cases)
+
+    # Unmatched on both sides: pair on content before calling them removed / added
+    unmatched: Dict[str, List[str]] = {}
+    for key, tc in before.items():
+        if key not in after:
+            unmatched.setdefault(MatrixEngine._dedupe_key(tc), []).append(key)
+    relinked, moved_from = [], {}
+    for key, tc in after.items():
+        if key not in before:
+            candidates = unmatched.get(MatrixEngine._dedupe_key(tc))
+            if candidates:
+                old_key = moved_from[key] = candidates.pop(0)
+                relinked.append({"id": before[old_key]['id'], "from": old_key, "to": key})
+    gone = {key for keys in unmatched.values() for key in keys}
+    allocate = id_allocator(tc['id'] for tc in old_cases)
+
+    added, modified = [], []
+    for key, tc in after.items():
+        old = before.get(moved_from.get(key, key))
+        if old is None:
+            new_id = allocate(tc)
+            added.append({"id": new_id, "key": key, "case": dict(tc, id=new_id)})
+            continue
+        changes = {name: [old.get(name), tc.get(name)] for name in COMPARED_FIELDS if old.get(name) != tc.get(name)}
+        if changes:
+            modified.append({"id": old['id'], "key": key, "changes": changes, "case": dict(tc, id=old['id'])})
+    removed = [{"id": tc['id'], "key": key, "title": tc['title'], "source": tc.get('source', '')}
+               for key, tc in before.items() if key in gone]
+
+    return {
+        "summary": {
+            "added": len(added),
+            "removed": len(removed),
+            "modified": len(modified),
+            "relinked": len(relinked),
+            "unchanged": len(after) - len(added) - len(modified)
+        },
+        "added": added,
+        "removed": removed,
+        "modified": modified,
+        "relinked": relinked,
+        "old_ids": {key: tc['id'] for key, tc in before.items()}
+    }
+
+
+def compute_impact(old_schema, new_schema, seed: int = 0, cache_dir: Optional[str] = None, workers: int = 1) -> Dict[str, Any]:
+    """
+    [NEW v3.1] Schema diff + case delta of two SmartSchemas.
+    With cache_dir (the incremental explode cache), units unchanged between the two
+    schemas are expanded once and read back for the second explosion.
+    """
+    suites = []
+    for schema in (old_schema, new_schema):
+        engine = MatrixEngine(schema, seed)
+        cache = engine.open_cache(cache_dir) if cache_dir else None
+        suites.append(list(engine.iter_test_cases(workers, cache)))
+    return {"kind": DELTA_KIND, "seed": seed, "schema_changes": diff_schemas(old_schema, new_schema), **case_delta(*suites)}
+
+
+def run_impact(old_path: str, new_path: str, output_path: str = "output/impact_delta.json", seed: int = 0,
+               cache_dir: Optional[str] = None, workers: int = 1) -> bool:
+    log.info(f"🚀 Starting Phase: IMPACT ANALYSIS ({old_path} → {new_path})...")
+    for path in (old_path, new_path):
+        if not path or not os.path.exists(path):
+            log.error(f"❌ Schema file not found: {path}")
+            return False
+
+    try:
+        delta = compute_impact(load_schema(old_path), load_schema(new_path), seed, cache_dir, workers)
+    except Exception as e:
+        log.error(f"❌ Impact analysis failed: {e}")
+        return False
+    delta = {"old_schema": old_path, "new_schema": new_path, **delta}
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(delta, f, indent=2, ensure_ascii=False)
+
+    changes, summary = delta["schema_changes"], delta["summary"]
+    log.info(f"   🧩 Schema elements: +{len(changes['added'])} -{len(changes['removed'])} ~{len(changes['changed'])}")
+    log.info(f"   💥 Test cases: +{summary['added']} -{summary['removed']} ~{summary['modified']} ({summary['unchanged']} unchanged, {summary['relinked']} relinked)")
+    log.info(f"   ✅ Delta saved to: {output_path} (apply with --step sync --input {output_path} --target <suite.md>)")
+    return True
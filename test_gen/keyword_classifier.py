@@ -0,0 +1,98 @@
+"""
+Keyword Classifier
+Compiles a keyword -> label table (English + Vietnamese keywords) into one regex
+and classifies a text in a single scan, with the same substring semantics as
+the `"kw" in text.lower()` chains it replaces. PhraseMatcher does whole-word
+lookups for tables too large for one regex. Also provides seeded RNGs so
+test data picks are reproducible.
+"""
+import random
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class KeywordClassifier:
+    """
+    [NEW v3.1] table: ordered (label, keywords) pairs. Earlier labels win in first().
+    A keyword may appear anywhere in the text (substring match, case-insensitive).
+    """
+
+    def __init__(self, table: Sequence[Tuple[Any, Iterable[str]]]):
+        self.labels = [label for label, _ in table]
+        rank: Dict[str, Set[int]] = {}
+        for idx, (_, keywords) in enumerate(table):
+            for kw in keywords:
+                rank.setdefault(kw.lower(), set()).add(idx)
+
+        keywords = sorted(rank, key=len, reverse=True)
+        # A zero-width lookahead reports a match at EVERY position, so overlapping keywords are
+        # all seen; the captured keyword is the longest at that position, and the labels of
+        # shorter keywords that are prefixes of it are folded in below.
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))") if keywords else None
+        self._hits: Dict[str, Set[int]] = {
+            kw: set().union(*(rank[other] for other in rank if kw.startswith(other)))
+            for kw in keywords
+        }
+
+    def classify(self, text: str) -> List[Any]:
+        """ Every label with a keyword in text, in table order. """
+        if not self._pattern or not text:
+            return []
+        found: Set[int] = set()
+        for kw in self._pattern.findall(text.lower()):
+            found |= self._hits[kw]
+        return [self.labels[idx] for idx in sorted(found)]
+
+    def first(self, text: str) -> Optional[Any]:
+        """ Highest-priority label matched by text, or None. """
+        labels = self.classify(text)
+        return labels[0] if labels else None
+
+
+# Words of a phrase / text for PhraseMatcher (Unicode-aware, so Vietnamese names tokenize too)
+_WORD = re.compile(r"\w+")
+
+
+class PhraseMatcher:
+    """
+    [NEW v3.1] Whole-word phrase lookup for large tables (thousands of schema field
+    names and rule conditions), case-insensitive. Phrases are indexed by their word
+    tuple under their first word, so a text costs a dict lookup per word whatever
+    the size of the table; one regex alternation of every phrase grows with it.
+    """
+
+    def __init__(self, table: Sequence[Tuple[Any, Iterable[str]]]):
+        self.labels = [label for label, _ in table]
+        self._phrases: Dict[Tuple[str, ...], Set[int]] = {}
+        for idx, (_, phrases) in enumerate(table):
+            for phrase in phrases:
+                words = tuple(_WORD.findall(phrase.lower()))
+                if words:
+                    self._phrases.setdefault(words, set()).add(idx)
+        # First word -> distinct lengths (in words) of the phrases starting with it
+        lengths: Dict[str, Set[int]] = {}
+        for words in self._phrases:
+            lengths.setdefault(words[0], set()).add(len(words))
+        self._lengths = {word: sorted(ns) for word, ns in lengths.items()}
+
+    def classify(self, text: str) -> List[Any]:
+        """ Every label with a phrase in text (as whole words), in table order. """
+        if not self._phrases or not text:
+            return []
+        words = _WORD.findall(text.lower())
+        found: Set[int] = set()
+        for i, word in enumerate(words):
+            for n in self._lengths.get(word, ()):
+                hit = self._phrases.get(tuple(words[i:i + n]))
+                if hit:
+                    found |= hit
+        return [self.labels[idx] for idx in sorted(found)]
+
+
+def seeded_rng(seed, context: str) -> random.Random:
+    """
+    Reproducible RNG for one piece of context. Derived from the context instead of
+    a shared sequence, so picks do not depend on generation order (serial, parallel
+    and cached runs agree).
+    """
+    return random.Random(f"{seed}\x00{context}")
@@ -37,12 +37,13 @@ def run_prepare():
     
     log.info("✅ PREPARE Complete.")
 
-def run_format(prd=None, filename=None):
+RAW_TESTCASES = os.path.join("output", "raw_testcases.json")
+
+def run_format(prd=None, filename=None, profile_memory=None, raw_json=RAW_TESTCASES):
     log.info("🚀 Starting Phase: FORMAT...")
     
-    raw_json = os.path.join("output", "raw_testcases.json")
     if not os.path.exists(raw_json):
-        log.error("❌ raw_testcases.json not found.")
+        log.error(f"❌ {os.path.basename(raw_json)} not found.")
         return False
 
     # Call existing legacy formatter for now, or we could refactor it too.
@@ -50,6 +51,8 @@ def run_format(prd=None, filename=None):
     cmd = f"{sys.executable} -m test_gen.format_output --input {raw_json}"
     if filename:
         cmd += f" --filename {filename}"
+    if profile_memory is not None:
+        cmd += f" --profile-memory {profile_memory or os.path.join('output', 'format_memory.json')}"
     
     if prd:
         # If naming logic is needed
@@ -63,12 +66,11 @@ def run_format(prd=None, filename=None):
         log.error(f"❌ Format failed: {e}")
         return False
 
-def run_validate(schema_path):
+def run_validate(schema_path, testcases_path=RAW_TESTCASES):
     log.info("🚀 Starting Phase: VALIDATE...")
     
-    testcases_path = "output/raw_testcases.json"
     if not os.path.exists(testcases_path):
-        log.error("❌ raw_testcases.json not found.")
+        log.error(f"❌ {os.path.basename(testcases_path)} not found.")
         return False
     
     try:
@@ -111,10 +113,13 @@ def run_sync(new_path, existing_path):
     upd.sync(existing_path)
     return True
 
-def run_add(title, steps, expected, priority):
+def run_add(title, steps, expected, priority, file_path=RAW_TESTCASES, bulk_input=None):
     log.info("🚀 Starting Phase: ADD TEST CASE...")
+    if bulk_input:
+        from .manage import run_bulk_add
+        return run_bulk_add(bulk_input, file_path)
     from .manage import run_add_testcase
-    run_add_testcase(title, steps, expected, priority)
+    run_add_testcase(title, steps, expected, priority, file_path)
     return True
 
 def run_extract(prd_path):
@@ -123,16 +128,16 @@ def run_extract(prd_path):
     run_extraction(prd_path)
     return True
 
-def run_enrich():
+def run_enrich(input_path=RAW_TESTCASES):
     log.info("🚀 Starting Phase: HYPOTHESIS ENRICHMENT...")
     from .data_fuzzer import enrich_test_cases
-    return enrich_test_cases()
+    return enrich_test_cases(input_path)
 
 def main():
     setup_dirs()
     
     parser = argparse.ArgumentParser(description="Test Gen Orchestrator v2")
-    parser.add_argument("--step", choices=["prepare", "format", "validate", "report", "sync", "add", "extract", "init", "finish", "update-report", "enrich", "explode"], required=True)
+    parser.add_argument("--step", choices=["prepare", "format", "validate", "report", "sync", "add", "extract", "init", "finish", "update-report", "enrich", "explode", "minimize", "impact"], required=True)
     parser.add_argument("--prd", type=str, help="Path to PRD file")
     parser.add_argument("--filename", type=str, default="tc_001", help="Output filename for test cases")
     parser.add_argument("--input", type=str, help="Input file for report/sync")
@@ -146,6 +151,20 @@ def main():
     parser.add_argument("--priority", default="P2", help="Priority")
     
     parser.add_argument("--schema", type=str, default="output/schema_input.json", help="Schema path for explode step")
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size for explode step (1 = serial)")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Incremental explode: reuse per-section/rule output cached here")
+    parser.add_argument("--expander-stats", type=str, default=None, help="Explode: write per-expander calls/cases/time JSON to this path")
+    parser.add_argument("--near-dupes", type=float, default=None, metavar="THRESHOLD", help="Explode: also merge near-duplicate cases (MinHash similarity, e.g. 0.85); report saved next to the output")
+    parser.add_argument("--seed", type=int, default=0, help="Explode: seed for generated test data (same seed -> same suite)")
+    parser.add_argument("--max-cases", type=int, default=None, help="Explode: cap the suite at N cases (every P0 kept, the rest priority-weighted sampling)")
+    parser.add_argument("--category-budget", type=str, default=None, help="Explode: per-category caps, e.g. \"Security=50,UI/UX=20\"")
+    parser.add_argument("--minimized-output", type=str, default=None, help="Minimize: output path (default: <input>_minimized.json)")
+    parser.add_argument("--old", type=str, help="Impact: previous schema_input.json")
+    parser.add_argument("--new", type=str, help="Impact: revised schema_input.json")
+    parser.add_argument("--delta-output", type=str, default="output/impact_delta.json", help="Impact: delta file (apply with --step sync --input DELTA --target SUITE.md)")
+    parser.add_argument("--raw-testcases", type=str, default=RAW_TESTCASES, help="Raw test case file for explode/enrich/format/validate/add/minimize (.jsonl = JSON Lines, one case per line)")
+    parser.add_argument("--profile-memory", nargs="?", const="", default=None, metavar="PATH", help="Explode/format: tracemalloc report of peak memory and top allocation sites per phase (default: <output>_memory.json)")
+    parser.add_argument("--output-dir", type=str, default="output/exploded", help="Output directory for batch explode (--schema is a directory or glob)")
 
     args = parser.parse_args()
     
@@ -156,23 +175,40 @@ def main():
         run_prepare()
         run_extract(args.prd)
     elif args.step == "explode":
-        from .exploder import run_explode
-        success = run_explode(args.schema)
+        from .exploder import run_explode, run_explode_batch, is_batch_target
+        from .case_budget import parse_category_budget
+        category_budget = parse_category_budget(args.category_budget) if args.category_budget else None
+        if is_batch_target(args.schema):
+            success = run_explode_batch(args.schema, args.output_dir, workers=args.workers, cache_dir=args.cache_dir, near_dup_threshold=args.near_dupes, seed=args.seed,
+                                        max_cases=args.max_cases, category_budget=category_budget)
+        else:
+            success = run_explode(args.schema, args.raw_testcases, workers=args.workers, cache_dir=args.cache_dir, stats_path=args.expander_stats, near_dup_threshold=args.near_dupes, seed=args.seed,
+                                  max_cases=args.max_cases, category_budget=category_budget, profile_memory=args.profile_memory)
         if not success: sys.exit(1)
+    elif args.step == "minimize":
+        from .suite_minimizer import run_minimize
+        input_file = args.input or args.raw_testcases
+        if not run_minimize(input_file, args.minimized_output, schema_path=args.schema): sys.exit(1)
+    elif args.step == "impact":
+        if not (args.old and args.new):
+            log.error("❌ --old and --new are required for impact step")
+            sys.exit(1)
+        from .impact import run_impact
+        if not run_impact(args.old, args.new, args.delta_output, seed=args.seed, cache_dir=args.cache_dir, workers=args.workers): sys.exit(1)
     elif args.step == "finish":
         if not args.prd:
             log.error("❌ --prd is required for finish step")
             sys.exit(1)
         
         # 1. Enrich (NEW)
-        run_enrich() # Attempt to enrich before formatting
+        run_enrich(args.raw_testcases) # Attempt to enrich before formatting
 
         # 2. Format
-        fmt_success = run_format(args.prd, args.filename)
+        fmt_success = run_format(args.prd, args.filename, raw_json=args.raw_testcases)
         if not fmt_success: sys.exit(1)
             
         # 3. Validate
-        val_success = run_validate(args.prd)
+        val_success = run_validate(args.prd, args.raw_testcases)
         if not val_success: 
             log.warning("⚠️ Validation failed. Attempting Auto-Fix logic could go here.")
             # We don't exit here to allow Report to run if needed, or strictly exit?
@@ -183,14 +219,14 @@ def main():
     elif args.step == "prepare":
         run_prepare()
     elif args.step == "enrich":
-        run_enrich()
+        run_enrich(args.raw_testcases)
     elif args.step == "extract":
         if not args.prd:
             log.error("❌ --prd is required for extraction")
             sys.exit(1)
         run_extract(args.prd)
     elif args.step == "format":
-        run_format(args.prd, args.filename)
+        run_format(args.prd, args.filename, args.profile_memory, args.raw_testcases)
     elif args.step == "validate":
         if not (args.prd or args.schema):
              log.error("❌ Validations requires --prd OR --schema argument")
@@ -200,7 +236,7 @@ def main():
         # But ValidationEngine needs Schema Content ideally. 
         # For now, let's assume if Schema is passed, use it.
         source = args.schema if args.schema else args.prd
-        if not run_validate(source):
+        if not run_validate(source, args.raw_testcases):
             sys.exit(1)
     elif args.step == "report":
         input_file = args.input or "output/test_cases.md"
@@ -216,10 +252,13 @@ def main():
     elif args.step == "sync":
         run_sync(args.input, args.target)
     elif args.step == "add":
-        if not args.title:
-            log.error("❌ --title is required for add step")
+        if not (args.title or args.input):
+            log.error("❌ --title (or --input with a CSV/JSON of cases) is required for add step")
             sys.exit(1)
-        run_add(args.title, args.steps, args.expected, args.priority)
+        if args.input:
+            if not run_add(None, None, None, None, args.raw_testcases, bulk_input=args.input): sys.exit(1)
+        else:
+            run_add(args.title, args.steps, args.expected, args.priority, args.raw_testcases)
 
 if __name__ == "__main__":
     main()
@@ -1,22 +1,31 @@
+import csv
 import json
 import os
 import sys
 from datetime import datetime
 from .logger import log
+from .testcase_io import iter_test_cases, load_test_cases_document
+from .case_store import CaseStore, COMPACT_EVERY
 
 class TestManager:
-    def __init__(self, file_path="output/raw_testcases.json"):
+    """
+    [NEW v3.1] Adds go through an append-only CaseStore (case_store.py): one locked
+    append per call, so bulk adds are linear and concurrent `--step add` runs are safe.
+    raw_testcases.jsonl is appended to directly; raw_testcases.json gets a journal that
+    is compacted into the document every `compact_every` cases.
+    """
+    def __init__(self, file_path="output/raw_testcases.json", compact_every=COMPACT_EVERY):
         self.file_path = file_path
+        self.store = CaseStore(file_path, compact_every)
 
     def load_data(self):
         """Safely load JSON data with error reporting."""
-        if not os.path.exists(self.file_path):
+        if not os.path.exists(self.file_path) and not os.path.exists(self.store.journal):
             log.warning(f"⚠️ File not found: {self.file_path}. Creating new.")
             return {"test_cases": []}
-        
+
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_test_cases_document(self.file_path)
         except json.JSONDecodeError as e:
             log.error(f"❌ Corrupt JSON in {self.file_path}")
             log.error(f"   Line {e.lineno}, Column {e.colno}: {e.msg}")
@@ -31,32 +40,21 @@ class TestManager:
             return None
 
     def save_data(self, data):
-        """Safely save JSON data."""
+        """Safely save JSON data (replaces the file and its journal)."""
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.store.replace(data)
             log.info(f"✅ Saved to {self.file_path}")
             return True
         except Exception as e:
             log.error(f"❌ Failed to save JSON: {e}")
             return False
 
-    def add_testcase(self, title, steps=None, expected=None, priority="P2"):
-        """Add a new test case programmatically."""
-        data = self.load_data()
-        if data is None:
-            return False
-
-        if "test_cases" not in data:
-            data["test_cases"] = []
-
-        # Generate ID
-        new_id = f"TC-MANUAL-{len(data['test_cases']) + 1:03d}"
-        
-        new_tc = {
-            "id": new_id,
+    @staticmethod
+    def _new_testcase(title, steps=None, expected=None, priority="P2"):
+        return {
+            "id": "",
             "title": title,
-            "priority": priority,
+            "priority": priority or "P2",
             "steps": steps or [],
             "expected_result": expected or "",
             "type": "Manual",
@@ -64,14 +62,76 @@ class TestManager:
             "create_date": datetime.now().strftime('%Y-%m-%d')
         }
 
-        data["test_cases"].append(new_tc)
-        
-        if self.save_data(data):
-            log.info(f"✅ Added Test Case: {new_id} - {title}")
+    def add_testcases(self, cases):
+        """
+        [NEW v3.1] Bulk add: cases are dicts with title / steps / expected / priority.
+        All of them are appended in one locked write with sequential TC-MANUAL IDs.
+        Returns the added test cases ([] on failure).
+        """
+        new_cases = []
+        for case in cases:
+            if not case.get('title'):
+                log.warning(f"⚠️ Skipped case without a title: {case}")
+                continue
+            new_cases.append(self._new_testcase(case['title'], case.get('steps'),
+                                                case.get('expected', case.get('expected_result')), case.get('priority')))
+        if not new_cases:
+            return []
+
+        try:
+            self.store.append(new_cases, assign_id=lambda n: f"TC-MANUAL-{n:03d}")
+        except (OSError, ValueError) as e:
+            log.error(f"❌ Failed to append to {self.file_path}: {e}")
+            return []
+        return new_cases
+
+    def add_testcase(self, title, steps=None, expected=None, priority="P2"):
+        """Add a new test case programmatically."""
+        added = self.add_testcases([{"title": title, "steps": steps, "expected": expected, "priority": priority}])
+        if added:
+            log.info(f"✅ Added Test Case: {added[0]['id']} - {title}")
             return True
         return False
 
-def run_add_testcase(title, steps=None, expected=None, priority="P2"):
-    manager = TestManager()
+    def compact(self):
+        """[NEW v3.1] Folds the journal into the JSON document."""
+        moved = self.store.compact()
+        log.info(f"✅ Compacted {moved} journaled cases into {self.file_path}")
+        return moved
+
+def _split_steps(steps):
+    if isinstance(steps, str):
+        return [s.strip() for s in steps.split(";") if s.strip()]
+    return steps or []
+
+def load_bulk_cases(path):
+    """
+    [NEW v3.1] Cases to add from a CSV (columns: title, steps, expected, priority;
+    steps separated by ';' as with --steps), a JSON list / {"test_cases": [...]} or JSON Lines.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            cases = [dict(row) for row in csv.DictReader(f)]
+    else:
+        cases = list(iter_test_cases(path))
+    for case in cases:
+        case['steps'] = _split_steps(case.get('steps'))
+    return cases
+
+def run_add_testcase(title, steps=None, expected=None, priority="P2", file_path="output/raw_testcases.json"):
+    manager = TestManager(file_path)
     steps_list = steps.split(";") if steps else []
     return manager.add_testcase(title, steps_list, expected, priority)
+
+def run_bulk_add(input_path, file_path="output/raw_testcases.json"):
+    """[NEW v3.1] --step add --input cases.csv|json|jsonl"""
+    if not os.path.exists(input_path):
+        log.error(f"❌ Input file not found: {input_path}")
+        return False
+    manager = TestManager(file_path)
+    added = manager.add_testcases(load_bulk_cases(input_path))
+    if not added:
+        log.warning("⚠️ No test cases added.")
+        return False
+    log.info(f"✅ Added {len(added)} Test Cases: {added[0]['id']} .. {added[-1]['id']}")
+    return True
@@ -1,74 +1,129 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Sequence, TextIO
 import datetime
+import io
+
+# Report cells escaped in one str.translate pass: a pipe would end the cell, a newline the row
+CELL_ESCAPE = str.maketrans({"|": "&#124;", "\n": "<br>"})
+
+def write_pipe_table(f: TextIO, headers: Sequence[str], rows: Iterable[Sequence[Any]], escape: dict = CELL_ESCAPE) -> int:
+    """
+    [NEW v3.1] Streams a GitHub pipe table to f, one row at a time.
+    Cells go through a single translate table (escape) and are not padded to column width.
+    Returns the number of rows written.
+    """
+    f.write("| " + " | ".join(headers) + " |\n")
+    f.write("| " + " | ".join([":---"] * len(headers)) + " |\n")
+    count = 0
+    for row in rows:
+        f.write("| " + " | ".join(str(col).translate(escape) for col in row) + " |\n")
+        count += 1
+    return count
+
+STATUS_CHECKBOXES = '[ ] Pass / [ ] Fail / [ ] Skip / [ ] Blocked'
+PRIORITIES = ("P0", "P1", "P2", "P3")
+
+def _status_display(tc: Dict[str, Any]) -> str:
+    # Format status for execution context
+    status_raw = tc.get('status', '')
+    if status_raw in ['New', '[ ]', '']:
+        return STATUS_CHECKBOXES
+    return status_raw
+
+def _count_priorities(*groups: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """ Dashboard pre-pass: first of P0..P3 contained in each case's priority. """
+    counts = dict.fromkeys(PRIORITIES, 0)
+    for group in groups:
+        for tc in group:
+            p = str(tc.get('priority', '')).upper()
+            for level in PRIORITIES:
+                if level in p:
+                    counts[level] += 1
+                    break
+    return counts
 
 def generate_markdown_report(data: Dict[str, Any]) -> str:
     """
     Generate the test case markdown report directly using Python string manipulation.
     This avoids Jinja2 template issues entirely.
+    [NEW v3.1] Thin wrapper over write_markdown_report; write to a file instead for large suites.
     """
-    lines = []
-    
+    buffer = io.StringIO()
+    write_markdown_report(data, buffer)
+    # Lines used to be joined with "\n": no newline after the last one
+    return buffer.getvalue()[:-1]
+
+def write_markdown_report(data: Dict[str, Any], f: TextIO) -> int:
+    """
+    [NEW v3.1] Streams the test case report to any text stream, table row by table row.
+    The dashboard comes from a counting pre-pass, so no part of the report is held in memory.
+    Returns the number of test case rows written.
+    """
+    functional = data.get('functional_testcases', [])
+    non_functional = data.get('non_functional_testcases', [])
+
+    def lines(*items: str):
+        for line in items:
+            f.write(line + "\n")
+
     # --- HEADER ---
-    lines.append("# 📘 TÀI LIỆU TEST CASE - Test Cases")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append("**Thông tin chung:**")
-    lines.append("")
-    lines.append(f"- **Feature:** {data.get('feature_name', 'Test Cases')}")
-    lines.append(f"- **Phiên bản PRD:** {data.get('prd_version', '1.0.0')}")
-    lines.append(f"- **Ngày tạo:** {datetime.datetime.now().strftime('%Y-%m-%d')}")
-    lines.append("- **Người thực hiện:** QA Team")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    lines(
+        "# 📘 TÀI LIỆU TEST CASE - Test Cases",
+        "",
+        "---",
+        "",
+        "**Thông tin chung:**",
+        "",
+        f"- **Feature:** {data.get('feature_name', 'Test Cases')}",
+        f"- **Phiên bản PRD:** {data.get('prd_version', '1.0.0')}",
+        f"- **Ngày tạo:** {datetime.datetime.now().strftime('%Y-%m-%d')}",
+        "- **Người thực hiện:** QA Team",
+        "",
+        "---",
+        "",
+    )
 
     # --- DASHBOARD ---
-    lines.append("## I. THỐNG KÊ TỔNG QUAN (DASHBOARD)")
-    lines.append("")
-    lines.append("### 1. Tổng hợp số lượng")
-    lines.append("")
-    lines.append("| Chỉ số | Giá trị |")
-    lines.append("| :--- | :--- |")
-    
-    total_tc = len(data.get('functional_testcases', [])) + len(data.get('non_functional_testcases', []))
-    lines.append(f"| **Tổng số Test Case** | **{total_tc}** |")
-    lines.append(f"| Functional (Chức năng) | {len(data.get('functional_testcases', []))} |")
-    lines.append(f"| Non-Functional (Phi chức năng) | {len(data.get('non_functional_testcases', []))} |")
-    lines.append("")
+    total_tc = len(functional) + len(non_functional)
+    lines(
+        "## I. THỐNG KÊ TỔNG QUAN (DASHBOARD)",
+        "",
+        "### 1. Tổng hợp số lượng",
+        "",
+        "| Chỉ số | Giá trị |",
+        "| :--- | :--- |",
+        f"| **Tổng số Test Case** | **{total_tc}** |",
+        f"| Functional (Chức năng) | {len(functional)} |",
+        f"| Non-Functional (Phi chức năng) | {len(non_functional)} |",
+        "",
+    )
 
-    # Additional dashboard logic (Priority distribution) can be calculated here...
-    
-    lines.append("### 2. Phân bố mức độ ưu tiên")
-    lines.append("")
-    # Calculate Stats
-    p0 = p1 = p2 = p3 = 0
-    all_tcs = data.get('functional_testcases', []) + data.get('non_functional_testcases', [])
-    for tc in all_tcs:
-        p = str(tc.get('priority', '')).upper()
-        if 'P0' in p: p0 += 1
-        elif 'P1' in p: p1 += 1
-        elif 'P2' in p: p2 += 1
-        elif 'P3' in p: p3 += 1
+    # Priority distribution
+    counts = _count_priorities(functional, non_functional)
             
     def _pct(val, total): 
         return f"{(val/total)*100:.1f}%" if total > 0 else "0.0%"
         
-    lines.append("| Mức độ | Số lượng | Tỷ lệ (%) |")
-    lines.append("| :--- | :--- | :--- |")
-    lines.append(f"| **P0 (Critical - Blocker)** | {p0} | {_pct(p0, total_tc)} |")
-    lines.append(f"| **P1 (Cao - High)** | {p1} | {_pct(p1, total_tc)} |")
-    lines.append(f"| **P2 (Trung bình - Medium)** | {p2} | {_pct(p2, total_tc)} |")
-    lines.append(f"| **P3 (Thấp - Low)** | {p3} | {_pct(p3, total_tc)} |")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    lines(
+        "### 2. Phân bố mức độ ưu tiên",
+        "",
+        "| Mức độ | Số lượng | Tỷ lệ (%) |",
+        "| :--- | :--- | :--- |",
+        f"| **P0 (Critical - Blocker)** | {counts['P0']} | {_pct(counts['P0'], total_tc)} |",
+        f"| **P1 (Cao - High)** | {counts['P1']} | {_pct(counts['P1'], total_tc)} |",
+        f"| **P2 (Trung bình - Medium)** | {counts['P2']} | {_pct(counts['P2'], total_tc)} |",
+        f"| **P3 (Thấp - Low)** | {counts['P3']} | {_pct(counts['P3'], total_tc)} |",
+        "",
+        "---",
+        "",
+    )
 
     # --- FUNCTIONAL TABLE ---
-    lines.append("## II. KIỂM THỬ CHỨC NĂNG (FUNCTIONAL TESTING)")
-    lines.append("")
-    lines.append("Dưới đây là danh sách chi tiết các kịch bản kiểm thử nghiệp vụ.")
-    lines.append("")
+    lines(
+        "## II. KIỂM THỬ CHỨC NĂNG (FUNCTIONAL TESTING)",
+        "",
+        "Dưới đây là danh sách chi tiết các kịch bản kiểm thử nghiệp vụ.",
+        "",
+    )
     
     # Table Header - 11 Columns
     headers = [
@@ -76,51 +131,35 @@ def generate_markdown_report(data: Dict[str, Any]) -> str:
         "Test Data", "Expected Result", "Status", "Priority", 
         "Create Date", "Execute Date"
     ]
-    lines.append("| " + " | ".join(headers) + " |")
-    lines.append("| " + " | ".join([":---"] * len(headers)) + " |")
-
-    for tc in data.get('functional_testcases', []):
-        # Format status for execution context
-        status_raw = tc.get('status', '')
-        status_display = status_raw
-        if status_raw in ['New', '[ ]', '']:
-             status_display = '[ ] Pass / [ ] Fail / [ ] Skip / [ ] Blocked'
-
-        row = [
-            tc.get('id', ''),
-            tc.get('module', ''),
-            tc.get('title', ''),
-            tc.get('pre_condition', '-'),
-            tc.get('steps_short', ''),
-            tc.get('test_data', '-'),
-            tc.get('expected_result') or tc.get('expected', ''),
-            status_display,
-            tc.get('priority', ''),
-            tc.get('created_date', ''),
-            tc.get('execute_date', '')
-        ]
-        # Escape pipes in content just in case
-        row = [str(col).replace('|', '&#124;').replace('\n', '<br>') for col in row]
-        lines.append("| " + " | ".join(row) + " |")
+    written = write_pipe_table(f, headers, ([
+        tc.get('id', ''),
+        tc.get('module', ''),
+        tc.get('title', ''),
+        tc.get('pre_condition', '-'),
+        tc.get('steps_short', ''),
+        tc.get('test_data', '-'),
+        tc.get('expected_result') or tc.get('expected', ''),
+        _status_display(tc),
+        tc.get('priority', ''),
+        tc.get('created_date', ''),
+        tc.get('execute_date', '')
+    ] for tc in functional))
     
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    lines("", "---", "")
 
     # --- NON-FUNCTIONAL TABLE ---
-    lines.append("## III. KIỂM THỬ PHI CHỨC NĂNG (NON-FUNCTIONAL TESTING)")
-    lines.append("")
-    lines.append("### 1. Phạm vi kiểm thử")
-    lines.append("")
+    lines(
+        "## III. KIỂM THỬ PHI CHỨC NĂNG (NON-FUNCTIONAL TESTING)",
+        "",
+        "### 1. Phạm vi kiểm thử",
+        "",
+    )
     categories = data.get('nft_categories', [])
     all_cats = ["Functional", "Performance", "Security", "Visual", "Availability", "Reliability", "Usability", "Accessibility", "Compatibility", "Analytics"]
     for cat in all_cats:
         mark = "x" if cat in categories else " "
-        lines.append(f"- [{mark}] **{cat}**")
-    lines.append("")
-    
-    lines.append("### 2. Danh sách Test Case chi tiết")
-    lines.append("")
+        lines(f"- [{mark}] **{cat}**")
+    lines("", "### 2. Danh sách Test Case chi tiết", "")
     
     # Table Header - 10 Columns for NF to match Functional style where applicable
     headers_nf = [
@@ -128,46 +167,32 @@ def generate_markdown_report(data: Dict[str, Any]) -> str:
         "Pass Criteria", "Status", "Priority", 
         "Create Date", "Execute Date"
     ]
-    
-    lines.append("| " + " | ".join(headers_nf) + " |")
-    lines.append("| " + " | ".join([":---"] * len(headers_nf)) + " |")
+    written += write_pipe_table(f, headers_nf, ([
+        tc.get('id', ''),
+        tc.get('category', ''),
+        tc.get('title', ''),
+        tc.get('tools', '-') or tc.get('pre_condition', '-'),
+        tc.get('steps_short', ''),
+        tc.get('pass_criteria') or tc.get('expected_result') or tc.get('expected', ''),
+        _status_display(tc),
+        tc.get('priority', ''),
+        tc.get('created_date', ''),
+        tc.get('execute_date', '')
+    ] for tc in non_functional))
 
-    for tc in data.get('non_functional_testcases', []):
-        # Format status for execution context
-        status_raw = tc.get('status', '')
-        status_display = status_raw
-        if status_raw in ['New', '[ ]', '']:
-             status_display = '[ ] Pass / [ ] Fail / [ ] Skip / [ ] Blocked'
-             
-        row = [
-            tc.get('id', ''),
-            tc.get('category', ''),
-            tc.get('title', ''),
-            tc.get('tools', '-') or tc.get('pre_condition', '-'),
-            tc.get('steps_short', ''),
-            tc.get('pass_criteria') or tc.get('expected_result') or tc.get('expected', ''),
-            status_display,
-            tc.get('priority', ''),
-            tc.get('created_date', ''),
-            tc.get('execute_date', '')
-        ]
-        row = [str(col).replace('|', '&#124;').replace('\n', '<br>') for col in row]
-        lines.append("| " + " | ".join(row) + " |")
-
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    lines("", "---", "")
     
     # --- BUG TRACKING ---
-    lines.append("## IV. GHI CHÚ & THEO DÕI LỖI (BUG TRACKING)")
-    lines.append("")
-    lines.append("_(Phần này dành cho Tester ghi chú thủ công khi chạy test)_")
-    lines.append("")
-    lines.append("### Danh sách Bug phát hiện:")
-    lines.append("")
-    lines.append("| Bug ID | Liên kết (Jira/Issue) | Mức độ nghiêm trọng | Trạng thái |")
-    lines.append("| :--- | :--- | :--- | :--- |")
-    lines.append("| | | | |")
-    lines.append("| | | | |")
-
-    return "\n".join(lines)
+    lines(
+        "## IV. GHI CHÚ & THEO DÕI LỖI (BUG TRACKING)",
+        "",
+        "_(Phần này dành cho Tester ghi chú thủ công khi chạy test)_",
+        "",
+        "### Danh sách Bug phát hiện:",
+        "",
+        "| Bug ID | Liên kết (Jira/Issue) | Mức độ nghiêm trọng | Trạng thái |",
+        "| :--- | :--- | :--- | :--- |",
+        "| | | | |",
+        "| | | | |",
+    )
+    return written
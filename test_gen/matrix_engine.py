@@ -1,8 +1,135 @@
-from typing import List, Dict, Any
+import hashlib
+import time
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 try:
     from .schema_models import SmartSchema, FieldType, BusinessRule, VisualRule
+    from .title_translator import get_translator
+    from .explode_cache import ExplosionCache
+    from .expander_registry import ExpanderRegistry, ExpanderStats, merge_stats, stats_report
+    from .covering_array import covering_array
+    from .near_dedupe import NearDuplicateFilter
+    from .keyword_classifier import KeywordClassifier, seeded_rng
+    from .rule_features import RuleFeatureIndex
+    from .traceability import GLOBAL_ELEMENT, element_key, format_source
 except ImportError:
     from schema_models import SmartSchema, FieldType, BusinessRule, VisualRule
+    from title_translator import get_translator
+    from explode_cache import ExplosionCache
+    from expander_registry import ExpanderRegistry, ExpanderStats, merge_stats, stats_report
+    from covering_array import covering_array
+    from near_dedupe import NearDuplicateFilter
+    from keyword_classifier import KeywordClassifier, seeded_rng
+    from rule_features import RuleFeatureIndex
+    from traceability import GLOBAL_ELEMENT, element_key, format_source
+
+class TestCaseRecord:
+    """
+    [NEW v3.1] Compact in-engine test case (a slotted object is ~3x smaller than a 7-key dict).
+    Repeated strings ("Accepted.", "Handled safely.", "-", ...) are shared via share_strings().
+    Supports tc['field'] access so existing dict-based code keeps working; convert with
+    to_dict() only at the serialization boundary.
+    """
+    __slots__ = ("id", "category", "title", "steps", "test_data", "expected", "priority", "source")
+
+    # Field order of the serialized dict (legacy dict layout + provenance, see traceability.py)
+    FIELDS = ("id", "category", "title", "steps", "test_data", "expected", "priority", "source")
+    SHARED = ("category", "steps", "test_data", "expected", "priority")
+
+    def __init__(self, id: str, category: str, title: str, steps: str, test_data: str, expected: str, priority: str, source: str = ""):
+        self.id = id
+        self.category = category
+        self.title = title
+        self.steps = steps
+        self.test_data = test_data
+        self.expected = expected
+        self.priority = priority
+        self.source = source
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def share_strings(self, pool: Dict[str, str]):
+        """ Swaps repeated field values for the single instance kept in pool. """
+        for name in self.SHARED:
+            value = getattr(self, name)
+            setattr(self, name, pool.setdefault(value, value))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    # Compact pickling for the process pool (parallel explosion)
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.FIELDS, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"TestCaseRecord({self.id!r}, {self.title!r})"
+
+
+def _is_filter_section(section) -> bool:
+    return "filter" in section.name.lower() or "search" in section.name.lower()
+
+
+def _default_registry() -> ExpanderRegistry:
+    """ [NEW v3.1] Built-in expanders, in the order generate_all has always run them. """
+    registry = ExpanderRegistry()
+
+    # --- Type Specific Expansion (dispatched by _expand_field) ---
+    registry.register_field_type(["text", "password", "textarea"], "_expand_text")
+    registry.register_field_type("email", "_expand_email")
+    registry.register_field_type("number", "_expand_number")
+    registry.register_field_type(["select", "radio"], "_expand_enum")
+    registry.register_field_type(["chart", "list", "label", "text_display"], "_expand_display")
+    registry.register_field_type("table", "_expand_table")
+    registry.register_field_type("tree_view", "_expand_tree_view")
+    registry.register_field_type("kanban_board", "_expand_kanban")
+    registry.register_field_type("permission_matrix", "_expand_permission_matrix")
+    registry.register_field_type("tabs", "_expand_tabs")
+    registry.register_field_type("file_upload", "_expand_file_upload")
+    registry.register_field_type("formula", "_expand_formula")
+    registry.register_field_type("relationship", "_expand_relationship")
+    registry.register_field_type("complex_view", "_expand_complex_view")
+
+    # 1. Expand Field Validations
+    # [NEW] Filter Combinations
+    registry.register("section", "_expand_filter_combinations", when=_is_filter_section)
+    registry.register("section", "_expand_search_advanced", when=_is_filter_section) # [NEW v2.2]
+    # [NEW] Dependency Logic
+    registry.register("section", "_expand_dependency_logic")
+    registry.register("section", "_expand_ui_ux_gaps") # [NEW v2.2]
+
+    registry.register("field", "_expand_field", args=lambda field, section: (field, section.name))
+    registry.register("field", "_expand_smart_actions") # [NEW] Smart Actions Check
+    registry.register("field", "_expand_detail_popup")  # [NEW v2.3] Detail Popup Check
+
+    # 2. Convert Business Rules (Upgraded)
+    registry.register("rule", "_convert_rule_v2")
+    # [NEW] Semantic Explosion
+    registry.register("rule", "_expand_roles_permissions")
+    registry.register("rule", "_expand_security_implicit") # [NEW v2.2]
+    registry.register("rule", "_expand_approval_flows")    # [UPDATED v2.2]
+    registry.register("rule", "_expand_concurrency")
+
+    # 3. Convert Visual Rules
+    registry.register("visual", "_convert_visual")
+
+    # 4. Add E2E Flows & 5. Add Global Compatibility
+    registry.register("global", "_add_e2e_flows")
+    registry.register("global", "_add_global_compatibility")
+    return registry
+
 
 class MatrixEngine:
     """
@@ -10,9 +137,26 @@ class MatrixEngine:
     Applies BVA (Boundary Value Analysis), Equivalence Partitioning, and Security Baselines.
     """
     
-    def __init__(self, schema: SmartSchema):
+    # Bump whenever expander output changes: invalidates the incremental explode cache
+    ENGINE_VERSION = "3.4"
+
+    # [NEW v3.1] Expander dispatch table. Subclasses plug in expanders with
+    # `registry = MatrixEngine.registry.copy().register(...)`
+    registry = _default_registry()
+
+    def __init__(self, schema: SmartSchema, seed: int = 0):
         self.schema = schema
+        # [NEW v3.1] Seed for test data picks: same seed -> same suite
+        self.seed = seed
         self.test_cases = []
+        # [NEW v3.1] Compiled once per process, shared by every engine instance
+        self.translator = get_translator(self.TITLE_TRANSLATIONS, self.UNTRANSLATED_PREFIXES)
+        # [NEW v3.1] Per-expander calls / produced cases / seconds (see expander_report)
+        self.expander_stats: Dict[str, ExpanderStats] = {}
+        # [NEW v3.1] Every business rule classified once (roles, negative, status, flow...)
+        self.rule_features = RuleFeatureIndex(schema.business_rules)
+        # [NEW v3.1] (element key, expander) of the running expander -> provenance of the cases it adds
+        self._source = (GLOBAL_ELEMENT, "")
 
     def _expand_filter_combinations(self, section):
         """
@@ -33,15 +177,28 @@ class MatrixEngine:
                          "1. Apply multiple filters.\n2. Click 'Clear' or 'Reset'.", 
                          "All filters reset to default. List shows all records.", "P2")
 
-            # 3. [NEW] Pairwise Combinations (up to 10 pairs to avoid explosion)
-            import itertools
-            start_idx = 0
-            for pair in itertools.combinations([f.name for f in filter_fields], 2):
-                if start_idx >= 10: break
-                self._add_tc("Business Logic", f"Verify {section.name} - Combined Filter: {pair[0]} + {pair[1]}",
-                             f"1. Select {pair[0]}.\n2. Select {pair[1]}.\n3. Apply Filter.",
-                             "List shows records matching BOTH criteria.", "P2")
-                start_idx += 1
+            # 3. [UPGRADED v3.2] Pairwise covering array over the filters' actual option values:
+            # every value pair of every two filters is exercised in a near-minimal number of cases
+            domains = [self._filter_values(f) for f in filter_fields]
+            rows = covering_array(domains, strength=2)
+            for idx, row in enumerate(rows, 1):
+                steps = [f"{i}. Set {f.name} = '{value}'." for i, (f, value) in enumerate(zip(filter_fields, row), 1)]
+                steps.append(f"{len(steps) + 1}. Apply Filter.")
+                self._add_tc("Business Logic", f"Verify {section.name} - Pairwise Filter Combination {idx}/{len(rows)}",
+                             "\n".join(steps),
+                             "List shows only records matching ALL selected values.", "P2")
+
+    @staticmethod
+    def _filter_values(field: FieldType) -> List[str]:
+        """ Values a filter can take: `options`, else `extra_props.options`, else one representative value. """
+        options = field.options or (field.extra_props or {}).get("options")
+        if options:
+            return [str(opt) for opt in options]
+        if field.type == "date":
+            return ["Valid date range"]
+        if field.type == "text":
+            return ["Matching keyword"]
+        return ["Any valid option"]
 
     def _get_rule_summary(self, text: str) -> str:
         """ Helper: Extracts a short summary from rule description (e.g. before the first colon). """
@@ -183,30 +340,19 @@ class MatrixEngine:
         "or": "hoặc",
     }
 
+    # Titles with these prefixes are already Vietnamese (see _generate_positive_title)
+    UNTRANSLATED_PREFIXES = ("BR-", "LOGIN-", "CHECKOUT-")
+
+    # Targets of the global compatibility checks
+    COMPAT_BROWSERS = ("Chrome", "Firefox", "Safari", "Edge")
+    COMPAT_DEVICES = ("iPhone 14 (Mobile)", "Samsung Galaxy S22", "Desktop 1920x1080")
+
     def _translate_title_to_vietnamese(self, english_title: str) -> str:
         """
         Auto-translate test case title from English to Vietnamese.
-        Uses keyword mapping for common test case patterns.
+        Uses keyword mapping for common test case patterns (see TitleTranslator).
         """
-        import re
-        
-        # Keep BR-XXX prefix intact
-        if english_title.startswith(("BR-", "LOGIN-", "CHECKOUT-")):
-            return english_title  # Already Vietnamese from _generate_positive_title
-        
-        # Translate piece by piece
-        vietnamese_title = english_title
-        
-        # Sort by length (longer first to match phrases before words)
-        sorted_translations = sorted(self.TITLE_TRANSLATIONS.items(), key=lambda x: len(x[0]), reverse=True)
-        
-        for english, vietnamese in sorted_translations:
-            # Use word boundary regex to prevent mid-word replacements
-            # e.g., 'on' should match ' on ' but not 'Option'
-            pattern = r'\b' + re.escape(english) + r'\b'
-            vietnamese_title = re.sub(pattern, vietnamese, vietnamese_title, flags=re.IGNORECASE)
-        
-        return vietnamese_title
+        return self.translator.translate(english_title)
 
     def _generate_positive_title(self, rule: BusinessRule) -> str:
         """
@@ -214,7 +360,6 @@ class MatrixEngine:
         CRITICAL: Must handle all 13 BRs uniquely to avoid confusion for non-technical QC.
         """
         rid = rule.id.upper() if rule.id else ""
-        desc = rule.description.lower()
         
         # === FILTER & UI RULES ===
         if "BR-001" in rid:  # Regional filter dependency
@@ -302,25 +447,23 @@ class MatrixEngine:
                     f"Result: {rule.expected_result}",
                     "P0")
         
+        features = self.rule_features.get(rule)
+
         # Scenario 2: Negative Case
-        keywords = ["not", "cannot", "invalid", "blocked", "disabled", "prohibited", "error", "fail"]
-        if any(keyword in rule.description.lower() for keyword in keywords):
+        if features.negative:
             self._add_tc("Business Logic", violation_title, 
                      f"Condition: Violate '{rule.condition}'", 
                      "Result: Action blocked / Error message displayed.", 
                      priority="P2")
 
         # Scenario 3: State Transition (if detected)
-        if "status" in rule.expected_result.lower() or "trạng thái" in rule.expected_result.lower():
+        if features.status_change:
             # Generate state-specific title
-            rid = rule.id.upper() if rule.id else ""
-            result_lower = rule.expected_result.lower()
-            
-            if "rejected" in result_lower:
+            if features.state == "rejected":
                 state_title = "Verify trạng thái chuyển sang 'Rejected'"
-            elif "approved" in result_lower:
+            elif features.state == "approved":
                 state_title = "Verify trạng thái chuyển sang 'Approved'"
-            elif "completed" in result_lower:
+            elif features.state == "completed":
                 state_title = "Verify Legal Category chuyển sang 'Completed'"
             else:
                 state_title = f"Verify cập nhật trạng thái: {rule.expected_result}"
@@ -346,8 +489,7 @@ class MatrixEngine:
 
     def _expand_roles_permissions(self, rule: BusinessRule):
         """ [NEW] Generates Role-Based Access Control (RBAC) tests """
-        roles = ["Manager", "Creator", "Approver", "Admin", "User", "Quản lý", "Người tạo", "Người duyệt", "Phụ trách"]
-        found_roles = [r for r in roles if r.lower() in rule.description.lower()]
+        found_roles = self.rule_features.get(rule).roles
         
         if found_roles:
             for role in found_roles:
@@ -368,28 +510,26 @@ class MatrixEngine:
         CRITICAL: Only BR-004, BR-006, BR-007 should trigger flow generation.
         BR-008 and BR-009 are NOT about flows, so they skip this function.
         """
-        rid = rule.id or ""
-        desc = rule.description.lower()
-        
         # ONLY expand flows for rules that are SPECIFICALLY about multi-level workflows
         # BR-008 (same-level approver logic) and BR-009 (role-based visibility) are NOT flow rules!
-        if rid not in ["BR-004", "BR-006", "BR-007"]:
-            return  # Skip - not a flow rule
+        flow = self.rule_features.get(rule).flow
+        if flow is None:
+            return  # Skip - not a flow rule (see rule_features.FLOW_RULES)
         
         # Generate flow-specific test cases with descriptive Vietnamese titles (NO BR-XXX)
-        if rid == "BR-004":  # Rejection workflow
+        if flow == "rejection":  # BR-004: Rejection workflow
             self._add_tc("Business Logic", "Quy trình từ chối: Level 2 từ chối → Request 'Rejected', Legal quay về 'In Progress'",
                         "1. Level 1 Approve.\n2. Level 2 REJECT.",
                         "Status reverts to In Progress/Rejected.",
                         "P1")
         
-        elif rid == "BR-006":  # Single-level approval
+        elif flow == "single_level":  # BR-006: Single-level approval
             self._add_tc("Business Logic", "Workflow 1 cấp duy nhất: Approve xong → Legal chuyển 'Completed' ngay",
                         "1. Request is Single Level.\n2. Approver Approves.",
                         "Status changes quickly to 'Completed'.",
                         "P1")
         
-        elif rid == "BR-007":  # Sequential approval
+        elif flow == "sequential":  # BR-007: Sequential approval
             self._add_tc("Business Logic", "Quy trình tuần tự: Level 1 chưa duyệt → Nút Level 2 bị disabled",
                         "1. Level 1 Pending.\n2. Try to Approve as Level 2.",
                         "Action Blocked / Button Disabled.",
@@ -399,20 +539,6 @@ class MatrixEngine:
                         "Status changes to 'Pending Level 2', then 'Approved/Completed'.",
                         "P1")
 
-    def _expand_concurrency(self, rule: BusinessRule):
-        """ [NEW] Generates Concurrency/Group Logic """
-        rid = rule.id.upper() if rule.id else ""
-        desc = rule.description.lower()
-        
-        # BR-003: Multi-role aggregation OR BR-008/010: Same-level approver logic
-        if any(k in desc for k in ["any", "all", "đồng thuận", "nhóm", "group", "cùng 1 cấp", "same-level"]):
-             self._add_tc("Business Logic", "Cùng cấp có nhiều approver: User A duyệt trước → User B không cần thao tác nữa", 
-                     "1. User A (Group 1) approves.\n2. User B (Group 1) views request.", 
-                     "User B sees request as 'Approved' (No action needed).", "P1")
-             self._add_tc("Business Logic", "Cùng cấp: 2 user bấm Approve đồng thời → Hệ thống xử lý không conflict", 
-                     "1. User A and User B click 'Approve' at exact same time.", 
-                     "System handles race condition (Single success or Idempotent).", "P2")
-
     def _expand_search_advanced(self, section):
         """ [NEW v2.2] Explodes Search Scenarios (Multi-select, Dropdown Search, Advanced Keyword) """
         for field in section.fields:
@@ -469,8 +595,7 @@ class MatrixEngine:
 
     def _expand_security_implicit(self, rule: BusinessRule):
          """ [NEW v2.2] Implicit Negative Security cases """
-         desc = rule.description.lower()
-         if "permission" in desc or "quyền" in desc:
+         if self.rule_features.get(rule).permission:
              # Add explicit Unauthorized checks for non-approvers
              self._add_tc("Security", "Truy cập trái phép: Project Lead (không phải Approver) cố duyệt → Bị chặn", 
                      "1. Login as 'Project Lead' (Non-Approver).\n2. Try to Approve/Reject.", 
@@ -486,8 +611,7 @@ class MatrixEngine:
     def _expand_concurrency(self, rule: BusinessRule):
         """ [NEW] Generates Concurrency/Group Logic """
         # [FIXED v2.3] Removed duplicate approval flow generation
-        desc = rule.description.lower()
-        if any(k in desc for k in ["any", "all", "đồng thuận", "nhóm", "group", "cùng 1 cấp"]):
+        if self.rule_features.get(rule).group:
              self._add_tc("Business Logic", "Cùng cấp có nhiều approver: User A duyệt trước → User B không cần thao tác nữa", 
                      "1. User A (Group 1) approves.\n2. User B (Group 1) views request.", 
                      "User B sees request as 'Approved' (No action needed).", "P1")
@@ -513,28 +637,33 @@ class MatrixEngine:
                      f"1. Change value in '{parent}'.", 
                      f"'{field.name}' resets or updates options.", "P2")
 
-    def deduplicate_test_cases(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _dedupe_key(tc: Dict[str, Any]) -> str:
+        """ Semantic key: Title + Steps (normalized) + Expected Result. """
+        # Normalize steps to ignore minor formatting differences
+        norm_steps = " ".join(tc['steps'].split()).lower()
+        norm_expected = " ".join(tc['expected'].split()).lower()
+        
+        # Key focuses on the CORE LOGIC, not the random ID
+        return f"{tc['title']}|{norm_steps}|{norm_expected}"
+
+    def deduplicate_test_cases(self, test_cases: List[Dict[str, Any]], near_dupes: Optional[NearDuplicateFilter] = None) -> List[Dict[str, Any]]:
         """
         [NEW v3.0] Remove duplicate test cases based on semantic similarity.
         Merges duplicate rules into a single test case.
+        [NEW v3.1] With near_dupes, near-identical cases (MinHash/LSH) are merged too;
+        see near_dupes.merged for what was dropped.
         """
         unique_cases = {}
         
         for tc in test_cases:
-            # Create semantic key: Title + Steps (normalized) + Expected Result
-            # Normalize steps to ignore minor formatting differences
-            norm_steps = " ".join(tc['steps'].split()).lower()
-            norm_expected = " ".join(tc['expected'].split()).lower()
-            
-            # Key focuses on the CORE LOGIC, not the random ID
-            key = f"{tc['title']}|{norm_steps}|{norm_expected}"
+            key = self._dedupe_key(tc)
             
             if key not in unique_cases:
+                # Keep the first one as it's likely from the most specific rule
+                if near_dupes and near_dupes.check(tc, f"TC-{tc['category'][:4].upper()}-{len(unique_cases) + 1:03d}"):
+                    continue
                 unique_cases[key] = tc
-            else:
-                # If duplicate found, we can merge metadata if needed
-                # For now, we just keep the first one as it's likely from the most specific rule
-                pass
                 
         # Re-index IDs to be sequential after filtering
         final_list = list(unique_cases.values())
@@ -558,74 +687,212 @@ class MatrixEngine:
             "code": ["PRJ-2026-001", "PRJ-LEG-002", "PRJ-IT-003"]
         }
 
+        # [NEW v3.1] Field name keywords (EN + VI) -> DATA_POOL key, highest priority first
+        FIELD_KEYWORDS = [
+            ("requester", ["requester", "người yêu cầu", "name"]),
+            ("project", ["project", "dự án"]),
+            ("region", ["region", "vùng"]),
+            ("area", ["area", "khu vực"]),
+            ("content", ["content", "nội dung"]),
+            ("manager", ["manager", "người quản lý"]),
+            ("code", ["code", "mã"]),
+            ("priority", ["priority", "ưu tiên"]),
+        ]
+        # [NEW v3.1] Title/steps keywords -> (test data label, DATA_POOL key), in output order
+        CONTEXT_KEYWORDS = [
+            (("Requester", "requester"), ["requester", "người yêu cầu"]),
+            (("Project", "project"), ["project", "dự án"]),
+            (("Region", "region"), ["region", "vùng"]),
+            (("Area", "area"), ["area", "khu vực"]),
+            (("Content", "content"), ["content", "nội dung"]),
+            (("Reason", "description"), ["reason", "lý do"]),
+        ]
+        FIELD_CLASSIFIER = KeywordClassifier(FIELD_KEYWORDS)
+        CONTEXT_CLASSIFIER = KeywordClassifier(CONTEXT_KEYWORDS)
+
         @staticmethod
-        def get_example(field_name: str) -> str:
+        def get_example(field_name: str, rng=None) -> str:
             import random
-            name_lower = field_name.lower()
-            pool = MatrixEngine.TestDataManager.DATA_POOL
-            
-            if "requester" in name_lower or "người yêu cầu" in name_lower or "name" in name_lower:
-                return random.choice(pool["requester"])
-            if "project" in name_lower or "dự án" in name_lower:
-                return random.choice(pool["project"])
-            if "region" in name_lower or "vùng" in name_lower:
-                return random.choice(pool["region"])
-            if "area" in name_lower or "khu vực" in name_lower:
-                return random.choice(pool["area"])
-            if "content" in name_lower or "nội dung" in name_lower:
-                return random.choice(pool["content"])
-            if "manager" in name_lower or "người quản lý" in name_lower:
-                return random.choice(pool["manager"])
-            if "code" in name_lower or "mã" in name_lower:
-                return random.choice(pool["code"])
-            if "priority" in name_lower or "ưu tiên" in name_lower:
-                return random.choice(pool["priority"])
-                
-            return "Valid Value"
+            pool_key = MatrixEngine.TestDataManager.FIELD_CLASSIFIER.first(field_name)
+            if pool_key is None:
+                return "Valid Value"
+            return (rng or random).choice(MatrixEngine.TestDataManager.DATA_POOL[pool_key])
 
-    def generate_all(self) -> List[Dict[str, Any]]:
-        self.test_cases = []
-        
-        # 1. Expand Field Validations
+    def _expansion_units(self) -> Iterator[Tuple[Any, List[Tuple[str, tuple]]]]:
+        """
+        [NEW v3.1] The steps of generate_all, grouped into independent units
+        (one per section, business rule and visual rule, plus the global flows).
+        Yields (element, steps): element is the schema input the unit depends on,
+        steps are (expander name, args) resolved from the registry.
+        Units only share ID assignment and dedupe, so they can run in any process.
+        """
+        registry = self.registry
         for section in self.schema.sections:
-            # [NEW] Filter Combinations
-            if "filter" in section.name.lower() or "search" in section.name.lower():
-                self._expand_filter_combinations(section)
-                self._expand_search_advanced(section) # [NEW v2.2]
-            
-            # [NEW] Dependency Logic
-            self._expand_dependency_logic(section)
-            self._expand_ui_ux_gaps(section) # [NEW v2.2]
-
+            unit = registry.resolve("section", section)
             for field in section.fields:
-                self._expand_field(field, section.name)
-                # [NEW] Smart Actions Check
-                self._expand_smart_actions(field, f"Verify {field.name}")
-                # [NEW v2.3] Detail Popup Check
-                self._expand_detail_popup(field, f"Verify {field.name}")
+                unit.extend(registry.resolve("field", field, section))
+            yield section, unit
                 
-        # 2. Convert Business Rules (Upgraded)
         for rule in self.schema.business_rules:
-            self._convert_rule_v2(rule)
-            # [NEW] Semantic Explosion
-            self._expand_roles_permissions(rule)
-            self._expand_security_implicit(rule) # [NEW v2.2]
-            self._expand_approval_flows(rule)    # [UPDATED v2.2]
-            self._expand_concurrency(rule)
+            yield rule, registry.resolve("rule", rule)
             
-        # 3. Convert Visual Rules
         for vis in self.schema.visual_rules:
-            self._convert_visual(vis)
-            
-        # 4. Add E2E Flows
-        self._add_e2e_flows()
-        
-        # 5. Add Global Compatibility
-        self._add_global_compatibility()
-        
-        # [NEW v3.0] Deduplicate
-        self.test_cases = self.deduplicate_test_cases(self.test_cases)
+            yield vis, registry.resolve("visual", vis)
             
+        # E2E flows read every section
+        yield self.schema.sections, registry.resolve("global")
+
+    def _expansion_plan(self) -> Iterator[Tuple[str, tuple]]:
+        """ [NEW v3.1] Ordered (expander name, args) steps that make up generate_all. """
+        for _, unit in self._expansion_units():
+            yield from unit
+
+    def _run_expander(self, name: str, args: tuple):
+        """ Calls one expander and records its calls / produced cases / time. """
+        before = len(self.test_cases)
+        outer, self._source = self._source, (element_key(args[0]) if args else GLOBAL_ELEMENT, name)
+        start = time.perf_counter()
+        try:
+            getattr(self, name)(*args)
+        finally:
+            self._source = outer
+        elapsed = time.perf_counter() - start
+        stats = self.expander_stats.get(name)
+        if stats is None:
+            stats = self.expander_stats[name] = ExpanderStats()
+        stats.calls += 1
+        stats.cases += len(self.test_cases) - before
+        stats.seconds += elapsed
+
+    def expander_report(self) -> List[Dict[str, Any]]:
+        """ [NEW v3.1] Per-expander statistics, most expensive first (times include nested expanders). """
+        return stats_report(self.expander_stats)
+
+    def _run_steps(self, steps) -> List[TestCaseRecord]:
+        """ Runs expander steps and returns the raw (not yet deduplicated) cases they produced. """
+        # _add_tc appends to self.test_cases, which acts as the buffer here
+        self.test_cases = []
+        for name, args in steps:
+            self._run_expander(name, args)
+        produced, self.test_cases = self.test_cases, []
+        return produced
+
+    def _process_pool(self, workers: int):
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(type(self), self.schema.model_dump(), self.seed))
+
+    def cache_fingerprint(self) -> str:
+        """ Engine identity for the explode cache: version, engine class, registered expanders, title translations and seed. """
+        cls = type(self)
+        translations = hashlib.sha256(repr(sorted(self.TITLE_TRANSLATIONS.items())).encode('utf-8')).hexdigest()[:16]
+        expanders = repr((sorted(self.registry.field_types.items()),
+                          {scope: [name for name, _, _ in hooks] for scope, hooks in self.registry.hooks.items()}))
+        expanders = hashlib.sha256(expanders.encode('utf-8')).hexdigest()[:16]
+        return f"{self.ENGINE_VERSION}|{cls.__module__}.{cls.__qualname__}|{expanders}|{translations}|seed={self.seed}"
+
+    def open_cache(self, cache_dir: str) -> "ExplosionCache":
+        return ExplosionCache(cache_dir, self.cache_fingerprint())
+
+    @staticmethod
+    def _element_data(element) -> Any:
+        if isinstance(element, list):
+            return [e.model_dump() for e in element]
+        return element.model_dump()
+
+    def _iter_raw_batches(self, workers: int = 1, cache: Optional["ExplosionCache"] = None) -> Iterator[List[TestCaseRecord]]:
+        """
+        Raw case batches in generate_all order: per step (serial) or per unit (process pool / cache).
+        With a cache, unchanged units are read back from disk and only the rest is expanded.
+        """
+        if cache is None:
+            if workers <= 1:
+                for step in self._expansion_plan():
+                    yield self._run_steps([step])
+                return
+
+            unit_count = sum(1 for _ in self._expansion_units())
+            chunksize = max(1, unit_count // (workers * 4))
+            with self._process_pool(workers) as pool:
+                # map() returns results in submission order -> deterministic merge
+                for batch, stats in pool.map(_run_unit, range(unit_count), chunksize=chunksize):
+                    merge_stats(self.expander_stats, stats)
+                    yield batch
+            return
+
+        units = list(self._expansion_units())
+        keys = [cache.key(self._element_data(element)) for element, _ in units]
+        stale = [i for i, key in enumerate(keys) if not cache.has(key)]
+
+        pool = self._process_pool(workers) if workers > 1 and len(stale) > 1 else None
+        try:
+            fresh = iter(pool.map(_run_unit, stale)) if pool else None
+            stale_set = set(stale)
+            for i, (_, steps) in enumerate(units):
+                rows = None if i in stale_set else cache.load(keys[i])
+                if rows is not None:
+                    yield [TestCaseRecord(*row) for row in rows]
+                    continue
+                if pool and i in stale_set:
+                    batch, stats = next(fresh)
+                    merge_stats(self.expander_stats, stats)
+                else:
+                    batch = self._run_steps(steps)
+                cache.store(keys[i], [tc.__getstate__() for tc in batch])
+                yield batch
+        finally:
+            if pool:
+                pool.shutdown()
+
+    def iter_records(self, workers: int = 1, cache: Optional["ExplosionCache"] = None, near_dupes: Optional[NearDuplicateFilter] = None) -> Iterator[TestCaseRecord]:
+        """
+        [NEW v3.1] Streaming variant of generate_all.
+        Yields each unique test case as soon as its expander produced it, with
+        online deduplication and final sequential IDs (same output as generate_all).
+        Memory holds one expander's output plus a 16-byte digest per unique case.
+        With workers > 1, sections and rules are exploded in a process pool and
+        merged back in schema order, so the suite is the same as a serial run.
+        With a cache (open_cache), only units whose content hash changed are re-expanded;
+        dedupe and IDs still run over the spliced stream.
+        With near_dupes (NearDuplicateFilter), near-identical cases are dropped as well.
+        """
+        seen = set()
+        count = 0
+        for batch in self._iter_raw_batches(workers, cache):
+            for tc in batch:
+                digest = hashlib.blake2b(self._dedupe_key(tc).encode('utf-8'), digest_size=16).digest()
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                case_id = f"TC-{tc.category[:4].upper()}-{count + 1:03d}"
+                if near_dupes and near_dupes.check(tc, case_id):
+                    continue
+                count += 1
+                tc.id = case_id
+                yield tc
+
+    def iter_test_cases(self, workers: int = 1, cache: Optional["ExplosionCache"] = None, near_dupes: Optional[NearDuplicateFilter] = None) -> Iterator[Dict[str, Any]]:
+        """ iter_records() converted to plain dicts, one at a time. """
+        for tc in self.iter_records(workers, cache, near_dupes):
+            yield tc.to_dict()
+
+    def generate_records(self, workers: int = 1, cache: Optional["ExplosionCache"] = None, near_dupes: Optional[NearDuplicateFilter] = None) -> List[TestCaseRecord]:
+        """
+        [NEW v3.1] Full deduplicated suite as compact records (use to keep large suites in memory).
+        Repeated strings are shared through a pool that lives only as long as this call,
+        so streaming runs (iter_records) never accumulate one.
+        """
+        strings = {}
+        self.test_cases = []
+        for tc in self.iter_records(workers, cache, near_dupes):
+            tc.share_strings(strings)
+            self.test_cases.append(tc)
+        return self.test_cases
+
+    def generate_all(self, workers: int = 1, cache: Optional["ExplosionCache"] = None, near_dupes: Optional[NearDuplicateFilter] = None) -> List[Dict[str, Any]]:
+        # [NEW v3.0] Deduplicated on the fly by iter_test_cases
+        test_cases = list(self.iter_test_cases(workers, cache, near_dupes))
+        self.test_cases = test_cases
         return self.test_cases
 
     def _add_e2e_flows(self):
@@ -668,44 +935,29 @@ class MatrixEngine:
 
 
     def _add_global_compatibility(self):
-        browsers = ["Chrome", "Firefox", "Safari", "Edge"]
-        for browser in browsers:
+        for browser in self.COMPAT_BROWSERS:
             self._add_tc("Compatibility", f"Verify Layout on {browser}", 
                          f"1. Open feature on {browser}.\n2. Perform main flow.", 
                          "Layout matches design. No console errors.", "P1")
                          
-        devices = ["iPhone 14 (Mobile)", "Samsung Galaxy S22", "Desktop 1920x1080"]
-        for device in devices:
+        for device in self.COMPAT_DEVICES:
             self._add_tc("Compatibility", f"Verify Responsiveness: {device}", 
                          f"1. Emulate {device} viewport.", 
                          "UI adjusts correctly (Stacked/Grid).", "P2")
 
     def _generate_test_data_from_context(self, title: str, steps: str) -> str:
-        """ [NEW v3.0] Smart Test Data Injection """
-        context = (title + " " + steps).lower()
-        data = []
-        
-        tm = self.TestDataManager
-        
-        if "requester" in context or "người yêu cầu" in context:
-            data.append(f"Requester: {tm.get_example('requester')}")
-            
-        if "project" in context or "dự án" in context:
-             data.append(f"Project: {tm.get_example('project')}")
-
-        if "region" in context or "vùng" in context:
-             data.append(f"Region: {tm.get_example('region')}")
-             
-        if "area" in context or "khu vực" in context:
-             data.append(f"Area: {tm.get_example('area')}")
-             
-        if "content" in context or "nội dung" in context:
-             data.append(f"Content: {tm.get_example('content')}")
-             
-        if "reason" in context or "lý do" in context:
-             data.append(f"Reason: {tm.get_example('description')}")
-             
-        return "\n".join(data) if data else "-"
+        """
+        [NEW v3.0] Smart Test Data Injection
+        [NEW v3.1] One classifier scan of the context; picks are seeded by (seed, context).
+        """
+        context = title + " " + steps
+        matches = self.TestDataManager.CONTEXT_CLASSIFIER.classify(context)
+        if not matches:
+            return "-"
+
+        rng = seeded_rng(self.seed, context)
+        pool = self.TestDataManager.DATA_POOL
+        return "\n".join(f"{label}: {rng.choice(pool[pool_key])}" for label, pool_key in matches)
 
     def _add_tc(self, category: str, title: str, steps: str, expected: str, priority: str = "P2", test_data: str = None):
         # Auto-translate title to Vietnamese
@@ -716,15 +968,24 @@ class MatrixEngine:
             test_data = self._generate_test_data_from_context(title, steps)
         
         tc_id = f"TC-{category[:4].upper()}-{len(self.test_cases) + 1:03d}"
-        self.test_cases.append({
-            "id": tc_id,
-            "category": category,
-            "title": vietnamese_title,  # Use Vietnamese title
-            "steps": steps,
-            "test_data": test_data,     # [NEW]
-            "expected": expected,
-            "priority": priority
-        })
+        self.test_cases.append(TestCaseRecord(
+            id=tc_id,
+            category=category,
+            title=vietnamese_title,  # Use Vietnamese title
+            steps=steps,
+            test_data=test_data,     # [NEW]
+            expected=expected,
+            priority=priority,
+            source=format_source(self._source[0], self._source[1], self._variant(title))
+        ))
+
+    def _variant(self, title: str) -> str:
+        """ Scenario part of an English title: "Verify Area Filter - Multi-select Filter" -> "Multi-select Filter". """
+        name = self._source[0].split(":", 1)[-1]
+        for prefix in (f"Verify {name} - ", f"{name} - ", "Verify "):
+            if title.startswith(prefix):
+                return title[len(prefix):]
+        return title
 
     def _expand_field(self, field: FieldType, section: str):
         prefix = f"Verify {field.name}"
@@ -741,41 +1002,16 @@ class MatrixEngine:
                          f"1. Hover over info icon or check below field.",
                          f"Displays: '{field.description}'", "P3")
         
-        # --- Type Specific Expansion ---
-        if field.type in ["text", "password", "textarea"]:
-            self._expand_text(field, prefix)
-        elif field.type == "email":
-            self._expand_email(field, prefix)
-        elif field.type == "number":
-            self._expand_number(field, prefix)
-        elif field.type in ["select", "radio"]:
-            self._expand_enum(field, prefix)
-        elif field.type in ["chart", "list", "table", "label", "text_display"]:
-            self._expand_display(field, prefix)
-        elif field.type == "tree_view":
-            self._expand_tree_view(field, prefix)
-        elif field.type == "kanban_board":
-            self._expand_kanban(field, prefix)
-        elif field.type == "permission_matrix":
-            self._expand_permission_matrix(field, prefix)
-        elif field.type == "tabs":
-            self._expand_tabs(field, prefix)
-        elif field.type == "file_upload":
-            self._expand_file_upload(field, prefix)
-        elif field.type == "formula":
-            self._expand_formula(field, prefix)
-        elif field.type == "relationship":
-            self._expand_relationship(field, prefix)
-        elif field.type == "complex_view":
-            self._expand_complex_view(field, prefix)
+        # --- Type Specific Expansion (see registry.register_field_type) ---
+        expander = self.registry.field_expander(field.type)
+        if expander:
+            self._run_expander(expander, (field, prefix))
 
     def _expand_display(self, field: FieldType, prefix: str):
-        if field.type == "table":
-            self._expand_table(field, prefix)
-        else:
-            self._add_tc("Visual", f"{prefix} - Visibility", 
-                         f"1. Check if '{field.name}' is visible.", 
-                         "Element is displayed correctly.", "P2")
+        # Tables have their own expander (_expand_table, registered for "table")
+        self._add_tc("Visual", f"{prefix} - Visibility", 
+                     f"1. Check if '{field.name}' is visible.", 
+                     "Element is displayed correctly.", "P2")
 
     def _expand_table(self, field: FieldType, prefix: str):
         # 1. Columns & Visibility
@@ -1167,3 +1403,19 @@ class MatrixEngine:
                      f"Inspect {rule.element_name}", 
                      rule.description, 
                      priority="P2")
+
+
+# --- Process Pool Workers (parallel explosion) ---
+_WORKER_ENGINE = None
+_WORKER_UNITS = None
+
+def _init_worker(engine_cls, schema_data: Dict[str, Any], seed: int = 0):
+    """ Builds one engine per worker process; units are then addressed by index. """
+    global _WORKER_ENGINE, _WORKER_UNITS
+    _WORKER_ENGINE = engine_cls(SmartSchema(**schema_data), seed)
+    _WORKER_UNITS = [steps for _, steps in _WORKER_ENGINE._expansion_units()]
+
+def _run_unit(index: int) -> Tuple[List[TestCaseRecord], Dict[str, ExpanderStats]]:
+    """ Returns the unit's raw cases and the expander stats it produced (merged by the parent). """
+    _WORKER_ENGINE.expander_stats = {}
+    return _WORKER_ENGINE._run_steps(_WORKER_UNITS[index]), _WORKER_ENGINE.expander_stats
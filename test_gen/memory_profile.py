@@ -0,0 +1,101 @@
+"""
+Memory Profile
+tracemalloc phases for --profile-memory: peak and net memory per phase plus the
+top allocation sites (snapshot diff), written as a JSON report.
+"""
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+# Allocations made by the profiler itself are not reported
+_IGNORED = (tracemalloc.__file__, __file__)
+
+
+def memory_report_path(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + "_memory.json"
+
+
+def _site(filename: str, lineno: int) -> str:
+    rel = os.path.relpath(filename) if os.path.isabs(filename) else filename
+    return f"{filename if rel.startswith('..') else rel}:{lineno}"
+
+
+class MemoryProfiler:
+    """
+    [NEW v3.1] `with profiler.phase("dedupe"): ...` records, for the phase:
+    peak traced memory (absolute and above the phase start), net retained bytes,
+    duration and the `top` allocation sites that grew the most.
+    """
+
+    def __init__(self, command: str, top: int = 10, frames: int = 1):
+        self.command = command
+        self.top = top
+        self.frames = frames
+        self.phases: List[Dict[str, Any]] = []
+        self.notes: Dict[str, Any] = {}
+        self._started_here = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_here = True
+
+    def stop(self):
+        if self._started_here:
+            tracemalloc.stop()
+            self._started_here = False
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORED])
+
+    @contextmanager
+    def phase(self, name: str):
+        self.start()
+        before = self._snapshot()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            end_bytes, peak = tracemalloc.get_traced_memory()
+            growth = self._snapshot().compare_to(before, "lineno")
+            self.phases.append({
+                "phase": name,
+                "seconds": round(elapsed, 4),
+                "start_bytes": start_bytes,
+                "end_bytes": end_bytes,
+                "net_bytes": end_bytes - start_bytes,
+                "peak_bytes": peak,
+                "peak_above_start_bytes": peak - start_bytes,
+                "top_allocations": [{
+                    "site": _site(stat.traceback[0].filename, stat.traceback[0].lineno),
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size
+                } for stat in growth[:self.top] if stat.size_diff > 0]
+            })
+
+    def report(self) -> Dict[str, Any]:
+        peak = max((p["peak_bytes"] for p in self.phases), default=0)
+        return {
+            "command": self.command,
+            "tracemalloc_frames": self.frames,
+            **self.notes,
+            "peak_bytes": peak,
+            "peak_phase": next((p["phase"] for p in self.phases if p["peak_bytes"] == peak), None),
+            "phases": self.phases
+        }
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+
+    def summary_lines(self) -> List[str]:
+        return [f"{p['phase']}: peak {p['peak_bytes'] / 1048576:.1f} MiB, net {p['net_bytes'] / 1048576:+.1f} MiB, {p['seconds']}s"
+                for p in self.phases]
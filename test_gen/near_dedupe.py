@@ -0,0 +1,133 @@
+"""
+Near-Duplicate Detection
+MinHash signatures over word shingles of a test case (title + steps + expected),
+bucketed with LSH banding so each case is only compared with likely matches
+instead of every previous case (sub-quadratic on large suites).
+Signatures use one-permutation hashing with optimal densification: one hash per
+shingle instead of one per shingle and permutation.
+"""
+import hashlib
+import random
+import re
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _band_layout(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows == num_perm whose LSH S-curve midpoint
+    (1/bands) ** (1/rows) is closest to the threshold without exceeding it,
+    so pairs at the threshold are very likely to collide in some band.
+    """
+    best = (num_perm, 1)
+    best_gap = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        gap = threshold - midpoint
+        if gap >= 0 and (best_gap is None or gap < best_gap):
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class NearDuplicateFilter:
+    """
+    [NEW v3.1] Online near-duplicate filter for a stream of test cases.
+    `check(tc, case_id)` returns the ID of the kept case it duplicates (estimated
+    Jaccard similarity >= threshold, same category), or None after indexing tc under
+    case_id. Only signatures, IDs and titles are retained, never the cases.
+    Merges are collected in `merged` for reporting.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, shingle_size: int = 2, seed: int = 1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Near-duplicate threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _band_layout(num_perm, threshold)
+
+        # Empty bins borrow from the first filled bin of a fixed pseudo-random probe order
+        rng = random.Random(seed)
+        self._probes = [rng.sample(range(num_perm), num_perm) for _ in range(num_perm)]
+        self._salt = rng.getrandbits(64).to_bytes(8, "little")
+
+        self._buckets: Dict[int, List[int]] = {}
+        self._signatures: List[array] = []
+        self._kept: List[Tuple[str, str]] = []
+        self.merged: List[Dict[str, Any]] = []
+
+    def shingles(self, tc) -> set:
+        words = _WORD.findall(f"{tc['title']} {tc['steps']} {tc['expected']}".lower())
+        k = self.shingle_size
+        if len(words) <= k:
+            return {" ".join(words)}
+        return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+    def signature(self, tc) -> array:
+        k = self.num_perm
+        bins = [None] * k
+        for shingle in self.shingles(tc):
+            h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8, salt=self._salt).digest(), "little")
+            b, v = h % k, h // k
+            if bins[b] is None or v < bins[b]:
+                bins[b] = v
+        filled = [v is not None for v in bins]
+        for i in range(k):
+            if not filled[i]:
+                bins[i] = bins[next(j for j in self._probes[i] if filled[j])]
+        return array("Q", bins)
+
+    @staticmethod
+    def similarity(sig_a: array, sig_b: array) -> float:
+        """ Estimated Jaccard similarity: share of matching MinHash slots. """
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+    def check(self, tc, case_id: str) -> Optional[str]:
+        sig = self.signature(tc)
+        r = self.rows
+        # Bucket keys are hashes; a collision only adds a candidate that fails the similarity check
+        keys = [hash((tc['category'], band, sig[band * r:(band + 1) * r].tobytes())) for band in range(self.bands)]
+
+        best, best_score = None, 0.0
+        seen = set()
+        for key in keys:
+            for idx in self._buckets.get(key, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                score = self.similarity(sig, self._signatures[idx])
+                if score >= self.threshold and score > best_score:
+                    best, best_score = idx, score
+
+        if best is not None:
+            kept_id, kept_title = self._kept[best]
+            self.merged.append({
+                "kept": kept_id,
+                "kept_title": kept_title,
+                "merged_title": tc['title'],
+                "category": tc['category'],
+                "similarity": round(best_score, 3)
+            })
+            return kept_id
+
+        idx = len(self._kept)
+        self._kept.append((case_id, tc['title']))
+        self._signatures.append(sig)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(idx)
+        return None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "merged_count": len(self.merged),
+            "merged": self.merged
+        }
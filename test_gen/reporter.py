@@ -1,14 +1,32 @@
 import pandas as pd
-import json
+import itertools
 import os
 import sys
 from .logger import log
 from .exporter import Exporter
+from .traceability import TraceIndex
+from .testcase_io import is_jsonl, iter_test_cases
+from .excel_writer import ExcelStreamWriter
+
+# Columns of a test case row parsed from a Markdown suite
+MARKDOWN_COLUMNS = ["id", "priority", "title", "steps", "expected_result", "status", "notes", "type"]
 
 class Reporter:
     def __init__(self, input_path: str):
         self.input_path = input_path
         self.exporter = Exporter(output_dir="output")
+        self._trace = None
+
+    def load_trace(self):
+        """ [NEW v3.1] Traceability index next to a raw_testcases JSON input (None if absent). """
+        if self._trace is None and (self.input_path.endswith('.json') or is_jsonl(self.input_path)):
+            self._trace = TraceIndex.for_test_cases(self.input_path)
+        return self._trace
+
+    def cases_for(self, element: str) -> list:
+        """ [NEW v3.1] IDs of the cases generated for a schema element ("Area Filter", "rule:BR-004"). """
+        trace = self.load_trace()
+        return trace.cases_for(element) if trace else []
 
     def load_data(self) -> pd.DataFrame:
         """Load data from Markdown, JSON or Excel into DataFrame"""
@@ -19,7 +37,7 @@ class Reporter:
         try:
             if self.input_path.endswith('.md'):
                 return self._parse_markdown()
-            elif self.input_path.endswith('.json'):
+            elif self.input_path.endswith('.json') or is_jsonl(self.input_path):
                 return self._parse_json()
             elif self.input_path.endswith('.xlsx'):
                 return pd.read_excel(self.input_path)
@@ -31,45 +49,71 @@ class Reporter:
             return pd.DataFrame()
 
     def _parse_json(self):
-        with open(self.input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        if "test_cases" in data:
-            return pd.DataFrame(data["test_cases"])
-        return pd.DataFrame(data)
+        # JSON document or JSON Lines (plus any journaled manual cases)
+        return pd.DataFrame(list(iter_test_cases(self.input_path)))
 
-    def _parse_markdown(self) -> pd.DataFrame:
-        """Parse Markdown Pipe Table"""
-        try:
-            with open(self.input_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            data = []
-            for line in lines:
+    def _iter_markdown_rows(self):
+        """ Test case rows of the Markdown pipe table, read line by line """
+        with open(self.input_path, 'r', encoding='utf-8') as f:
+            for line in f:
                 line = line.strip()
                 if line.startswith("| TC-"): # Robust check for Test Case Row
                     parts = [p.strip() for p in line.split("|")]
                     # parts[0] is empty str before first |
                     # Standard: | id | priority | title | steps | expected | status | notes |
                     if len(parts) >= 8:
-                        data.append({
+                        yield {
                             "id": parts[1],
                             "priority": parts[2],
                             "title": parts[3],
                             "steps": parts[4],
                             "expected_result": parts[5],
                             "status": parts[6],
-                            "notes": parts[7] if len(parts) > 7 else ""
-                        })
-            
-            # Infer Type if missing
-            for item in data:
-                item["type"] = self._infer_type(item["id"])
-                
-            return pd.DataFrame(data)
+                            "notes": parts[7] if len(parts) > 7 else "",
+                            # Infer Type if missing
+                            "type": self._infer_type(parts[1])
+                        }
+
+    def _parse_markdown(self) -> pd.DataFrame:
+        """Parse Markdown Pipe Table"""
+        try:
+            return pd.DataFrame(list(self._iter_markdown_rows()))
         except Exception as e:
             log.error(f"Markdown parse error: {e}")
             return pd.DataFrame()
 
+    def _iter_excel_rows(self):
+        from openpyxl import load_workbook
+        workbook = load_workbook(self.input_path, read_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [str(h) for h in next(rows, ())]
+            for row in rows:
+                yield dict(zip(header, row))
+        finally:
+            workbook.close()
+
+    def iter_records(self):
+        """
+        [NEW v3.1] (columns, row dicts) of the input without building a DataFrame.
+        JSON / JSONL columns come from a key pre-pass (JSON Lines are re-read, not held).
+        """
+        path = self.input_path
+        if path.endswith('.md'):
+            return MARKDOWN_COLUMNS, self._iter_markdown_rows()
+        if path.endswith('.json') or is_jsonl(path):
+            columns = list(dict.fromkeys(key for tc in iter_test_cases(path) for key in tc))
+            return columns, iter_test_cases(path)
+        if path.endswith('.xlsx'):
+            from openpyxl import load_workbook
+            workbook = load_workbook(path, read_only=True)
+            try:
+                header = next(workbook.worksheets[0].iter_rows(values_only=True), ())
+            finally:
+                workbook.close()
+            return [str(h) for h in header], self._iter_excel_rows()
+        raise ValueError(f"Unsupported format: {path}")
+
     def _infer_type(self, tc_id):
         if "SEC" in tc_id: return "Security"
         if "PERF" in tc_id: return "Performance"
@@ -79,29 +123,38 @@ class Reporter:
         return "Functional"
 
     def generate_excel(self, output_path: str):
-        df = self.load_data()
-        if df.empty:
-            log.warning("No data to report.")
+        """
+        'Test Cases' sheet plus a 'Summary' of status counts.
+        [NEW v3.1] Rows are streamed from the input into a write-only workbook and
+        counted on the way, so memory does not grow with the suite.
+        """
+        if not os.path.exists(self.input_path):
+            log.error(f"Input file not found: {self.input_path}")
             return
 
-        # Use Exporter for layout
-        # Convert DataFrame back to list of dicts for Exporter compat, or use pandas directly
-        # Here we use pandas directly but with Stats
-        
         try:
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Test Cases', index=False)
-                
-                # Stats
-                stats = {
-                    "Total": len(df),
-                    "Passed": len(df[df['status'].str.contains('Pass', case=False, na=False)]),
-                    "Failed": len(df[df['status'].str.contains('Fail', case=False, na=False)]),
-                    "Untested": len(df[df['status'].str.contains('\[ \]', na=False)]) # Check for empty check
-                }
-                
-                pd.DataFrame([stats]).to_excel(writer, sheet_name='Summary', index=False)
-                
+            columns, records = self.iter_records()
+            first = next(records, None)
+            if first is None:
+                log.warning("No data to report.")
+                return
+
+            stats = {"Total": 0, "Passed": 0, "Failed": 0, "Untested": 0}
+            def counted(rows):
+                for row in rows:
+                    status = row.get('status')
+                    if isinstance(status, str):
+                        lowered = status.lower()
+                        stats["Passed"] += 'pass' in lowered
+                        stats["Failed"] += 'fail' in lowered
+                        stats["Untested"] += '[ ]' in status # Check for empty check
+                    stats["Total"] += 1
+                    yield row
+
+            writer = ExcelStreamWriter(output_path)
+            writer.add_records('Test Cases', columns, counted(itertools.chain([first], records)))
+            writer.add_records('Summary', list(stats), [stats])
+            writer.save()
             log.info(f"✅ Excel Report Generated: {output_path}")
         except Exception as e:
             log.error(f"Excel generation failed: {e}")
@@ -161,6 +214,10 @@ class Reporter:
             log.warning("⚠️ Template not found, using default format.")
             by_type = df['type'].value_counts() if 'type' in df.columns else pd.Series()
             content = f"# Test Execution Summary\n\n**Total Cases**: {total}\n\n## By Type\n{by_type.to_markdown()}\n"
+            trace = self.load_trace()
+            if trace and trace.elements:
+                rows = "\n".join(f"| {element} | {len(ids)} |" for element, ids in trace.elements.items())
+                content += f"\n## By Schema Element\n| Element | Cases |\n|---|---|\n{rows}\n"
 
         with open(output_path, "w", encoding='utf-8') as f:
             f.write(content)
@@ -0,0 +1,75 @@
+"""
+Rule Features
+Classifies every business rule once per schema into a RuleFeatures record
+(roles, negative keywords, permission, group/concurrency, status transition,
+approval flow type). Rule expanders read the record instead of re-scanning
+rule.description / rule.expected_result.
+"""
+from typing import Dict, Iterable, Optional
+
+try:
+    from .keyword_classifier import KeywordClassifier
+except ImportError:
+    from keyword_classifier import KeywordClassifier
+
+# Keyword tables (EN + VI). Substring, case-insensitive, as the expanders always matched.
+ROLES = ["Manager", "Creator", "Approver", "Admin", "User", "Quản lý", "Người tạo", "Người duyệt", "Phụ trách"]
+NEGATIVE_KEYWORDS = ["not", "cannot", "invalid", "blocked", "disabled", "prohibited", "error", "fail"]
+PERMISSION_KEYWORDS = ["permission", "quyền"]
+GROUP_KEYWORDS = ["any", "all", "đồng thuận", "nhóm", "group", "cùng 1 cấp"]
+STATUS_KEYWORDS = ["status", "trạng thái"]
+# Target state of a status transition, highest priority first
+STATES = ["rejected", "approved", "completed"]
+
+# Rules that are specifically about multi-level approval workflows
+FLOW_RULES = {"BR-004": "rejection", "BR-006": "single_level", "BR-007": "sequential"}
+
+DESCRIPTION_CLASSIFIER = KeywordClassifier(
+    [(("role", role), [role]) for role in ROLES]
+    + [("negative", NEGATIVE_KEYWORDS), ("permission", PERMISSION_KEYWORDS), ("group", GROUP_KEYWORDS)]
+)
+RESULT_CLASSIFIER = KeywordClassifier([("status", STATUS_KEYWORDS)] + [(state, [state]) for state in STATES])
+
+
+class RuleFeatures:
+    """ [NEW v3.1] What the rule expanders need to know about one business rule. """
+    __slots__ = ("roles", "negative", "permission", "group", "status_change", "state", "flow")
+
+    def __init__(self, rule):
+        roles = []
+        self.negative = self.permission = self.group = False
+        for label in DESCRIPTION_CLASSIFIER.classify(rule.description):
+            if isinstance(label, tuple):
+                roles.append(label[1])
+            else:
+                setattr(self, label, True)
+        # Roles in ROLES order (classify returns table order)
+        self.roles = tuple(roles)
+
+        result = RESULT_CLASSIFIER.classify(rule.expected_result)
+        self.status_change = "status" in result
+        # None = status changes to something other than a known state
+        self.state: Optional[str] = next((s for s in result if s != "status"), None)
+        self.flow: Optional[str] = FLOW_RULES.get(rule.id or "")
+
+    def __repr__(self):
+        return f"RuleFeatures({', '.join(f'{k}={getattr(self, k)!r}' for k in self.__slots__)})"
+
+
+class RuleFeatureIndex:
+    """ [NEW v3.1] RuleFeatures of every rule of a schema, computed once. """
+
+    def __init__(self, rules: Iterable = ()):
+        self._features: Dict[int, RuleFeatures] = {}
+        self._rules = []
+        for rule in rules:
+            self.get(rule)
+
+    def get(self, rule) -> RuleFeatures:
+        """ Indexed features; rules outside the schema are classified on first use. """
+        features = self._features.get(id(rule))
+        if features is None:
+            features = self._features[id(rule)] = RuleFeatures(rule)
+            # Keep the rule alive so its id() is never reused by another object
+            self._rules.append(rule)
+        return features
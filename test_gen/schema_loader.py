@@ -0,0 +1,89 @@
+"""
+Schema Loader
+Shared SmartSchema loading: pydantic's JSON fast path (model_validate_json straight
+from bytes) plus an on-disk cache of already-validated schemas keyed by content hash,
+so repeated steps over the same schema_input.json skip re-validation.
+"""
+import hashlib
+import json
+import os
+from typing import Optional, Union
+
+from pydantic import ValidationError
+
+try:
+    from .schema_models import SmartSchema
+except ImportError:
+    from schema_models import SmartSchema
+
+# Default location of the validated-schema cache (None disables it)
+SCHEMA_CACHE_DIR = os.path.join("output", ".schema_cache")
+
+_MODEL_FINGERPRINT = None
+
+
+def _model_fingerprint() -> str:
+    """ Changes whenever the SmartSchema models (or pydantic) change, invalidating the cache. """
+    global _MODEL_FINGERPRINT
+    if _MODEL_FINGERPRINT is None:
+        import pydantic
+        model_schema = json.dumps(SmartSchema.model_json_schema(), sort_keys=True)
+        _MODEL_FINGERPRINT = hashlib.sha256(f"{pydantic.VERSION}\n{model_schema}".encode("utf-8")).hexdigest()[:16]
+    return _MODEL_FINGERPRINT
+
+
+def parse_schema(raw: Union[bytes, str]) -> SmartSchema:
+    """
+    Validates schema JSON in one pass (pydantic-core parses and validates together).
+    Wrapped schemas ({"<key>": {...schema...}}) fall back to unwrapping the first key.
+    Raises ValidationError (JSON syntax errors have type 'json_invalid').
+    """
+    try:
+        return SmartSchema.model_validate_json(raw)
+    except ValidationError as e:
+        if is_json_error(e):
+            raise
+        data = json.loads(raw)
+        # Handle if schema is wrapped or raw
+        if isinstance(data, dict) and "feature_name" not in data and "sections" not in data and data:
+            inner = next(iter(data.values()))
+            if isinstance(inner, dict):
+                return SmartSchema.model_validate(inner)
+        raise
+
+
+def is_json_error(error: ValidationError) -> bool:
+    return any(e.get("type") == "json_invalid" for e in error.errors())
+
+
+def load_schema(schema_path: str, cache_dir: Optional[str] = SCHEMA_CACHE_DIR) -> SmartSchema:
+    """
+    [NEW v3.1] Loads and validates a schema file.
+    With cache_dir, the validated model is saved as canonical JSON (model_dump_json) under
+    sha256(model fingerprint + file bytes); an unchanged file is then rebuilt from it with the
+    JSON fast path, skipping unwrapping and defaults. The cache is data only (never unpickled),
+    and an unreadable or invalid entry is ignored.
+    """
+    with open(schema_path, "rb") as f:
+        raw = f.read()
+    if not cache_dir:
+        return parse_schema(raw)
+
+    key = hashlib.sha256(_model_fingerprint().encode("utf-8") + b"\n" + raw).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(path, "rb") as f:
+            return SmartSchema.model_validate_json(f.read())
+    except (OSError, ValidationError):
+        pass
+
+    schema = parse_schema(raw)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(schema.model_dump_json())
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Cache is best effort: a read-only tree still loads
+    return schema
@@ -1,7 +1,8 @@
-import json
 import re
 from typing import Optional
+from pydantic import ValidationError
 from .schema_models import SmartSchema
+from .schema_loader import parse_schema, is_json_error
 
 def clean_json_string(raw_text: str) -> str:
     """Clean markdown code blocks from LLM response"""
@@ -18,14 +19,16 @@ def parse_schema_from_ai(ai_response: str) -> Optional[SmartSchema]:
     """
     try:
         clean_json = clean_json_string(ai_response)
-        data = json.loads(clean_json)
         
-        # Validate with Pydantic
-        schema = SmartSchema(**data)
+        # Parse + validate with Pydantic in one pass
+        schema = parse_schema(clean_json)
         return schema
         
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON Parse Error: {e}")
+    except ValidationError as e:
+        if is_json_error(e):
+            print(f"❌ JSON Parse Error: {e}")
+        else:
+            print(f"❌ Schema Validation Error: {e}")
         return None
     except Exception as e:
         print(f"❌ Schema Validation Error: {e}")
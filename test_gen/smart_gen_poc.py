@@ -1,7 +1,7 @@
 import json
 import sys
 import os
-from .schema_models import SmartSchema
+from .schema_loader import load_schema
 from .matrix_engine import MatrixEngine
 
 def run_poc(json_path: str):
@@ -16,12 +16,9 @@ def run_poc(json_path: str):
         return
 
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-        
-        # 1. Validate Schema (Pydantic)
+        # 1. Validate Schema (Pydantic, cached by content hash)
         print("🔍 Validating Schema against Pydantic Model...")
-        schema = SmartSchema(**raw_data)
+        schema = load_schema(json_path)
         print("✅ Schema Validated Successfully!")
         
         # 2. Run Matrix Engine
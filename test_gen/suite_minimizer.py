@@ -0,0 +1,289 @@
+"""
+Suite Minimizer
+Shrinks raw_testcases.json to a near-minimal subset with the same coverage.
+Each case is modelled as the set of coverage items it exercises (schema field per
+category, business rule scenario, boundary class, security vector, browser/device);
+a lazy-heap greedy set cover picks cases until every item of the full suite is
+covered again, then a reverse pass drops picks that later picks made redundant.
+"""
+import heapq
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .logger import log
+    from .keyword_classifier import KeywordClassifier, PhraseMatcher
+    from .matrix_engine import MatrixEngine
+    from .title_translator import get_translator
+    from .case_budget import MUST_KEEP
+    from .testcase_io import load_test_cases_document, unwrap_test_cases, write_test_cases
+    from .traceability import parse_source
+except ImportError:
+    from logger import log
+    from keyword_classifier import KeywordClassifier, PhraseMatcher
+    from matrix_engine import MatrixEngine
+    from title_translator import get_translator
+    from case_budget import MUST_KEEP
+    from testcase_io import load_test_cases_document, unwrap_test_cases, write_test_cases
+    from traceability import parse_source
+
+# Boundary classes and security vectors, as the engine titles them (matched in EN and VI)
+BOUNDARY_CLASSES = [
+    ("min_length-1", ["Min Length (-1)"]), ("min_length", ["Min Length (Valid)"]),
+    ("max_length", ["Max Length (Valid)"]), ("max_length+1", ["Max Length (+1)"]),
+    ("min_value-1", ["Min Value (-1)"]), ("min_value", ["Min Value (Valid)"]),
+    ("max_value", ["Max Value (Valid)"]), ("max_value+1", ["Max Value (+1)"]),
+    ("negative", ["Negative Value"]), ("invalid_type", ["Invalid Type"]),
+    ("empty_required", ["Empty (Required)"]), ("whitespace", ["Trim Whitespace"]),
+    ("unicode", ["Unicode/Emoji"]), ("long_content", ["Long Content"]),
+    ("large_dataset", ["Large Dataset"]), ("divide_by_zero", ["Divide by Zero"]),
+    ("duplicate", ["Duplicate Name"]),
+]
+SECURITY_VECTORS = [
+    ("xss", ["XSS Injection"]), ("sql", ["SQL Injection"]), ("html", ["HTML Injection"]),
+    ("command", ["Command Injection"]), ("null_byte", ["Null Byte Injection"]),
+    ("param_tampering", ["Param Tampering"]), ("unauthorized", ["Unauthorized Access", "UNAUTHORIZED"]),
+    ("malicious_file", ["Malicious File"]), ("double_extension", ["Double Extension"]),
+]
+
+# Cases are picked high priority first among equal gains
+PRIORITY_RANK = {"P0": 0, "P1": 1, "P2": 2, "P3": 3}
+
+_CONDITION = re.compile(r"^Condition: (?:Violate ')?(.+?)(?:'| \(Satisfied\))?$", re.MULTILINE)
+_TITLE_PREFIXES = ("Kiểm tra ", "Verify ")
+
+
+def minimized_report_path(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + "_report.json"
+
+
+def _rule_variant(steps: str) -> str:
+    if steps.startswith("Condition: Violate"):
+        return "violation"
+    if steps.startswith("Condition:"):
+        return "positive"
+    if steps.startswith("Trigger:"):
+        return "transition"
+    return "related"
+
+
+class CoverageModel:
+    """
+    [NEW v3.1] Maps a test case to its coverage items (hashable tuples).
+    With a schema, fields and rules are matched by name / condition as whole words
+    (also in the translated title) through a PhraseMatcher, so the cost per case does
+    not grow with the schema; without one, the title subject and the 'Condition:' step stand in.
+    A case's provenance ('source'), when present, overrides the matched field / rule.
+    Cases without any modelled item cover only themselves, so they are never dropped.
+    """
+
+    def __init__(self, schema=None):
+        translate = get_translator(MatrixEngine.TITLE_TRANSLATIONS, MatrixEngine.UNTRANSLATED_PREFIXES)
+
+        def terms(*phrases: str) -> List[str]:
+            return sorted({t for p in phrases for t in (p, translate(p))})
+
+        table = [(("boundary", label), terms(*kws)) for label, kws in BOUNDARY_CLASSES]
+        table += [(("security", label), terms(*kws)) for label, kws in SECURITY_VECTORS]
+        table += [(("browser", b), terms(f"Layout on {b}", f"feature on {b}")) for b in MatrixEngine.COMPAT_BROWSERS]
+        table += [(("browser", d), terms(f"Responsiveness: {d}", f"Emulate {d}")) for d in MatrixEngine.COMPAT_DEVICES]
+
+        self.classifier = KeywordClassifier(table)
+
+        self.has_schema = schema is not None
+        names = []
+        if schema is not None:
+            fields = {f.name for section in schema.sections for f in section.fields}
+            names += [(("field", name), terms(name)) for name in sorted(fields)]
+            names += [(("rule", rule.id), [rule.condition]) for rule in schema.business_rules if rule.condition]
+        self.names = PhraseMatcher(names)
+
+    def items(self, tc) -> List[tuple]:
+        # Manual (--step add) and AI cases may lack a category and keep steps as a list
+        title, steps, category = tc.get('title', ''), tc.get('steps') or "", tc.get('category', '')
+        if isinstance(steps, list):
+            steps = "\n".join(str(step) for step in steps)
+        text = f"{title}\n{steps}"
+        labels = self.classifier.classify(text)
+        if self.has_schema:
+            labels += self.names.classify(text)
+
+        fields = [value for kind, value in labels if kind == "field"]
+        # "Status" inside "Project Status" is the longer field, not both
+        fields = [f for f in fields if not any(f != other and f in other for other in fields)]
+        rules = [value for kind, value in labels if kind == "rule"]
+        if not self.has_schema:
+            # "Kiểm tra <field> - <scenario>"
+            subject = title.split(" - ", 1)[0]
+            prefix = next((p for p in _TITLE_PREFIXES if subject.startswith(p)), None)
+            if " - " in title and prefix:
+                fields = [subject[len(prefix):]]
+            rules = _CONDITION.findall(steps)[:1]
+        # Provenance (traceability.py) names the field / rule exactly
+        element = (parse_source(tc.get('source', '')) or ("",))[0]
+        if element.startswith("field:"):
+            fields = [element[len("field:"):]]
+        elif element.startswith("rule:"):
+            rules = [element[len("rule:"):]]
+
+        items = [("field", f, category) for f in fields]
+        items += [("rule", r, _rule_variant(steps)) for r in rules]
+        for kind, value in labels:
+            if kind in ("boundary", "security"):
+                items.extend((kind, f, value) for f in (fields or [None]))
+            elif kind == "browser":
+                items.append((kind, value))
+        return items or [("case", category, title)]
+
+
+class SuiteMinimizer:
+    """
+    [NEW v3.1] Coverage-preserving minimizer.
+    minimize(cases) returns the kept cases in their original order (IDs unchanged);
+    report() proves coverage equivalence and lists what each dropped case was covered by.
+    """
+
+    def __init__(self, model: CoverageModel, keep_priorities: Sequence[str] = (MUST_KEEP,)):
+        self.model = model
+        self.keep_priorities = set(keep_priorities)
+        self._report: Dict[str, Any] = {}
+
+    def minimize(self, test_cases: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        cases = list(test_cases)
+        ids: Dict[tuple, int] = {}
+        case_items: List[Tuple[int, ...]] = []
+        for tc in cases:
+            case_items.append(tuple({ids.setdefault(item, len(ids)) for item in self.model.items(tc)}))
+
+        covered = bytearray(len(ids))
+        cover_count = [0] * len(ids)
+        picked: List[int] = []
+
+        def pick(idx: int):
+            picked.append(idx)
+            for item in case_items[idx]:
+                covered[item] = 1
+                cover_count[item] += 1
+
+        forced = [i for i, tc in enumerate(cases) if tc.get('priority') in self.keep_priorities]
+        for idx in forced:
+            pick(idx)
+
+        # Lazy greedy: stored gains only ever overestimate, so re-check on pop
+        heap = [(-len(items), PRIORITY_RANK.get(cases[i].get('priority'), 9), i)
+                for i, items in enumerate(case_items) if cases[i].get('priority') not in self.keep_priorities]
+        heapq.heapify(heap)
+        while heap:
+            stored, rank, idx = heapq.heappop(heap)
+            gain = sum(1 for item in case_items[idx] if not covered[item])
+            if gain == 0:
+                continue
+            if gain == -stored:
+                pick(idx)
+            else:
+                heapq.heappush(heap, (-gain, rank, idx))
+
+        # Reverse pass: a greedy pick whose items are all covered by other picks is redundant
+        kept = set(picked)
+        for idx in reversed(picked[len(forced):]):
+            if all(cover_count[item] > 1 for item in case_items[idx]):
+                kept.discard(idx)
+                for item in case_items[idx]:
+                    cover_count[item] -= 1
+
+        order = sorted(kept)
+        self._report = self._build_report(cases, case_items, ids, order)
+        return [cases[i] for i in order]
+
+    def _build_report(self, cases, case_items, ids, order) -> Dict[str, Any]:
+        names = [None] * len(ids)
+        for item, idx in ids.items():
+            names[idx] = item
+
+        # Independent re-check: the items of the kept cases must equal the items of the suite
+        owner: Dict[int, str] = {}
+        for i in order:
+            for item in case_items[i]:
+                owner.setdefault(item, cases[i].get('id'))
+        uncovered = ["/".join(str(part) for part in names[item]) for item in range(len(ids)) if item not in owner]
+
+        items_by_kind: Dict[str, int] = {}
+        for item in names:
+            items_by_kind[item[0]] = items_by_kind.get(item[0], 0) + 1
+
+        by_category: Dict[str, Dict[str, int]] = {}
+        kept = set(order)
+        for i, tc in enumerate(cases):
+            row = by_category.setdefault(tc.get('category', ''), {"before": 0, "after": 0})
+            row["before"] += 1
+            row["after"] += i in kept
+
+        dropped = [{
+            "id": tc.get('id'),
+            "title": tc.get('title', ''),
+            "covered_by": sorted({owner[item] for item in case_items[i] if item in owner})
+        } for i, tc in enumerate(cases) if i not in kept]
+
+        before, after = len(cases), len(order)
+        return {
+            "cases_before": before,
+            "cases_after": after,
+            "reduction_pct": round(100.0 * (before - after) / before, 1) if before else 0.0,
+            "keep_priorities": sorted(self.keep_priorities),
+            "schema_model": self.model.has_schema,
+            "coverage_items": len(ids),
+            "coverage_items_after": len(owner),
+            "coverage_equivalent": not uncovered,
+            "uncovered": uncovered,
+            "items_by_kind": items_by_kind,
+            "by_category": [{"category": name, **row} for name, row in by_category.items()],
+            "dropped": dropped
+        }
+
+    def report(self) -> Dict[str, Any]:
+        return self._report
+
+
+def run_minimize(input_path: str, output_path: Optional[str] = None, schema_path: Optional[str] = None,
+                 keep_priorities: Sequence[str] = (MUST_KEEP,)) -> bool:
+    """
+    [NEW v3.1] Writes the minimized suite (default: <input>_minimized.json / .jsonl) and
+    <output>_report.json. The schema is optional but gives field/rule coverage by name.
+    """
+    log.info(f"🚀 Minimizing suite: {input_path}...")
+    if not os.path.exists(input_path):
+        log.error(f"❌ Test cases not found: {input_path}")
+        return False
+    test_cases = unwrap_test_cases(load_test_cases_document(input_path))
+
+    schema = None
+    if schema_path and os.path.exists(schema_path):
+        try:
+            from .schema_loader import load_schema
+        except ImportError:
+            from schema_loader import load_schema
+        schema = load_schema(schema_path)
+    elif schema_path:
+        log.warning(f"⚠️ Schema not found ({schema_path}); coverage falls back to titles.")
+
+    minimizer = SuiteMinimizer(CoverageModel(schema), keep_priorities)
+    kept = minimizer.minimize(test_cases)
+    report = minimizer.report()
+
+    stem, ext = os.path.splitext(input_path)
+    output_path = output_path or f"{stem}_minimized{ext or '.json'}"
+    with open(output_path, "w", encoding="utf-8") as f:
+        write_test_cases(kept, f, output_path)
+    report_path = minimized_report_path(output_path)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"input": input_path, "schema": schema_path if schema else None, **report}, f, indent=2, ensure_ascii=False)
+
+    log.info(f"✅ Kept {report['cases_after']}/{report['cases_before']} cases ({report['reduction_pct']}% smaller), "
+             f"{report['coverage_items_after']}/{report['coverage_items']} coverage items -> {output_path}")
+    if not report["coverage_equivalent"]:
+        log.error(f"❌ Coverage lost for {len(report['uncovered'])} items (see {report_path})")
+        return False
+    log.info(f"   -> Coverage report: {report_path}")
+    return True
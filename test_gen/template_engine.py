@@ -3,12 +3,42 @@ Template Engine for Test Case Generation
 Handles Jinja2 template rendering with statistics calculation
 """
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from collections import Counter
 from datetime import datetime
 import os
 
+# Define Functional types (both code and full names)
+FUNCTIONAL_TYPES = [
+    'FUNC', 'VAL',  # Code types
+    'Functional', 'Validation',  # Full names from AI
+    'Business Logic' # [NEW v2.3] Treated as Functional
+]
+
+# Extended mapping for both code types and full names
+NFT_TYPE_TO_CATEGORY = {
+    # Code types
+    'SEC': 'Security',
+    'PERF': 'Performance',
+    'COMP': 'Compatibility',
+    'UX': 'Usability',
+    'ANA': 'Analytics',
+    'AVAIL': 'Availability',
+    'REL': 'Reliability',
+    'ACCESS': 'Accessibility',
+    
+    # Full names (from AI output)
+    'Security': 'Security',
+    'Performance': 'Performance',
+    'Compatibility': 'Compatibility',
+    'Usability': 'Usability',
+    'UI/UX': 'Usability',
+    'Analytics': 'Analytics',
+    'Availability': 'Availability',
+    'Reliability': 'Reliability',
+    'Accessibility': 'Accessibility'
+}
+
 
 def render_template(template_path: str, data: dict) -> str:
     """
@@ -21,6 +51,9 @@ def render_template(template_path: str, data: dict) -> str:
     Returns:
         Rendered markdown content
     """
+    # [NEW v3.1] Imported here so the data helpers below work without Jinja2
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
     # Extract directory and filename
     template_dir = os.path.dirname(template_path)
     template_file = os.path.basename(template_path)
@@ -94,26 +127,8 @@ def categorize_testcases(test_cases: List[Dict[str, Any]]) -> tuple:
     functional = []
     non_functional = []
     
-    # Define Functional types (both code and full names)
-    functional_types = [
-        'FUNC', 'VAL',  # Code types
-        'Functional', 'Validation',  # Full names from AI
-        'Business Logic' # [NEW v2.3] Treated as Functional
-    ]
-    
     for tc in test_cases:
-        # Prioritize 'category' key, fallback to 'type', default to 'FUNC'
-        tc_cat = tc.get('category')
-        tc_type = tc.get('type')
-        
-        # Use category if present, otherwise type. Default to FUNC only if both missing.
-        # However, be careful: if category is 'Visual', effective_type becomes 'Visual' -> Non-Functional. Correct.
-        # If category is 'Functional', effective_type becomes 'Functional' -> Functional. Correct.
-        
-        effective_type = tc_cat if tc_cat else (tc_type if tc_type else 'FUNC')
-        
-        # Check if it's a functional type
-        if effective_type in functional_types:
+        if is_functional(tc):
             functional.append(tc)
         else:
             # Non-Functional: SEC, PERF, Visual, Security, Performance, etc.
@@ -122,6 +137,29 @@ def categorize_testcases(test_cases: List[Dict[str, Any]]) -> tuple:
     return functional, non_functional
 
 
+def is_functional(tc: Dict[str, Any]) -> bool:
+    """ Functional vs Non-Functional test case (see categorize_testcases) """
+    # Prioritize 'category' key, fallback to 'type', default to 'FUNC'
+    tc_cat = tc.get('category')
+    tc_type = tc.get('type')
+    
+    # Use category if present, otherwise type. Default to FUNC only if both missing.
+    # However, be careful: if category is 'Visual', effective_type becomes 'Visual' -> Non-Functional. Correct.
+    # If category is 'Functional', effective_type becomes 'Functional' -> Functional. Correct.
+    
+    effective_type = tc_cat if tc_cat else (tc_type if tc_type else 'FUNC')
+    return effective_type in FUNCTIONAL_TYPES
+
+
+def nft_category(tc: Dict[str, Any]) -> Optional[str]:
+    """ NFT category of a non-functional case: its category, else derived from its type (None if unknown) """
+    # If category is already set, use it
+    if 'category' in tc and tc['category']:
+        return tc['category']
+    # Otherwise derive from type
+    return NFT_TYPE_TO_CATEGORY.get(tc.get('type', ''))
+
+
 def extract_nft_categories(non_functional: List[Dict[str, Any]]) -> list:
     """
     Extract unique Non-Functional Testing categories from test cases
@@ -134,41 +172,12 @@ def extract_nft_categories(non_functional: List[Dict[str, Any]]) -> list:
     Returns:
         Sorted list of unique category names
     """
-    # Extended mapping for both code types and full names
-    type_to_category = {
-        # Code types
-        'SEC': 'Security',
-        'PERF': 'Performance',
-        'COMP': 'Compatibility',
-        'UX': 'Usability',
-        'ANA': 'Analytics',
-        'AVAIL': 'Availability',
-        'REL': 'Reliability',
-        'ACCESS': 'Accessibility',
-        
-        # Full names (from AI output)
-        'Security': 'Security',
-        'Performance': 'Performance',
-        'Compatibility': 'Compatibility',
-        'Usability': 'Usability',
-        'UI/UX': 'Usability',
-        'Analytics': 'Analytics',
-        'Availability': 'Availability',
-        'Reliability': 'Reliability',
-        'Accessibility': 'Accessibility'
-    }
-    
     categories = set()
     
     for tc in non_functional:
-        tc_type = tc.get('type', '')
-        
-        # If category is already set, use it
-        if 'category' in tc and tc['category']:
-            categories.add(tc['category'])
-        # Otherwise derive from type
-        elif tc_type in type_to_category:
-            categories.add(type_to_category[tc_type])
+        category = nft_category(tc)
+        if category:
+            categories.add(category)
     
     return sorted(list(categories))
 
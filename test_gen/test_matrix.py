@@ -4,54 +4,179 @@ import argparse
 import sys
 import os
 
-from .logger import log
+try:
+    from .logger import log
+    from .covering_array import covering_array
+except ImportError:
+    from logger import log
+    from covering_array import covering_array
+
+# --strategy value -> (covering array strength or None for full factorial, label)
+STRATEGIES = {
+    "pairwise": (2, "Pairwise (2-wise covering array)"),
+    "3-wise": (3, "3-wise covering array"),
+    "full": (None, "Full Factorial (Cartesian Product)"),
+}
+
+def parse_constraint(expr):
+    """
+    [NEW v3.1] Parses a CLI forbidden combination: "Role=Guest & Action=Delete|Edit".
+    Returns { "Role": ["Guest"], "Action": ["Delete", "Edit"] }.
+    """
+    constraint = {}
+    for term in expr.split("&"):
+        if "=" not in term:
+            raise ValueError(f"Invalid constraint term '{term.strip()}' (expected Param=Value)")
+        name, values = term.split("=", 1)
+        constraint[name.strip()] = [v.strip() for v in values.split("|")]
+    return constraint
+
+def _compile_constraints(keys, values, constraints):
+    """
+    Turns forbidden combinations ({param: value or [values]}) into a check over a PARTIAL
+    assignment {param index: value}. A combination only forbids once all its params are set,
+    so callers can reject a prefix and prune everything below it.
+    """
+    index = {k: i for i, k in enumerate(keys)}
+    compiled = []
+    for c in constraints or []:
+        unknown = [name for name in c if name not in index]
+        if unknown:
+            raise ValueError(f"Constraint {c} references unknown factor(s): {unknown}")
+        # Match on the string form so CLI constraints ("1") also hit JSON values (1)
+        compiled.append([
+            (index[name], {str(v) for v in (allowed if isinstance(allowed, list) else [allowed])})
+            for name, allowed in c.items()
+        ])
+    if not compiled:
+        return None
+
+    def allowed(partial):
+        for terms in compiled:
+            if all(i in partial and str(partial[i]) in vals for i, vals in terms):
+                return False
+        return True
+    return allowed
+
+def iter_full_factorial(factors, constraints=None):
+    """
+    [NEW v3.1] Lazily yields Full Factorial scenarios (depth-first Cartesian product).
+    Forbidden combinations are checked on every prefix, so a forbidden prefix skips
+    its whole subtree instead of generating and then filtering it.
+    """
+    keys = list(factors.keys())
+    values = list(factors.values())
+    allowed = _compile_constraints(keys, values, constraints)
+    if allowed is None:
+        for combo in itertools.product(*values):
+            yield dict(zip(keys, combo))
+        return
+    if not keys:
+        return
+
+    partial = {}
+    stack = [iter(values[0])]
+    while stack:
+        depth = len(stack) - 1
+        for value in stack[-1]:
+            partial[depth] = value
+            if allowed(partial):
+                break
+        else:
+            stack.pop()
+            partial.pop(depth, None)
+            continue
+        if depth == len(keys) - 1:
+            yield {k: partial[i] for i, k in enumerate(keys)}
+        else:
+            stack.append(iter(values[depth + 1]))
+
+def iter_nwise(factors, strength=2, constraints=None):
+    """
+    [NEW v3.1] Yields a t-wise covering array: every combination of `strength` factor
+    values that no constraint forbids appears in at least one scenario.
+    """
+    keys = list(factors.keys())
+    values = list(factors.values())
+    allowed = _compile_constraints(keys, values, constraints)
+    for row in covering_array(values, strength, allowed):
+        yield dict(zip(keys, row))
+
+def iter_scenarios(factors, strategy="full", constraints=None):
+    strength, _ = STRATEGIES[strategy]
+    if strength is None:
+        return iter_full_factorial(factors, constraints)
+    return iter_nwise(factors, strength, constraints)
 
 def generate_full_factorial(factors):
     """
     Generate Full Factorial combinations (Cartesian Product).
     factors: dict { "param_name": [val1, val2] }
     """
-    keys = list(factors.keys())
-    values = list(factors.values())
-    
-    combinations = list(itertools.product(*values))
-    
-    result = []
-    for combo in combinations:
-        # Zip keys with values to make readable dict
-        scenario = dict(zip(keys, combo))
-        result.append(scenario)
-        
-    return result
+    return list(iter_full_factorial(factors))
+
+def write_jsonl(scenarios, f):
+    """ Streams one scenario per line. Returns the count. """
+    count = 0
+    for scenario in scenarios:
+        f.write(json.dumps(scenario, ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+def write_matrix_json(scenarios, f, strategy_label):
+    """
+    Streams the legacy {"strategy", "scenarios", "total_scenarios"} document.
+    total_scenarios is written last since the count is only known at the end.
+    """
+    f.write('{\n  "strategy": ' + json.dumps(strategy_label) + ',\n  "scenarios": [')
+    count = 0
+    for scenario in scenarios:
+        item = json.dumps(scenario, indent=2).replace("\n", "\n    ")
+        f.write(("," if count else "") + "\n    " + item)
+        count += 1
+    f.write("\n  ]" if count else "]")
+    f.write(',\n  "total_scenarios": ' + str(count) + '\n}')
+    return count
 
 def load_matrix_def(filepath):
+    """
+    Returns (factors, constraints). Accepts the legacy flat factors dict or
+    { "factors": {...}, "constraints": [ {param: value or [values]}, ... ] }.
+    """
     with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        data = json.load(f)
+    if isinstance(data.get("factors"), dict):
+        return data["factors"], data.get("constraints", [])
+    return data, []
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate Test Matrix (Combinations)")
     parser.add_argument("--input", required=True, help="JSON Definition of Factors (e.g. {'Role': ['A','B'], 'Status': [1,0]})")
-    parser.add_argument("--output", help="Output JSON file path", default="output/test_matrix.json")
-    
+    parser.add_argument("--output", help="Output file path (.jsonl = one scenario per line)", default="output/test_matrix.json")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="full", help="Combination strategy")
+    parser.add_argument("--forbid", action="append", default=[], help="Forbidden combination, e.g. \"Role=Guest & Action=Delete|Edit\" (repeatable)")
+
     args = parser.parse_args()
-    
+
     try:
-        factors = load_matrix_def(args.input)
-        
-        matrix = generate_full_factorial(factors)
-        
-        output_data = {
-            "strategy": "Full Factorial (Cartesian Product)",
-            "total_scenarios": len(matrix),
-            "scenarios": matrix
-        }
-        
-        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        factors, constraints = load_matrix_def(args.input)
+        constraints = constraints + [parse_constraint(expr) for expr in args.forbid]
+
+        scenarios = iter_scenarios(factors, args.strategy, constraints)
+        label = STRATEGIES[args.strategy][1]
+
+        out_dir = os.path.dirname(args.output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
         with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2)
-            
-        log.info(f"Generated {len(matrix)} scenarios. Saved to {args.output}")
-        
+            if args.output.endswith(".jsonl"):
+                count = write_jsonl(scenarios, f)
+            else:
+                count = write_matrix_json(scenarios, f, label)
+
+        log.info(f"Generated {count} scenarios ({label}, {len(constraints)} constraint(s)). Saved to {args.output}")
+
     except Exception as e:
         log.error(f"Error: {e}")
         sys.exit(1)
@@ -0,0 +1,171 @@
+"""
+Test Case I/O
+Streaming readers/writers for raw_testcases.json and raw_testcases.jsonl.
+The format follows the file extension: .jsonl holds one test case per line
+(no wrapper document), so it can be read, rewritten and appended case by case.
+"""
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+# First line of a journal (case_store.py):
+# {"_journal": 1, "base_count": <cases in the document>, "document": <document_stamp when started>}
+JOURNAL_HEADER = "_journal"
+
+
+def is_jsonl(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS
+
+
+def journal_path(path: str) -> str:
+    """ Append-only journal of a JSON document: raw_testcases.json -> raw_testcases.journal.jsonl """
+    return os.path.splitext(path)[0] + ".journal.jsonl"
+
+
+def document_stamp(path: str) -> Optional[List[int]]:
+    """
+    [size, mtime_ns] of a JSON document (None if it does not exist). A journal records
+    the stamp of the document it extends; the document is only rewritten together
+    with its journal, so a different stamp means the journal belongs to an older file.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_journal_header(path: str) -> Optional[Dict[str, Any]]:
+    """ Header line of the journal of path (None if there is no journal or no header). """
+    journal = journal_path(path)
+    if not os.path.exists(journal):
+        return None
+    with open(journal, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                header = json.loads(line)
+                return header if JOURNAL_HEADER in header else None
+    return None
+
+
+def journal_is_current(path: str) -> bool:
+    """ True if path has a journal that was started for the document as it is now. """
+    header = read_journal_header(path)
+    return header is not None and header.get("document") == document_stamp(path)
+
+
+def write_test_cases_json(test_cases: Iterable[Dict[str, Any]], f: TextIO, key: str = "test_cases") -> int:
+    """
+    Streams test cases into a {"test_cases": [...]} document, one case at a time.
+    Output is identical to json.dump({key: list(test_cases)}, f, indent=2, ensure_ascii=False).
+    Returns the number of cases written.
+    """
+    count = 0
+    f.write("{\n  " + json.dumps(key) + ": [")
+    for tc in test_cases:
+        body = json.dumps(tc, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+        f.write(("," if count else "") + "\n    " + body)
+        count += 1
+    f.write("\n  ]\n}" if count else "]\n}")
+    return count
+
+
+def write_test_cases_jsonl(test_cases: Iterable[Dict[str, Any]], f: TextIO) -> int:
+    """ [NEW v3.1] One compact JSON object per line. Returns the number of cases written. """
+    count = 0
+    for tc in test_cases:
+        f.write(json.dumps(tc, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_test_cases(test_cases: Iterable[Dict[str, Any]], f: TextIO, path: str) -> int:
+    """ Streams test cases in the format of path (JSON Lines for .jsonl, else the JSON document). """
+    if is_jsonl(path):
+        return write_test_cases_jsonl(test_cases, f)
+    return write_test_cases_json(test_cases, f)
+
+
+def iter_test_cases_jsonl(f: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Test cases of a JSON Lines stream, one line at a time (blank lines skipped).
+    A malformed line raises json.JSONDecodeError with lineno set to its line in the file.
+    """
+    for lineno, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            e.lineno = lineno
+            raise
+
+
+def unwrap_test_cases(data: Any) -> List[Dict[str, Any]]:
+    """ The test case list of a raw JSON document ({"test_cases": [...]} or a bare list). """
+    if isinstance(data, list):
+        return data
+    return data.get("test_cases", [])
+
+
+def iter_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Cases appended to the journal of a JSON document. None if it has no journal,
+    or if the journal is stale (the document was replaced since it was started).
+    """
+    if not journal_is_current(path):
+        return
+    with open(journal_path(path), "r", encoding="utf-8") as f:
+        for tc in iter_test_cases_jsonl(f):
+            if JOURNAL_HEADER not in tc:
+                yield tc
+
+
+def load_test_cases_document(path: str) -> Dict[str, Any]:
+    """
+    [NEW v3.1] The raw document of either format: JSON as stored, JSON Lines
+    wrapped as {"test_cases": [...]} so callers handle both the same way.
+    Cases journaled for this JSON document (case_store.py) are merged in.
+    """
+    if is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return {"test_cases": list(iter_test_cases_jsonl(f))}
+    journaled = list(iter_journal(path))
+    if journaled and not os.path.exists(path):
+        return {"test_cases": journaled}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if journaled:
+        if isinstance(data, list):
+            data.extend(journaled)
+        else:
+            data.setdefault("test_cases", []).extend(journaled)
+    return data
+
+
+def iter_test_cases(path: str) -> Iterator[Dict[str, Any]]:
+    """ [NEW v3.1] Test cases of a raw file; JSON Lines are streamed, JSON is parsed whole. """
+    if is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from iter_test_cases_jsonl(f)
+    else:
+        yield from unwrap_test_cases(load_test_cases_document(path))
+
+
+def append_test_cases_jsonl(path: str, test_cases: Iterable[Dict[str, Any]]) -> int:
+    """ [NEW v3.1] Appends cases to a JSON Lines file without reading it. """
+    with open(path, "a", encoding="utf-8") as f:
+        return write_test_cases_jsonl(test_cases, f)
+
+
+def count_test_cases(path: str) -> int:
+    """ Number of cases in a raw file (JSON Lines: counted line by line, nothing parsed). """
+    if is_jsonl(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+    if not os.path.exists(path) and not os.path.exists(journal_path(path)):
+        return 0
+    return len(unwrap_test_cases(load_test_cases_document(path)))
@@ -0,0 +1,71 @@
+"""
+Title Translator
+Compiled English -> Vietnamese keyword translator for test case titles.
+"""
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class TitleTranslator:
+    """
+    [NEW v3.1] Single-pass keyword translator.
+    All keywords are compiled into ONE alternation (longest keyword first), so a title
+    is scanned once instead of running one re.sub per keyword. Results are memoized.
+    """
+
+    def __init__(self, translations: Dict[str, str], passthrough_prefixes: Iterable[str] = (), max_cache_size: int = 100000):
+        # Sort by length (longer first to match phrases before words).
+        # sorted() is stable, so equal-length keywords keep the mapping order.
+        ordered = sorted(translations.items(), key=lambda x: len(x[0]), reverse=True)
+        self._replacements = [vietnamese for _, vietnamese in ordered]
+
+        # One named group per keyword so the match tells us WHICH keyword hit,
+        # independent of how IGNORECASE folded the input text.
+        alternation = "|".join(f"(?P<k{idx}>{re.escape(english)})" for idx, (english, _) in enumerate(ordered))
+        # Word boundaries prevent mid-word replacements ('on' must not match 'Option')
+        self._pattern = re.compile(r'\b(?:' + alternation + r')\b', flags=re.IGNORECASE) if ordered else None
+
+        self.passthrough_prefixes = tuple(passthrough_prefixes)
+        self.max_cache_size = max_cache_size
+        self._cache: Dict[str, str] = {}
+
+    def _replace(self, match: "re.Match") -> str:
+        return self._replacements[int(match.lastgroup[1:])]
+
+    def translate(self, english_title: str) -> str:
+        """ Translate a title. Titles starting with a passthrough prefix are returned as-is. """
+        cached = self._cache.get(english_title)
+        if cached is not None:
+            return cached
+
+        if self._pattern is None or english_title.startswith(self.passthrough_prefixes):
+            translated = english_title
+        else:
+            translated = self._pattern.sub(self._replace, english_title)
+
+        if len(self._cache) >= self.max_cache_size:
+            self._cache.clear()
+        self._cache[english_title] = translated
+        return translated
+
+    __call__ = translate
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+# Process-wide registry: one compiled translator per distinct mapping
+_TRANSLATORS: Dict[Tuple, TitleTranslator] = {}
+
+
+def get_translator(translations: Dict[str, str], passthrough_prefixes: Iterable[str] = ()) -> TitleTranslator:
+    """
+    Returns the shared TitleTranslator for this mapping, compiling it on first use.
+    """
+    prefixes = tuple(passthrough_prefixes)
+    key = (tuple(translations.items()), prefixes)
+    translator: Optional[TitleTranslator] = _TRANSLATORS.get(key)
+    if translator is None:
+        translator = TitleTranslator(translations, prefixes)
+        _TRANSLATORS[key] = translator
+    return translator
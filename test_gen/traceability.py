@@ -0,0 +1,152 @@
+"""
+Traceability
+Per-case provenance ("source": element@expander#variant, set by MatrixEngine._add_tc)
+and the inverted index persisted next to raw_testcases.json (<stem>_trace.json):
+schema element / expander -> case IDs, so "which cases test Area Filter?" is a
+dict lookup instead of a full-text scan of the suite.
+A rendered suite keeps a match key -> row ID map next to it (<suite>_ids.json), so
+impact deltas address its rows by provenance instead of by positional ID.
+"""
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+TRACE_VERSION = 1
+GLOBAL_ELEMENT = "global"
+
+_SOURCE = re.compile(r"^(.*?)@(_\w+)#(.*)$", re.DOTALL)
+
+
+def trace_index_path(test_cases_path: str) -> str:
+    return os.path.splitext(test_cases_path)[0] + "_trace.json"
+
+
+def suite_ids_path(suite_path: str) -> str:
+    """ Match key -> row ID map kept next to a rendered suite: test_cases.md -> test_cases_ids.json """
+    return os.path.splitext(suite_path)[0] + "_ids.json"
+
+
+def element_key(element: Any) -> str:
+    """ "field:Area Filter", "section:Project List", "rule:BR-004", "visual:Header" or "global". """
+    kind = type(element).__name__
+    if kind == "FieldType":
+        return f"field:{element.name}"
+    if kind == "Section":
+        return f"section:{element.name}"
+    if kind == "BusinessRule":
+        return f"rule:{element.id}"
+    if kind == "VisualRule":
+        return f"visual:{element.element_name}"
+    return GLOBAL_ELEMENT
+
+
+def format_source(element: str, expander: str, variant: str) -> str:
+    return f"{element}@{expander}#{variant}"
+
+
+def parse_source(source: str) -> Optional[Tuple[str, str, str]]:
+    """ (element, expander, variant), or None for cases without provenance. """
+    match = _SOURCE.match(source or "")
+    return match.groups() if match else None
+
+
+def match_keys(test_cases: Iterable[Any]) -> Dict[str, Any]:
+    """
+    [NEW v3.1] Stable key -> case: "element@expander#variant~n" (n-th case with that
+    provenance). Unlike IDs, keys do not shift when cases are added or removed elsewhere.
+    Cases without provenance fall back to their title.
+    """
+    keyed = {}
+    occurrences: Dict[str, int] = {}
+    for tc in test_cases:
+        base = format_source(*(parse_source(tc.get('source', '')) or ("", "", tc.get('title', ''))))
+        n = occurrences[base] = occurrences.get(base, 0) + 1
+        keyed[f"{base}~{n}"] = tc
+    return keyed
+
+
+def load_suite_ids(suite_path: str) -> Optional[Dict[str, str]]:
+    """ The suite's match key -> row ID map, or None if it has none. """
+    try:
+        with open(suite_ids_path(suite_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != TRACE_VERSION:
+        return None
+    return data.get("ids", {})
+
+
+def save_suite_ids(suite_path: str, ids: Dict[str, str]):
+    with open(suite_ids_path(suite_path), "w", encoding="utf-8") as f:
+        json.dump({"version": TRACE_VERSION, "ids": ids}, f, ensure_ascii=False, indent=1)
+
+
+class TraceIndex:
+    """
+    [NEW v3.1] Inverted index element -> case IDs (and expander -> case IDs).
+    Elements are looked up by full key ("field:Area Filter") or by bare name ("Area Filter").
+    """
+
+    def __init__(self):
+        self.elements: Dict[str, List[str]] = {}
+        self.expanders: Dict[str, List[str]] = {}
+        self.cases = 0
+        self._names: Optional[Dict[str, List[str]]] = None
+
+    def add(self, tc):
+        self.cases += 1
+        parsed = parse_source(tc.get('source', ''))
+        if parsed is None:
+            return
+        element, expander, _ = parsed
+        self.elements.setdefault(element, []).append(tc['id'])
+        self.expanders.setdefault(expander, []).append(tc['id'])
+        self._names = None
+
+    def track(self, test_cases: Iterable[Any]) -> Iterable[Any]:
+        """ Passes test cases through while indexing them (for streaming writers). """
+        for tc in test_cases:
+            self.add(tc)
+            yield tc
+
+    def cases_for(self, element: str) -> List[str]:
+        ids = self.elements.get(element)
+        if ids is not None:
+            return ids
+        if self._names is None:
+            self._names = {}
+            for key in self.elements:
+                self._names.setdefault(key.split(":", 1)[-1], []).append(key)
+        found = []
+        for key in self._names.get(element, ()):
+            found.extend(self.elements[key])
+        return found
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": TRACE_VERSION, "cases": self.cases, "elements": self.elements, "expanders": self.expanders}
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TraceIndex"]:
+        """ The persisted index, or None if missing / from another version. """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != TRACE_VERSION:
+            return None
+        index = cls()
+        index.cases = data.get("cases", 0)
+        index.elements = data.get("elements", {})
+        index.expanders = data.get("expanders", {})
+        return index
+
+    @classmethod
+    def for_test_cases(cls, test_cases_path: str) -> Optional["TraceIndex"]:
+        return cls.load(trace_index_path(test_cases_path))
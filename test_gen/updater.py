@@ -1,19 +1,193 @@
 import os
-import json
+import re
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 from .logger import log
+from .traceability import TraceIndex, load_suite_ids, save_suite_ids
+from .impact import DELTA_KIND, id_allocator
+from .template_engine import is_functional
+from .testcase_io import load_test_cases_document
+
+STATUS_CHECKBOXES = "[ ] Pass / [ ] Fail / [ ] Skip / [ ] Blocked"
+# Cell separators of a Markdown row (escaped pipes inside cells are kept)
+_CELL_SPLIT = re.compile(r'(?<!\\)\|')
+_TABLE_SEPARATOR = re.compile(r'^\|(\s*:?-+:?\s*\|)+\s*$')
+
+# [NEW v3.1] Suite columns an impact delta can fill, by normalized header name. Covers the
+# readable table (Exporter / Updater: 8 columns) and the report written by --step format
+# (11 functional / 10 non-functional columns).
+def _flat_steps(tc: dict) -> str:
+    steps = tc.get('steps', [])
+    return " • ".join(steps) if isinstance(steps, list) else str(steps).replace('\n', ' • ')
+
+CASE_COLUMNS = {
+    "id": lambda tc: tc.get('id', ''),
+    "priority": lambda tc: tc.get('priority', ''),
+    "title": lambda tc: tc.get('title', ''),
+    "category": lambda tc: tc.get('category', ''),
+    "step": _flat_steps,
+    "steps": _flat_steps,
+    "test_data": lambda tc: tc.get('test_data') or '-',
+    # Engine output uses 'expected', AI/manual output 'expected_result'
+    "expected_result": lambda tc: tc.get('expected_result', tc.get('expected', '')),
+    "pass_criteria": lambda tc: tc.get('expected_result', tc.get('expected', '')),
+}
+# Tester / report input kept when a row is rewritten, and its value in a new row
+KEPT_COLUMNS = {"module": "-", "pre_condition": "-", "tools/env": "-", "notes": "", "create_date": "", "execute_date": ""}
+KNOWN_COLUMNS = set(CASE_COLUMNS) | set(KEPT_COLUMNS) | {"status"}
+
+
+def _column(name: str) -> str:
+    """ "Pre-condition" -> "pre_condition", "Create Date" -> "create_date" """
+    return re.sub(r'[\s-]+', '_', name.strip().lower())
+
+
+def _cells(line: str) -> list:
+    return [c.strip() for c in _CELL_SPLIT.split(line)][1:-1]
 
 class Updater:
     def __init__(self, new_file: str, existing_file: str):
         self.new_file = new_file
         self.existing_file = existing_file
 
-    def sync(self, output_file: str):
+    @staticmethod
+    def _format_row(tc: dict, created: str, notes: str = "") -> str:
+        # Format: | id | priority | title | steps | expected | status | notes | created |
+        # Ensure fields exist
+        t_id = tc.get('id', '')
+        t_prio = tc.get('priority', '')
+        t_title = tc.get('title', '').replace('|', '\|').replace('\n', ' ')
+
+        # Flatten steps
+        steps = tc.get('steps', [])
+        if isinstance(steps, list): t_steps = " • ".join(steps)
+        else: t_steps = str(steps).replace('\n', ' • ')
+        t_steps = t_steps.replace('|', '\|')
+
+        # Engine output uses 'expected', AI/manual output 'expected_result'
+        t_exp = tc.get('expected_result', tc.get('expected', '')).replace('|', '\|').replace('\n', ' ')
+
+        return f"| {t_id} | {t_prio} | {t_title} | {t_steps} | {t_exp} | {STATUS_CHECKBOXES} | {notes} | {created} |"
+
+    @staticmethod
+    def _suite_tables(lines: list) -> list:
+        """
+        Test case tables of a suite: [{"columns", "rows": {id: line index}, "end": last line index}].
+        Raises ValueError for test case rows under a header this module does not know.
+        """
+        tables, table = [], None
+        for i, line in enumerate(lines):
+            if i and _TABLE_SEPARATOR.match(line) and lines[i - 1].startswith('|'):
+                table = {"columns": [_column(c) for c in _cells(lines[i - 1])], "rows": {}, "end": i}
+                tables.append(table)
+            elif line.startswith("| TC-"):
+                if table is None or "id" not in table["columns"]:
+                    raise ValueError(f"test case row without a recognised table header (line {i + 1})")
+                unknown = [c for c in table["columns"] if c not in KNOWN_COLUMNS]
+                if unknown:
+                    raise ValueError(f"unrecognised suite columns {unknown} (line {i + 1})")
+                table["rows"][_cells(line)[table["columns"].index("id")]] = i
+                table["end"] = i
+        return [t for t in tables if "id" in t["columns"] and set(t["columns"]) <= KNOWN_COLUMNS]
+
+    @staticmethod
+    def _delta_row(columns: list, tc: dict, today: str, old: dict) -> str:
+        """ Row of a suite table for tc: case columns from tc, status reset, the other columns from old. """
+        cells = []
+        for column in columns:
+            if column in CASE_COLUMNS:
+                value = CASE_COLUMNS[column](tc)
+            elif column == "status":
+                value = STATUS_CHECKBOXES
+            else:
+                value = old.get(column, "")
+            cells.append(str(value).replace('|', '\\|').replace('\n', ' '))
+        return "| " + " | ".join(cells) + " |"
+
+    def _apply_delta(self, existing_content: str, delta: dict, today: str, ids: dict) -> str:
+        """
+        [NEW v3.1] Patches the suite with an impact delta (impact.py): removed rows are
+        dropped, modified rows are rewritten in place (tester columns and created date kept,
+        status reset since the case changed) and added cases are appended to the table of
+        their kind. Columns are mapped by header name; unknown layouts raise ValueError.
+        Rows are found through ids (match key -> row ID, updated in place), never by the
+        delta's positional IDs; added cases are numbered after the suite's highest IDs.
+        """
+        lines = existing_content.strip().split('\n')
+        tables = self._suite_tables(lines)
+        if not tables:
+            raise ValueError("no test case table found")
+        row_table = {row_id: table for table in tables for row_id in table["rows"]}
+
+        # Cases whose provenance moved keep their row
+        moved = {item['to']: ids.pop(item['from']) for item in delta.get('relinked', []) if item['from'] in ids}
+        ids.update(moved)
+
+        missing = 0
+        removed = set()
+        for item in delta.get('removed', []):
+            row_id = ids.pop(item['key'], None)
+            if row_id in row_table:
+                removed.add(row_id)
+            else:
+                missing += 1
+        modified = {}
+        for item in delta.get('modified', []):
+            row_id = ids.get(item['key'])
+            if row_id in row_table:
+                modified[row_id] = dict(item['case'], id=row_id)
+            else:
+                missing += 1
+
+        allocate = id_allocator(list(row_table) + list(ids.values()))
+        appended = {}  # table index -> new rows
+        added = 0
+        for item in delta.get('added', []):
+            if ids.get(item['key']) in row_table:
+                continue  # already in the suite (delta applied before)
+            tc = dict(item['case'], id=allocate(item['case']))
+            ids[item['key']] = tc['id']
+            nft = [i for i, t in enumerate(tables) if "pass_criteria" in t["columns"]]
+            other = [i for i in range(len(tables)) if i not in nft]
+            target = (other or nft) if is_functional(tc) else (nft or other)
+            appended.setdefault(target[0], []).append(tc)
+            added += 1
+
+        by_line = {table["rows"][row_id]: (table, row_id) for table in tables for row_id in table["rows"]}
+        ends = {table["end"]: i for i, table in enumerate(tables)}
+        out = []
+        for i, line in enumerate(lines):
+            if i in by_line:
+                table, row_id = by_line[i]
+                if row_id in removed:
+                    line = None
+                elif row_id in modified:
+                    old = dict(zip(table["columns"], _cells(line)))
+                    line = self._delta_row(table["columns"], modified[row_id], today, old)
+            if line is not None:
+                out.append(line)
+            if i in ends and ends[i] in appended:
+                table = tables[ends[i]]
+                # New rows: tester columns empty, module as in the rest of the table
+                defaults = dict(KEPT_COLUMNS, create_date=today)
+                if table["rows"] and "module" in table["columns"]:
+                    defaults["module"] = _cells(lines[table["end"]])[table["columns"].index("module")]
+                out.extend(self._delta_row(table["columns"], tc, today, defaults) for tc in appended[ends[i]])
+
+        log.info(f"   -> Delta: +{added} rows, -{len(removed)} removed, ~{len(modified)} rewritten, "
+                 f"{len(moved)} relinked")
+        if missing:
+            log.warning(f"   ⚠️ {missing} removed/modified cases have no row in the suite (skipped)")
+        return '\n'.join(out) + '\n'
+
+    def sync(self, output_file: str, elements: list = None):
         """
         Append new test cases to existing Markdown file
         Preserve history, append new rows with Created Date
+        [NEW v3.1] elements: only sync the cases generated for these schema elements
+        (e.g. ["Area Filter", "rule:BR-004"]), looked up in the traceability index.
+        [NEW v3.1] If new_file is an impact delta (--step impact), it is applied in place instead.
         """
         log.info(f"🔄 Syncing: {self.new_file} -> {self.existing_file}")
         
@@ -26,12 +200,22 @@ class Updater:
             with open(self.existing_file, 'r', encoding='utf-8') as f:
                 existing_content = f.read()
 
-            # Read New (JSON)
-            with open(self.new_file, 'r', encoding='utf-8') as f:
-                new_data = json.load(f)
+            # Read New (JSON, or JSON Lines for .jsonl)
+            new_data = load_test_cases_document(self.new_file)
             
+            is_delta = isinstance(new_data, dict) and new_data.get('kind') == DELTA_KIND
             new_cases = new_data.get('test_cases', []) if isinstance(new_data, dict) else new_data
-            log.info(f"   -> Found {len(new_cases)} new test cases.")
+            if not is_delta:
+                log.info(f"   -> Found {len(new_cases)} new test cases.")
+
+            if elements is not None and not is_delta:
+                trace = TraceIndex.for_test_cases(self.new_file)
+                if trace is None:
+                    log.warning("   -> No traceability index next to the new cases; syncing all of them.")
+                else:
+                    wanted = {tc_id for element in elements for tc_id in trace.cases_for(element)}
+                    new_cases = [tc for tc in new_cases if tc.get('id') in wanted]
+                    log.info(f"   -> {len(new_cases)} of them trace to: {', '.join(elements)}")
 
             # Create Backup
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -43,27 +227,21 @@ class Updater:
 
             # Prepare New Rows
             today = datetime.now().strftime('%Y-%m-%d')
-            new_rows = []
-            
+
+            if is_delta:
+                ids = load_suite_ids(self.existing_file)
+                if ids is None:
+                    log.warning("   -> No ID map next to the suite; assuming it was rendered from the delta's old schema.")
+                    ids = dict(new_data.get('old_ids', {}))
+                updated_content = self._apply_delta(existing_content, new_data, today, ids)
+                with open(self.existing_file, 'w', encoding='utf-8') as f:
+                    f.write(updated_content)
+                save_suite_ids(self.existing_file, ids)
+                log.info(f"✅ Sync Complete. Delta applied to {self.existing_file}")
+                return
+
             # Simple check for duplicates by ID in existing content could be added here
-            
-            for tc in new_cases:
-                # Format: | id | priority | title | steps | expected | status | notes | created |
-                # Ensure fields exist
-                t_id = tc.get('id', '')
-                t_prio = tc.get('priority', '')
-                t_title = tc.get('title', '').replace('|', '\|').replace('\n', ' ')
-                
-                # Flatten steps
-                steps = tc.get('steps', [])
-                if isinstance(steps, list): t_steps = " • ".join(steps)
-                else: t_steps = str(steps).replace('\n', ' • ')
-                t_steps = t_steps.replace('|', '\|')
-
-                t_exp = tc.get('expected_result', '').replace('|', '\|').replace('\n', ' ')
-                
-                row = f"| {t_id} | {t_prio} | {t_title} | {t_steps} | {t_exp} | [ ] Pass / [ ] Fail / [ ] Skip / [ ] Blocked | | {today} |"
-                new_rows.append(row)
+            new_rows = [self._format_row(tc, today) for tc in new_cases]
 
             # Append
             if new_rows:
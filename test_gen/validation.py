@@ -2,6 +2,13 @@ import json
 import re
 from typing import List, Dict, Any, Tuple
 
+try:
+    from .traceability import TraceIndex
+    from .testcase_io import load_test_cases_document
+except ImportError:
+    from traceability import TraceIndex
+    from testcase_io import load_test_cases_document
+
 class ValidationEngine:
     """
     [NEW v4.0] Proactive Quality Gate
@@ -27,11 +34,15 @@ class ValidationEngine:
 
     def __init__(self, schema_path: str):
         self.schema_content = ""
+        self.schema_data = {}
         try:
             with open(schema_path, 'r', encoding='utf-8') as f:
-                self.schema_content = f.read().lower()
+                raw = f.read()
+            self.schema_content = raw.lower()
+            self.schema_data = json.loads(raw)
         except Exception:
-            print(f"⚠️ Warning: Could not read schema from {schema_path}")
+            if not self.schema_content:
+                print(f"⚠️ Warning: Could not read schema from {schema_path}")
 
     def validate(self, test_cases_path: str) -> bool:
         """
@@ -41,16 +52,16 @@ class ValidationEngine:
         print(f"🛡️  Starting Validation on {test_cases_path}...")
         
         try:
-            with open(test_cases_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Handle wrapper key if present
-                if isinstance(data, dict) and "test_cases" in data:
-                    test_cases = data["test_cases"]
-                elif isinstance(data, list):
-                    test_cases = data
-                else:
-                    print("❌ Error: Invalid JSON structure (expected list or dict with 'test_cases' key)")
-                    return False
+            # [NEW v3.1] JSON or JSON Lines, plus manual cases still in the add journal
+            data = load_test_cases_document(test_cases_path)
+            # Handle wrapper key if present
+            if isinstance(data, dict) and "test_cases" in data:
+                test_cases = data["test_cases"]
+            elif isinstance(data, list):
+                test_cases = data
+            else:
+                print("❌ Error: Invalid JSON structure (expected list or dict with 'test_cases' key)")
+                return False
         except Exception as e:
             print(f"❌ Error loading test cases: {e}")
             return False
@@ -65,6 +76,9 @@ class ValidationEngine:
         data_issues = self._check_data_quality(test_cases)
         issues.extend(data_issues)
 
+        # 3. [NEW v3.1] Schema elements without any generated case (needs the traceability index)
+        issues.extend(self._check_traceability(test_cases_path))
+
         # Report Results
         if not issues:
             print("✅ Validation PASSED: No issues found.")
@@ -90,7 +104,11 @@ class ValidationEngine:
             
             # Scan Test Cases
             for tc in test_cases:
-                content = (tc.get('title', '') + " " + tc.get('steps', '')).lower()
+                steps = tc.get('steps', '')
+                if isinstance(steps, list):
+                    # Manual (--step add) and AI cases keep steps as a list
+                    steps = " ".join(str(step) for step in steps)
+                content = (tc.get('title', '') + " " + steps).lower()
                 for kw in keywords:
                     if kw in content:
                         issues.append({
@@ -101,6 +119,23 @@ class ValidationEngine:
                         break # One hit per TC is enough
         return issues
 
+    def _check_traceability(self, test_cases_path: str) -> List[Dict]:
+        trace = TraceIndex.for_test_cases(test_cases_path)
+        if trace is None or not isinstance(self.schema_data, dict):
+            return []
+
+        issues = []
+        elements = [f"field:{field.get('name')}" for section in self.schema_data.get('sections', []) for field in section.get('fields', [])]
+        elements += [f"rule:{rule.get('id')}" for rule in self.schema_data.get('business_rules', [])]
+        for element in elements:
+            if not trace.cases_for(element):
+                issues.append({
+                    "type": "UNTRACED",
+                    "tc_id": "-",
+                    "message": f"Schema element '{element}' has no generated test case."
+                })
+        return issues
+
     def _check_data_quality(self, test_cases: List[Dict]) -> List[Dict]:
         issues = []
         # Patterns looking for random strings like "Xy7z" (Capital, lower, digit mix, len 4-8)
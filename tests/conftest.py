@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the package as test_gen.<module>, whatever directory pytest runs from
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
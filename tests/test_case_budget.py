@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from test_gen.case_budget import PRIORITY_WEIGHTS, CaseBudget, parse_category_budget
+
+CATEGORIES = ["Business", "Security", "UI"]
+PRIORITIES = ["P0", "P1", "P1", "P2", "P2", "P3", "P3", "P3"]
+
+
+def _cases(count=600):
+    """ Fresh cases (apply renumbers them in place): one P0 in 8, 25 P0s per category of 600. """
+    return [{"id": f"TC-ORIG-{i:04d}", "category": CATEGORIES[i % 3], "priority": PRIORITIES[i % len(PRIORITIES)],
+             "title": f"case {i}"} for i in range(count)]
+
+
+def _seq(tc):
+    return int(tc["title"].split()[1])
+
+
+def test_max_cases_keeps_every_p0_and_original_order():
+    cases = _cases()
+    budget = CaseBudget(max_cases=120)
+    kept = list(budget.apply(cases))
+
+    assert len(kept) == 120
+    p0 = {tc["title"] for tc in _cases() if tc["priority"] == "P0"}
+    assert p0 <= {tc["title"] for tc in kept}
+    seqs = [_seq(tc) for tc in kept]
+    assert seqs == sorted(seqs)
+
+
+def test_kept_cases_are_renumbered_sequentially():
+    budget = CaseBudget(max_cases=100)
+    kept = list(budget.apply(_cases()))
+    assert [int(tc["id"].rsplit("-", 1)[1]) for tc in kept] == list(range(1, 101))
+    assert all(tc["id"].startswith(f"TC-{tc['category'][:4].upper()}-") for tc in kept)
+    assert {budget.id_map[f"TC-ORIG-{_seq(tc):04d}"] for tc in kept} == {tc["id"] for tc in kept}
+
+
+def test_per_category_budget_leaves_other_categories_alone():
+    budget = CaseBudget(per_category={"Security": 30})
+    kept = list(budget.apply(_cases()))
+    by_category = {name: sum(tc["category"] == name for tc in kept) for name in CATEGORIES}
+    assert by_category == {"Business": 200, "Security": 30, "UI": 200}
+
+
+def test_total_and_category_budgets_together():
+    kept = list(CaseBudget(max_cases=150, per_category={"UI": 30}).apply(_cases()))
+    assert len(kept) == 150
+    assert sum(tc["category"] == "UI" for tc in kept) == 30
+
+
+def _shuffled(count, seed):
+    """ No P0s (every kept case is sampled), categories in random order. """
+    rng = random.Random(seed)
+    return [{"id": f"TC-ORIG-{i:04d}", "category": rng.choice(CATEGORIES), "priority": rng.choice(["P1", "P2", "P3"]),
+             "title": f"case {i}"} for i in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("count, max_cases, security", [(50, 10, 1), (150, 100, 5), (120, 60, 0)])
+def test_category_evictions_do_not_underfill_the_total(seed, count, max_cases, security):
+    kept = list(CaseBudget(max_cases=max_cases, per_category={"Security": security}, seed=seed).apply(_shuffled(count, 1)))
+    assert len(kept) == max_cases
+    assert sum(tc["category"] == "Security" for tc in kept) == security
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_combined_budgets_keep_the_largest_keys(seed):
+    cases = _cases(60)
+    # Offline greedy over the keys CaseBudget draws (one per sampled case, in input order):
+    # P0s first, then the largest keys while both budgets have room
+    rng = random.Random(seed)
+    keyed = sorted(((rng.random() ** (1.0 / PRIORITY_WEIGHTS[tc["priority"]]), tc["title"], tc["category"])
+                    for tc in cases if tc["priority"] != "P0"), reverse=True)
+    expected = [tc["title"] for tc in cases if tc["priority"] == "P0"]
+    security = sum(tc["category"] == "Security" for tc in cases if tc["priority"] == "P0")
+    for _, title, category in keyed:
+        if len(expected) == 25:
+            break
+        if category == "Security":
+            if security >= 4:
+                continue
+            security += 1
+        expected.append(title)
+
+    kept = list(CaseBudget(max_cases=25, per_category={"Security": 4}, seed=seed).apply(cases))
+    assert sorted(tc["title"] for tc in kept) == sorted(expected)
+
+
+def test_p0_over_budget_is_reported():
+    budget = CaseBudget(per_category={"Security": 5})
+    kept = list(budget.apply(_cases()))
+    # 25 Security P0s are all kept although the budget is 5
+    assert sum(tc["category"] == "Security" for tc in kept) == 25
+    report = budget.report()
+    assert report["over_budget_p0"] == ["Security"]
+    assert report["seen"] == 600 and report["kept"] == len(kept)
+    assert sum(row["dropped"] for row in report["by_category"]) == report["dropped"]
+
+
+def test_higher_priorities_are_sampled_more():
+    # 375 of the 3000 cases are P0s, always kept
+    kept = list(CaseBudget(max_cases=1000).apply(_cases(3000)))
+    per_case = {p: sum(tc["priority"] == p for tc in kept) / PRIORITIES.count(p) for p in ("P1", "P2", "P3")}
+    assert per_case["P1"] > per_case["P2"] > per_case["P3"]
+
+
+def test_same_seed_same_sample():
+    first = [tc["title"] for tc in CaseBudget(max_cases=200, seed=7).apply(_cases())]
+    second = [tc["title"] for tc in CaseBudget(max_cases=200, seed=7).apply(_cases())]
+    assert first == second
+
+
+def test_no_budget_keeps_everything():
+    assert [tc["title"] for tc in CaseBudget().apply(_cases(30))] == [f"case {i}" for i in range(30)]
+
+
+def test_parse_category_budget():
+    assert parse_category_budget("Security=50, UI=20,") == {"Security": 50, "UI": 20}
+    with pytest.raises(ValueError):
+        parse_category_budget("Security")
@@ -0,0 +1,125 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from test_gen.case_store import LOCK_DIR, CaseStore, lock_path
+from test_gen.testcase_io import journal_path, load_test_cases_document, unwrap_test_cases
+
+WORKERS = 4
+ADDS_PER_WORKER = 15
+
+
+def _case_id(n):
+    return f"TC-MAN-{n:03d}"
+
+
+def _seed(path, count=2):
+    cases = [{"id": _case_id(i), "title": f"seed-{i}", "steps": ["1. Open"], "expected_result": "Opens"}
+             for i in range(1, count + 1)]
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            f.writelines(json.dumps(tc) + "\n" for tc in cases)
+        else:
+            json.dump({"test_cases": cases, "test_plan": "plan"}, f)
+
+
+def _add_cases(path, worker, compact_every):
+    store = CaseStore(path, compact_every=compact_every)
+    for i in range(ADDS_PER_WORKER):
+        store.append([{"title": f"w{worker}-{i}", "steps": ["1. Step"], "expected_result": "OK"}], _case_id)
+
+
+def _cases(path):
+    return unwrap_test_cases(load_test_cases_document(path))
+
+
+@pytest.mark.parametrize("name", ["raw.json", "raw.jsonl"])
+def test_concurrent_adds_get_unique_sequential_ids(tmp_path, name):
+    path = str(tmp_path / name)
+    _seed(path)
+    # compact_every below the number of adds, so compactions race with appends
+    with ProcessPoolExecutor(WORKERS) as pool:
+        for future in [pool.submit(_add_cases, path, w, 7) for w in range(WORKERS)]:
+            future.result()
+
+    cases = _cases(path)
+    total = 2 + WORKERS * ADDS_PER_WORKER
+    assert [tc["id"] for tc in cases] == [_case_id(n) for n in range(1, total + 1)]
+    # No lost or duplicated writes
+    titles = [tc["title"] for tc in cases]
+    assert sorted(titles[2:]) == sorted(f"w{w}-{i}" for w in range(WORKERS) for i in range(ADDS_PER_WORKER))
+    assert CaseStore(path).count() == total
+
+
+def test_journal_is_folded_in_every_compact_every_cases(tmp_path):
+    path = str(tmp_path / "raw.json")
+    _seed(path)
+    store = CaseStore(path, compact_every=5)
+    for i in range(4):
+        store.append([{"title": f"add-{i}"}], _case_id)
+
+    # Adds go to the journal; readers already see them, the document is untouched
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["test_cases"]) == 2
+    assert os.path.exists(journal_path(path))
+    assert len(_cases(path)) == 6
+    assert store.count() == 6
+
+    store.append([{"title": "add-4"}], _case_id)
+    assert not os.path.exists(journal_path(path))
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert [tc["id"] for tc in data["test_cases"]] == [_case_id(n) for n in range(1, 8)]
+    # Other document keys survive compaction
+    assert data["test_plan"] == "plan"
+
+
+def test_compact_moves_the_journal(tmp_path):
+    path = str(tmp_path / "raw.json")
+    _seed(path)
+    store = CaseStore(path)
+    store.append([{"title": "a"}, {"title": "b"}], _case_id)
+    assert store.compact() == 2
+    assert store.compact() == 0
+    assert [tc["title"] for tc in _cases(path)] == ["seed-1", "seed-2", "a", "b"]
+
+
+def test_journal_of_a_replaced_document_is_ignored(tmp_path):
+    path = str(tmp_path / "raw.json")
+    _seed(path)
+    store = CaseStore(path)
+    store.append([{"title": "old manual case"}], _case_id)
+    assert len(_cases(path)) == 3
+
+    # The document is regenerated behind the store's back (explode, the agent)
+    _seed(path, count=3)
+    assert [tc["title"] for tc in _cases(path)] == ["seed-1", "seed-2", "seed-3"]
+    assert store.count() == 3
+
+    added = store.append([{"title": "new manual case"}], _case_id)
+    assert added[0]["id"] == _case_id(4)
+    assert [tc["title"] for tc in _cases(path)] == ["seed-1", "seed-2", "seed-3", "new manual case"]
+
+
+def test_replace_drops_the_journal(tmp_path):
+    path = str(tmp_path / "raw.json")
+    _seed(path)
+    store = CaseStore(path)
+    store.append([{"title": "a"}], _case_id)
+    data = load_test_cases_document(path)
+    data["test_cases"] = data["test_cases"][1:]
+    store.replace(data)
+    assert not os.path.exists(journal_path(path))
+    assert [tc["title"] for tc in _cases(path)] == ["seed-2", "a"]
+
+
+def test_lock_files_stay_in_the_lock_directory(tmp_path):
+    path = str(tmp_path / "raw.json")
+    _seed(path)
+    store = CaseStore(path, compact_every=2)
+    store.append([{"title": "a"}, {"title": "b"}], _case_id)
+    assert sorted(os.listdir(tmp_path)) == [LOCK_DIR, "raw.json"]
+    assert lock_path(path) == str(tmp_path / LOCK_DIR / "raw.json.lock")
+    assert os.path.exists(lock_path(path))
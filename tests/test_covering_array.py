@@ -0,0 +1,66 @@
+from itertools import combinations, product
+
+import pytest
+
+from test_gen.covering_array import covering_array
+
+DOMAINS = [["a", "b", "c"], [1, 2], ["x", "y", "z", "w"], [True, False], ["p", "q", "r"]]
+
+
+def _tuples(rows, strength):
+    """ Every (params, values) t-tuple that appears in rows. """
+    return {(cols, tuple(row[c] for c in cols)) for row in rows for cols in combinations(range(len(row)), strength)}
+
+
+def _forbid_a1_and_zfalse(partial):
+    # Partial rows: {parameter index: value}
+    if partial.get(0) == "a" and partial.get(1) == 1:
+        return False
+    return not (partial.get(2) == "z" and partial.get(3) is False)
+
+
+@pytest.mark.parametrize("strength", [2, 3])
+def test_every_t_tuple_is_covered(strength):
+    rows = covering_array(DOMAINS, strength)
+    full = list(product(*DOMAINS))
+    assert _tuples(rows, strength) == _tuples(full, strength)
+    assert len(rows) < len(full)
+    assert all(len(row) == len(DOMAINS) for row in rows)
+
+
+def test_pairwise_is_near_minimal():
+    # Lower bound is the product of the two largest domains (4 * 3)
+    assert len(covering_array(DOMAINS, 2)) <= 16
+
+
+def test_constraints_are_never_violated_and_allowed_tuples_covered():
+    rows = covering_array(DOMAINS, 2, _forbid_a1_and_zfalse)
+    for row in rows:
+        assert _forbid_a1_and_zfalse(dict(enumerate(row)))
+    valid = [row for row in product(*DOMAINS) if _forbid_a1_and_zfalse(dict(enumerate(row)))]
+    assert _tuples(rows, 2) == _tuples(valid, 2)
+
+
+def test_implied_constraints_are_not_required():
+    # 'a' forces 1 and 1 forces 'x', so ('a', 'y') can never be completed
+    def forbid(partial):
+        if partial.get(0) == "a" and partial.get(1) == 2:
+            return False
+        return not (partial.get(1) == 1 and partial.get(2) == "y")
+
+    rows = covering_array([["a", "b"], [1, 2], ["x", "y"]], 2, forbid)
+    assert all(forbid(dict(enumerate(row))) for row in rows)
+    assert ((0, 2), ("a", "y")) not in _tuples(rows, 2)
+    assert ((0, 2), ("a", "x")) in _tuples(rows, 2)
+
+
+def test_deterministic():
+    assert covering_array(DOMAINS, 2) == covering_array(DOMAINS, 2)
+
+
+def test_edge_cases():
+    assert covering_array([], 2) == []
+    # Strength is capped at the number of parameters
+    assert sorted(covering_array([[1, 2], ["a"]], 3)) == [(1, "a"), (2, "a")]
+    with pytest.raises(ValueError):
+        covering_array([[1, 2], []], 2)
@@ -0,0 +1,45 @@
+import json
+import threading
+
+import pytest
+
+from test_gen import data_fuzzer
+from test_gen.case_store import CaseStore
+from test_gen.testcase_io import load_test_cases_document, unwrap_test_cases
+
+
+def _seed(path):
+    cases = [{"id": "TC-FUNC-001", "title": "Verify Email - Valid", "steps": ["1. Enter email"], "test_data": ""},
+             {"id": "TC-FUNC-002", "title": "Verify Age - Negative", "steps": ["1. Enter age"], "test_data": ""}]
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            f.writelines(json.dumps(tc) + "\n" for tc in cases)
+        else:
+            json.dump({"test_cases": cases}, f)
+
+
+@pytest.mark.parametrize("name", ["raw.json", "raw.jsonl"])
+def test_add_during_enrich_is_not_lost(tmp_path, monkeypatch, name):
+    path = str(tmp_path / name)
+    _seed(path)
+    adder = threading.Thread(target=lambda: CaseStore(path).append([{"title": "manual case"}], lambda n: f"TC-MAN-{n:03d}"))
+
+    # A --step add arrives while enrich holds the loaded cases (JSON: document, JSONL: stream)
+    for loader in ("load_test_cases_document", "iter_test_cases"):
+        original = getattr(data_fuzzer, loader)
+
+        def load_then_add(*args, _original=original, **kwargs):
+            result = _original(*args, **kwargs)
+            if adder.ident is None:
+                adder.start()
+                # Gives the add time to land if nothing holds it back
+                adder.join(timeout=0.5)
+            return result
+        monkeypatch.setattr(data_fuzzer, loader, load_then_add)
+
+    assert data_fuzzer.enrich_test_cases(path)
+    adder.join()
+
+    cases = unwrap_test_cases(load_test_cases_document(path))
+    assert [tc["title"] for tc in cases] == ["Verify Email - Valid", "Verify Age - Negative", "manual case"]
+    assert cases[2]["id"] == "TC-MAN-003"
@@ -0,0 +1,70 @@
+import copy
+import re
+
+import pytest
+from openpyxl import load_workbook
+
+from test_gen.excel_writer import ExcelStreamWriter
+from test_gen.exporter import EXCEL_COLUMNS, Exporter
+
+pd = pytest.importorskip("pandas")
+
+CASES = [
+    {"id": "TC-FUNC-001", "module": "Project", "priority": "P0", "steps": ["1. Open", "2. Type 'Dự án'"],
+     "expected_result": "Saved\nListed", "status": "New", "create_date": "2026-01-15", "title": "not exported"},
+    {"id": "TC-VALI-002", "type": "Negative", "steps": "1. Leave empty\n2. Submit", "expected_result": "Error",
+     "pre_condition": None, "notes": "", "create_date": "2026-01-16"},
+    {"id": "TC-PERF-003", "priority": "P3", "steps": [], "description": "1000 rows 🚀", "actual_result": 1.5,
+     "create_date": "2026-01-17"},
+]
+
+
+def _pandas_export(test_cases, path):
+    """ The pandas export that ExcelStreamWriter replaced: lists joined by newlines, missing columns blank. """
+    for tc in test_cases:
+        if isinstance(tc.get("steps"), list):
+            tc["steps"] = "\n".join(tc["steps"])
+    df = pd.DataFrame(test_cases)
+    for col in EXCEL_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    df[EXCEL_COLUMNS].to_excel(path, index=False)
+
+
+def _sheet(path):
+    sheet = load_workbook(path).active
+    values = [["" if cell.value is None else cell.value for cell in row] for row in sheet.iter_rows()]
+    return sheet, values
+
+
+def test_excel_export_matches_pandas(tmp_path):
+    cases = copy.deepcopy(CASES)
+    path = Exporter(str(tmp_path)).export_to_excel(iter(cases))
+    assert path == str(tmp_path / "test_cases.xlsx")
+    # The cases are not modified (the pandas export joined list steps in place)
+    assert cases == CASES
+
+    _pandas_export(copy.deepcopy(CASES), str(tmp_path / "pandas.xlsx"))
+    sheet, values = _sheet(path)
+    assert values == _sheet(str(tmp_path / "pandas.xlsx"))[1]
+    assert values[1][EXCEL_COLUMNS.index("steps")] == "1. Open\n2. Type 'Dự án'"
+    # Header styled as pandas < 3 styled it (pandas 3 writes a plain header)
+    for cell in sheet[1]:
+        assert cell.font.b and cell.border.left.style == "thin" and cell.alignment.horizontal == "center"
+
+
+def test_missing_create_date_defaults_to_today(tmp_path):
+    path = Exporter(str(tmp_path)).export_to_excel([{"id": "TC-FUNC-001"}, {"id": "TC-FUNC-002", "create_date": "2026-01-15"}])
+    _, values = _sheet(path)
+    dates = [row[EXCEL_COLUMNS.index("create_date")] for row in values[1:]]
+    assert re.match(r"\d{4}-\d{2}-\d{2}$", dates[0]) and dates[1] == "2026-01-15"
+
+
+def test_cell_values_are_made_storable(tmp_path):
+    path = str(tmp_path / "values.xlsx")
+    writer = ExcelStreamWriter(path)
+    rows = iter([[("a", "b"), {"k": 1}, "bell\x07", None, 3]])
+    assert writer.add_sheet("Values", ["tuple", "dict", "control", "none", "int"], rows) == 1
+    writer.save()
+    _, values = _sheet(path)
+    assert values == [["tuple", "dict", "control", "none", "int"], ["a\nb", "{'k': 1}", "bell", "", 3]]
@@ -0,0 +1,190 @@
+import json
+import re
+
+import pytest
+
+from test_gen.exporter import Exporter
+from test_gen.impact import DELTA_KIND, case_delta, id_allocator
+from test_gen.markdown_generator import write_markdown_report
+from test_gen.traceability import format_source, load_suite_ids, match_keys, save_suite_ids
+from test_gen.updater import Updater
+
+_CELL_SPLIT = re.compile(r'(?<!\\)\|')
+
+
+def _case(element, expander, variant, title, category="Functional", expected="Accepted", priority="P1"):
+    return {"category": category, "title": title, "steps": f"1. {title}", "test_data": "-",
+            "expected": expected, "priority": priority, "source": format_source(element, expander, variant)}
+
+
+def _explode(*cases):
+    """ IDs as the engine numbers them: positional, one global counter. """
+    return [dict(tc, id=f"TC-{tc['category'][:4].upper()}-{n:03d}") for n, tc in enumerate(cases, 1)]
+
+
+NAME_VALID = _case("field:Name", "_expand_text", "valid", "Name - Valid")
+NAME_EMPTY = _case("field:Name", "_expand_text", "empty", "Name - Empty", expected="Required error")
+AGE_MIN = _case("field:Age", "_expand_number", "min", "Age - Min", expected="Accepted at 0")
+RACE = _case("rule:BR-1", "_expand_concurrency", "race", "Two users approve at once", category="Business Logic")
+NAME_XSS = _case("field:Name", "_expand_security", "xss", "Name - XSS", category="Security", expected="Escaped")
+
+# v1 -> v2: Name - Empty removed, Age - Min changed, Email added (functional and security),
+# the race case now credited to BR-2 (same content)
+V1 = _explode(NAME_VALID, NAME_EMPTY, AGE_MIN, RACE, NAME_XSS)
+EMAIL_VALID = _case("field:Email", "_expand_text", "valid", "Email - Valid")
+EMAIL_XSS = _case("field:Email", "_expand_security", "xss", "Email - XSS", category="Security", expected="Escaped")
+V2 = _explode(NAME_VALID, dict(AGE_MIN, expected="Accepted at 1"), EMAIL_VALID,
+              dict(RACE, source=format_source("rule:BR-2", "_expand_concurrency", "race")), NAME_XSS, EMAIL_XSS)
+# v2 -> v3: Name - Valid removed, Email - Valid (added in v2) changed, Phone added
+PHONE_VALID = _case("field:Phone", "_expand_text", "valid", "Phone - Valid")
+V3 = _explode(dict(AGE_MIN, expected="Accepted at 1"), dict(EMAIL_VALID, expected="Lower-cased"),
+              dict(RACE, source=format_source("rule:BR-2", "_expand_concurrency", "race")), NAME_XSS, EMAIL_XSS, PHONE_VALID)
+
+
+def _delta(tmp_path, old, new, name):
+    path = tmp_path / name
+    path.write_text(json.dumps({"kind": DELTA_KIND, **case_delta(old, new)}), encoding="utf-8")
+    return str(path)
+
+
+def _format_suite(tmp_path, cases):
+    """ What --step format writes: the 11/10-column report plus its ID map. """
+    path = str(tmp_path / "test_cases.md")
+    with open(path, "w", encoding="utf-8") as f:
+        write_markdown_report(Exporter(str(tmp_path)).prepare_data_for_template({"test_cases": cases}), f)
+    save_suite_ids(path, {key: tc["id"] for key, tc in match_keys(cases).items()})
+    return path
+
+
+def _readable_suite(tmp_path, cases):
+    """ Readable 8-column table, no ID map. """
+    return Exporter(str(tmp_path)).export_to_markdown_readable_table([dict(tc, expected_result=tc["expected"]) for tc in cases])
+
+
+def _rows(path):
+    """ {ID: {column: cell}} per table, tables keyed by their second column ('Module', 'Category', 'priority'). """
+    tables, header = {}, None
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    for i, line in enumerate(lines):
+        if re.match(r'^\|(\s*:?-+:?\s*\|)+\s*$', line):
+            header = [c.strip() for c in _CELL_SPLIT.split(lines[i - 1])][1:-1]
+        elif line.startswith("| TC-"):
+            cells = [c.strip() for c in _CELL_SPLIT.split(line)][1:-1]
+            assert len(cells) == len(header), line
+            tables.setdefault(header[1], {})[cells[0]] = dict(zip(header, cells))
+    return tables
+
+
+def _all_rows(path):
+    rows = {}
+    for table in _rows(path).values():
+        assert not set(rows) & set(table), "duplicate row IDs"
+        rows.update(table)
+    return rows
+
+
+def _set_cell(path, row_id, column, value):
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    header = None
+    for i, line in enumerate(lines):
+        if re.match(r'^\|(\s*:?-+:?\s*\|)+\s*$', line):
+            header = [c.strip() for c in _CELL_SPLIT.split(lines[i - 1])][1:-1]
+        elif line.startswith(f"| {row_id} |"):
+            cells = [c.strip() for c in _CELL_SPLIT.split(line)][1:-1]
+            cells[header.index(column)] = value
+            lines[i] = "| " + " | ".join(cells) + " |"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def _by_title(rows, title_column="Title"):
+    return {row[title_column]: row for row in rows.values()}
+
+
+def test_case_delta_matches_by_provenance_then_content():
+    delta = case_delta(V1, V2)
+    assert delta["summary"] == {"added": 2, "removed": 1, "modified": 1, "relinked": 1, "unchanged": 3}
+    assert [item["case"]["title"] for item in delta["added"]] == ["Email - Valid", "Email - XSS"]
+    assert [item["title"] for item in delta["removed"]] == ["Name - Empty"]
+    # Old IDs address old rows; the changed field is listed
+    assert delta["modified"][0]["id"] == "TC-FUNC-003"
+    assert delta["modified"][0]["changes"] == {"expected": ["Accepted at 0", "Accepted at 1"]}
+    (relinked,) = delta["relinked"]
+    assert relinked["id"] == "TC-BUSI-004" and "BR-1" in relinked["from"] and "BR-2" in relinked["to"]
+    assert case_delta(V2, V2)["summary"]["unchanged"] == len(V2)
+
+
+def test_id_allocator_continues_each_prefix():
+    allocate = id_allocator(["TC-FUNC-009", "TC-FUNC-010", "TC-SECU-0004", None, "custom"])
+    assert allocate({"category": "Functional"}) == "TC-FUNC-011"
+    assert allocate({"category": "Functional"}) == "TC-FUNC-012"
+    assert allocate({"category": "Security"}) == "TC-SECU-0005"
+    assert allocate({"category": "Visual"}) == "TC-VISU-001"
+
+
+@pytest.mark.parametrize("layout", ["report", "readable"])
+def test_two_successive_deltas_keep_row_ids(tmp_path, layout):
+    suite = _format_suite(tmp_path, V1) if layout == "report" else _readable_suite(tmp_path, V1)
+    title, expected, status = ("Title", "Expected Result", "Status") if layout == "report" else ("title", "expected_result", "status")
+    # A tester has run the race case
+    _set_cell(suite, "TC-BUSI-004", status, "Passed")
+
+    Updater(_delta(tmp_path, V1, V2, "v1_v2.json"), suite).sync(None)
+    after_v2 = _all_rows(suite)
+    v2 = _by_title(after_v2, title)
+    assert "Name - Empty" not in v2 and "TC-FUNC-002" not in after_v2
+    # Modified in place: same ID, new content, status reset
+    assert v2["Age - Min"]["id" if layout == "readable" else "ID"] == "TC-FUNC-003"
+    assert v2["Age - Min"][expected] == "Accepted at 1"
+    assert v2["Age - Min"][status].startswith("[ ] Pass")
+    # Relinked: untouched, tester status kept
+    assert v2["Two users approve at once"][status] == "Passed"
+    # Added cases are numbered after the suite's own IDs, never reusing one
+    new_ids = {row_id for row_id, row in after_v2.items() if row[title] in ("Email - Valid", "Email - XSS")}
+    assert len(new_ids) == 2 and not new_ids & {tc["id"] for tc in V1}
+    assert set(load_suite_ids(suite).values()) == set(after_v2)
+
+    # v3's positional IDs no longer match the suite: rows are found through the ID map
+    Updater(_delta(tmp_path, V2, V3, "v2_v3.json"), suite).sync(None)
+    after_v3 = _all_rows(suite)
+    v3 = _by_title(after_v3, title)
+    assert sorted(v3) == sorted(tc["title"] for tc in V3)
+    assert v3["Email - Valid"][expected] == "Lower-cased"
+    # Every row that survived keeps the ID it had after the first update
+    for row_id, row in after_v3.items():
+        if row[title] != "Phone - Valid":
+            assert after_v2[row_id][title] == row[title]
+    assert set(load_suite_ids(suite).values()) == set(after_v3)
+
+    # Re-applying a delta changes nothing
+    with open(suite, encoding="utf-8") as f:
+        before = f.read()
+    Updater(str(tmp_path / "v2_v3.json"), suite).sync(None)
+    with open(suite, encoding="utf-8") as f:
+        assert f.read() == before
+
+
+def test_added_cases_go_to_the_table_of_their_kind(tmp_path):
+    suite = _format_suite(tmp_path, V1)
+    Updater(_delta(tmp_path, V1, V2, "delta.json"), suite).sync(None)
+    tables = _rows(suite)
+    functional, non_functional = tables["Module"], tables["Category"]
+    assert "Email - Valid" in _by_title(functional)
+    assert "Email - XSS" in _by_title(non_functional)
+    # New functional rows take the table's module; created date is filled
+    row = _by_title(functional)["Email - Valid"]
+    assert row["Module"] == _by_title(functional)["Name - Valid"]["Module"]
+    assert re.match(r"\d{4}-\d{2}-\d{2}$", row["Create Date"])
+
+
+def test_unknown_layout_is_refused(tmp_path):
+    suite = _readable_suite(tmp_path, V1)
+    with open(suite, encoding="utf-8") as f:
+        content = f.read().replace("| id | priority |", "| id | severity |", 1)
+    with open(suite, "w", encoding="utf-8") as f:
+        f.write(content)
+    Updater(_delta(tmp_path, V1, V2, "delta.json"), suite).sync(None)
+    with open(suite, encoding="utf-8") as f:
+        assert f.read() == content
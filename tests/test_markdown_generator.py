@@ -0,0 +1,134 @@
+import copy
+import datetime
+import io
+import os
+import re
+import types
+
+import pytest
+
+from test_gen import exporter, markdown_generator
+from test_gen.exporter import READABLE_COLUMNS, READABLE_ESCAPE, READABLE_STATUS, Exporter
+from test_gen.markdown_generator import generate_markdown_report, write_markdown_report, write_pipe_table
+
+# Report of REPORT_INPUT as the list-and-join generator wrote it (before streaming), dated 2026-01-15
+GOLDEN_REPORT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "markdown_report.md")
+
+# How updater.py splits a row into cells
+_CELL_SPLIT = re.compile(r'(?<!\\)\|')
+
+READABLE_CASES = [
+    {"id": "TC-FUNC-001", "priority": "P0", "title": "Tên dự án - Hợp lệ", "steps": ["1. Open", "2. Save"],
+     "expected_result": "Saved\nListed", "notes": "", "create_date": "2026-01-15"},
+    {"id": "TC-VALI-002", "priority": "P1", "title": "Email - Empty", "steps": "1. Leave empty\n2. Submit",
+     "expected_result": ["Error shown", "Form kept"], "status": "Passed", "notes": "retest", "create_date": "2026-01-16"},
+]
+
+
+def _cells(line):
+    return [cell.strip() for cell in _CELL_SPLIT.split(line)][1:-1]
+
+
+def _table(text):
+    """ Header and rows of the first pipe table in text, cells stripped (padding ignored). """
+    lines = [line for line in text.split("\n") if line.startswith("|")]
+    return _cells(lines[0]), [_cells(line) for line in lines[2:]]
+
+
+def test_pipe_table_escapes_pipes_and_newlines():
+    f = io.StringIO()
+    rows = iter([["TC-1", "a | b", "line 1\nline 2"], ["TC-2", 3, ""]])
+    assert write_pipe_table(f, ["id", "title", "steps"], rows) == 2
+    assert f.getvalue() == ("| id | title | steps |\n"
+                            "| :--- | :--- | :--- |\n"
+                            "| TC-1 | a &#124; b | line 1<br>line 2 |\n"
+                            "| TC-2 | 3 |  |\n")
+
+
+def test_pipe_table_with_readable_escape():
+    f = io.StringIO()
+    assert write_pipe_table(f, ["id", "steps"], [["TC-1", "1. Type a|b\r\n2. Save"]], READABLE_ESCAPE) == 1
+    row = f.getvalue().split("\n")[2]
+    assert row == "| TC-1 | 1. Type a\\|b • 2. Save |"
+    # The escaped pipe stays inside its cell for the updater
+    assert _cells(row) == ["TC-1", "1. Type a\\|b • 2. Save"]
+
+
+def test_readable_export_matches_the_pandas_table(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("tabulate")
+    path = Exporter(str(tmp_path)).export_to_markdown_readable_table(iter(READABLE_CASES))
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert text.startswith("# Test Cases\n\n")
+
+    # The DataFrame.to_markdown export it replaced: one line per case, bullets for line breaks
+    rows = [dict(tc, status=READABLE_STATUS,
+                 steps=" • ".join(tc["steps"]) if isinstance(tc["steps"], list) else tc["steps"].replace("\n", " • "),
+                 expected_result=(" • ".join(tc["expected_result"]) if isinstance(tc["expected_result"], list)
+                                  else tc["expected_result"].replace("\n", " • ")))
+            for tc in READABLE_CASES]
+    reference = pd.DataFrame(rows)[READABLE_COLUMNS].to_markdown(index=False)
+    assert _table(text) == _table(reference)
+    assert _table(text)[1][0][3] == "1. Open • 2. Save"
+
+
+def test_readable_export_keeps_pipes_inside_cells(tmp_path):
+    cases = [dict(READABLE_CASES[0], title="Search | by name", expected_result="a|b\r\nc")]
+    path = Exporter(str(tmp_path)).export_to_markdown_readable_table(cases)
+    with open(path, encoding="utf-8") as f:
+        header, rows = _table(f.read())
+    assert header == READABLE_COLUMNS
+    row = dict(zip(header, rows[0]))
+    assert row["title"] == "Search \\| by name" and row["expected_result"] == "a\\|b • c"
+    assert len(rows[0]) == len(READABLE_COLUMNS)
+
+
+REPORT_CASES = [
+    {"id": "TC-FUNC-001", "category": "Functional", "priority": "P0", "title": "Search | by name",
+     "steps": ["1. Open list", "2. Type 'a|b'"], "expected_result": "Rows match\nname", "test_data": "name=a|b"},
+    {"id": "TC-VALI-002", "category": "Validation", "priority": "P1", "title": "Email - Empty (Required)",
+     "steps": "1. Leave empty\n2. Submit", "expected": "Error 'Required'", "description": "User login form",
+     "status": "Passed"},
+    {"id": "TC-BUSI-003", "category": "Business Logic", "priority": "p2", "title": "Cùng cấp: 2 user duyệt đồng thời",
+     "steps": ["1. User A approves."], "expected_result": "Idempotent", "status": "New",
+     "test_data": {"user": "A", "role": "Approver"}},
+    {"id": "TC-FUNC-004", "title": "No priority, no category", "steps": []},
+    {"id": "TC-SECU-005", "category": "Security", "priority": "P1", "title": "Name - XSS Injection",
+     "steps": "1. Enter <script>", "expected_result": "Escaped | not run"},
+    {"id": "TC-PERF-006", "category": "Performance", "priority": "P3", "title": "Large Dataset (1000 rows)",
+     "steps": ["1. Load 1000 rows"], "expected": "< 2s", "tools": "JMeter"},
+    {"id": "TC-VISU-007", "category": "Visual", "priority": "P2", "title": "Header layout 🎨",
+     "steps": "1. Open page", "expected_result": "Matches design", "status": "Failed"},
+    {"id": "TC-COMP-008", "category": "Compatibility", "priority": "P2", "title": "Layout on Safari",
+     "steps": ["1. Open in Safari"], "expected_result": "Same as Chrome"},
+]
+REPORT_INPUT = {"metadata": {"feature_name": "Project | List", "prd_version": "2.1", "tester": "QA"},
+                "test_cases": [dict(tc, created_date="2026-01-15") for tc in REPORT_CASES]}
+
+
+class _FixedDatetime(datetime.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 1, 15, 9, 30)
+
+
+@pytest.fixture
+def report_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "datetime", _FixedDatetime)
+    monkeypatch.setattr(markdown_generator, "datetime", types.SimpleNamespace(datetime=_FixedDatetime))
+    return Exporter(str(tmp_path)).prepare_data_for_template(copy.deepcopy(REPORT_INPUT))
+
+
+def test_report_matches_the_joined_report(report_data):
+    with open(GOLDEN_REPORT, encoding="utf-8") as f:
+        assert generate_markdown_report(report_data) == f.read()
+
+
+@pytest.mark.parametrize("empty", [False, True], ids=["cases", "empty"])
+def test_generated_report_is_the_streamed_report_without_its_last_newline(report_data, empty):
+    data = dict(report_data, functional_testcases=[], non_functional_testcases=[]) if empty else report_data
+    f = io.StringIO()
+    assert write_markdown_report(data, f) == (0 if empty else len(REPORT_CASES))
+    assert f.getvalue().endswith("\n")
+    assert generate_markdown_report(data) == f.getvalue()[:-1]
@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from test_gen.schema_loader import load_schema, parse_schema
+
+SCHEMA = {
+    "feature_name": "Login",
+    "sections": [{"name": "Form", "fields": [{"name": "Email", "type": "email"}, {"name": "Password", "type": "password"}]}],
+    "business_rules": [{"id": "BR-1", "description": "Lockout", "condition": "5 failed logins", "expected_result": "Locked"}],
+}
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(SCHEMA), encoding="utf-8")
+    return str(path)
+
+
+def test_cache_is_plain_json_and_round_trips(tmp_path, schema_path):
+    cache_dir = str(tmp_path / "cache")
+    first = load_schema(schema_path, cache_dir=cache_dir)
+    (entry,) = os.listdir(cache_dir)
+    assert entry.endswith(".json")
+    with open(os.path.join(cache_dir, entry), encoding="utf-8") as f:
+        assert json.load(f)["feature_name"] == "Login"
+    assert load_schema(schema_path, cache_dir=cache_dir) == first == load_schema(schema_path, cache_dir=None)
+
+
+def test_invalid_cache_entry_is_ignored_and_rewritten(tmp_path, schema_path):
+    cache_dir = str(tmp_path / "cache")
+    expected = load_schema(schema_path, cache_dir=cache_dir)
+    (entry,) = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, entry), "w", encoding="utf-8") as f:
+        f.write('{"sections": "not a list"')
+    assert load_schema(schema_path, cache_dir=cache_dir) == expected
+    assert load_schema(schema_path, cache_dir=cache_dir) == expected
+
+
+def test_changed_file_misses_the_cache(tmp_path, schema_path):
+    cache_dir = str(tmp_path / "cache")
+    load_schema(schema_path, cache_dir=cache_dir)
+    with open(schema_path, "w", encoding="utf-8") as f:
+        json.dump(dict(SCHEMA, feature_name="Signup"), f)
+    assert load_schema(schema_path, cache_dir=cache_dir).feature_name == "Signup"
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_parse_schema_unwraps_and_reports_json_errors():
+    assert parse_schema(json.dumps({"schema": SCHEMA})).feature_name == "Login"
+    with pytest.raises(ValidationError):
+        parse_schema(b"{not json")
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from test_gen.matrix_engine import MatrixEngine
+from test_gen.schema_loader import load_schema
+from test_gen.schema_models import SmartSchema
+from test_gen.suite_minimizer import CoverageModel, SuiteMinimizer
+
+# Small schema for name matching and manual cases
+SCHEMA = SmartSchema(**{
+    "feature_name": "Project",
+    "sections": [{"name": "Project Form", "fields": [
+        {"name": "Project Name", "type": "text", "required": True, "min_length": 3, "max_length": 50},
+        {"name": "Budget", "type": "number", "required": False, "min_value": 0, "max_value": 1000000},
+        {"name": "Status", "type": "select", "required": True, "options": ["Open", "Closed"]},
+        {"name": "Region Filter", "type": "select", "required": False, "extra_props": {"multiple": True, "options": ["North", "South"]}},
+        {"name": "Attachment", "type": "file", "required": False, "allowed_extensions": ["pdf"], "max_size_mb": 5},
+    ]}],
+    "business_rules": [
+        {"id": "BR-001", "description": "Closed projects are read-only", "condition": "User opens a Closed project",
+         "expected_result": "Fields are disabled", "priority": "P0"},
+        {"id": "BR-002", "description": "Search by name", "condition": "User searches Project Name",
+         "expected_result": "Matching projects are listed", "priority": "P1"},
+    ],
+})
+
+
+# Sample schema shipped with the repo (195 engine cases)
+SAMPLE_SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "schema_input.json")
+
+
+@pytest.fixture(scope="module")
+def sample():
+    schema = load_schema(SAMPLE_SCHEMA, cache_dir=None)
+    return schema, MatrixEngine(schema).generate_all()
+
+
+def _items(model, cases):
+    return {item for tc in cases for item in model.items(tc)}
+
+
+@pytest.mark.parametrize("with_schema", [True, False], ids=["schema", "titles"])
+def test_minimized_suite_keeps_coverage(sample, with_schema):
+    schema, cases = sample
+    model = CoverageModel(schema if with_schema else None)
+    minimizer = SuiteMinimizer(model)
+    kept = minimizer.minimize(cases)
+
+    assert 0 < len(kept) < len(cases)
+    assert _items(model, kept) == _items(model, cases)
+    report = minimizer.report()
+    assert report["coverage_equivalent"] and report["uncovered"] == []
+    assert report["cases_before"] - report["cases_after"] == len(report["dropped"])
+    # Every dropped case names kept cases that cover it
+    kept_ids = {tc["id"] for tc in kept}
+    assert all(set(entry["covered_by"]) <= kept_ids for entry in report["dropped"])
+
+
+def test_p0_cases_are_kept_in_order_with_ids(sample):
+    schema, cases = sample
+    kept = SuiteMinimizer(CoverageModel(schema)).minimize(cases)
+    ids = [tc["id"] for tc in cases]
+    assert {tc["id"] for tc in cases if tc["priority"] == "P0"} <= {tc["id"] for tc in kept}
+    positions = [ids.index(tc["id"]) for tc in kept]
+    assert positions == sorted(positions)
+
+
+def test_keep_priorities(sample):
+    schema, cases = sample
+    kept = SuiteMinimizer(CoverageModel(schema), keep_priorities=("P0", "P1")).minimize(cases)
+    assert {tc["id"] for tc in cases if tc["priority"] in ("P0", "P1")} <= {tc["id"] for tc in kept}
+
+
+def test_fields_and_rules_are_matched_by_name():
+    model = CoverageModel(SCHEMA)
+    items = model.items({"title": "Verify Project Name - Max Length (+1)", "category": "Validation",
+                         "steps": "1. Enter 51 chars", "expected": "Error"})
+    assert ("field", "Project Name", "Validation") in items
+    assert ("boundary", "Project Name", "max_length+1") in items
+    items = model.items({"title": "Verify Budget - Negative Value", "category": "Validation", "steps": ["1. Enter -1"]})
+    assert ("boundary", "Budget", "negative") in items
+    items = model.items({"title": "Closed project", "category": "Business", "steps": "Condition: User opens a Closed project"})
+    assert [item[:2] for item in items if item[0] == "rule"] == [("rule", "BR-001")]
+
+
+def test_manual_cases_are_handled():
+    # --step add / AI cases: no category, steps as a list
+    manual = [
+        {"id": "TC-MAN-001", "title": "Export the project list to PDF", "priority": "P2",
+         "steps": ["1. Open the list", "2. Click Export"], "expected_result": "A PDF is downloaded"},
+        {"id": "TC-MAN-002", "title": "Verify Budget - Negative Value", "priority": "P3", "steps": ["1. Enter -1"]},
+    ]
+    cases = MatrixEngine(SCHEMA).generate_all()
+    kept = SuiteMinimizer(CoverageModel(SCHEMA)).minimize(cases + manual)
+    # A case without any modelled item covers only itself
+    assert "TC-MAN-001" in {tc["id"] for tc in kept}
+    assert CoverageModel(SCHEMA).items(manual[0]) == [("case", "", manual[0]["title"])]
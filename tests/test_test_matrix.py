@@ -0,0 +1,78 @@
+import io
+import json
+from itertools import combinations, islice, product
+
+import pytest
+
+from test_gen.test_matrix import (iter_full_factorial, iter_nwise, iter_scenarios, load_matrix_def,
+                                  parse_constraint, write_jsonl, write_matrix_json)
+
+FACTORS = {"Role": ["Admin", "Editor", "Guest"], "Action": ["View", "Edit", "Delete"], "Status": [1, 0], "Device": ["Web", "Mobile"]}
+CONSTRAINTS = [{"Role": "Guest", "Action": ["Edit", "Delete"]}, {"Status": 0, "Action": "Delete"}]
+
+
+def _allowed(scenario):
+    return not any(all(str(scenario[name]) in {str(v) for v in (vals if isinstance(vals, list) else [vals])}
+                       for name, vals in c.items()) for c in CONSTRAINTS)
+
+
+def _pairs(scenarios):
+    return {(a, scenario[a], b, scenario[b]) for scenario in scenarios for a, b in combinations(FACTORS, 2)}
+
+
+def test_full_factorial_prunes_forbidden_combinations_in_order():
+    expected = [dict(zip(FACTORS, combo)) for combo in product(*FACTORS.values())]
+    assert list(iter_full_factorial(FACTORS)) == expected
+    assert list(iter_full_factorial(FACTORS, CONSTRAINTS)) == [s for s in expected if _allowed(s)]
+
+
+def test_full_factorial_is_lazy():
+    # 10^20 scenarios: only the ones asked for are built
+    huge = {f"F{i}": list(range(10)) for i in range(20)}
+    first = list(islice(iter_full_factorial(huge, [{"F0": 0, "F1": 0}]), 3))
+    assert [s["F1"] for s in first] == [1, 1, 1]
+    assert [s["F19"] for s in first] == [0, 1, 2]
+
+
+def test_pairwise_covers_every_allowed_pair():
+    scenarios = list(iter_nwise(FACTORS, 2, CONSTRAINTS))
+    assert all(_allowed(s) for s in scenarios)
+    valid = [s for s in iter_full_factorial(FACTORS) if _allowed(s)]
+    assert _pairs(scenarios) == _pairs(valid)
+    assert len(scenarios) < len(valid)
+
+
+def test_cli_constraints_match_json_values():
+    # "0" from the command line forbids the JSON value 0
+    constraint = parse_constraint("Status=0 & Action=Delete|Edit")
+    assert constraint == {"Status": ["0"], "Action": ["Delete", "Edit"]}
+    for scenario in iter_scenarios(FACTORS, "pairwise", [constraint]):
+        assert not (scenario["Status"] == 0 and scenario["Action"] in ("Delete", "Edit"))
+
+
+def test_invalid_constraints():
+    with pytest.raises(ValueError):
+        parse_constraint("Role")
+    with pytest.raises(ValueError):
+        list(iter_full_factorial(FACTORS, [{"Colour": "Red"}]))
+
+
+def test_writers_and_matrix_definition(tmp_path):
+    scenarios = list(iter_scenarios(FACTORS, "pairwise"))
+    out = io.StringIO()
+    assert write_matrix_json(iter(scenarios), out, "Pairwise") == len(scenarios)
+    assert json.loads(out.getvalue()) == {"strategy": "Pairwise", "scenarios": scenarios, "total_scenarios": len(scenarios)}
+
+    out = io.StringIO()
+    assert write_jsonl(iter(scenarios), out) == len(scenarios)
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == scenarios
+
+    out = io.StringIO()
+    write_matrix_json(iter([]), out, "Full")
+    assert json.loads(out.getvalue())["total_scenarios"] == 0
+
+    legacy, wrapped = tmp_path / "legacy.json", tmp_path / "wrapped.json"
+    legacy.write_text(json.dumps(FACTORS))
+    wrapped.write_text(json.dumps({"factors": FACTORS, "constraints": CONSTRAINTS}))
+    assert load_matrix_def(str(legacy)) == (FACTORS, [])
+    assert load_matrix_def(str(wrapped)) == (FACTORS, CONSTRAINTS)
@@ -0,0 +1,63 @@
+import io
+import json
+
+import pytest
+
+from test_gen.testcase_io import (append_test_cases_jsonl, count_test_cases, iter_test_cases, iter_test_cases_jsonl,
+                                  load_test_cases_document, write_test_cases, write_test_cases_json)
+
+CASES = [
+    {"id": "TC-FUNC-001", "title": "Tên dự án - Hợp lệ", "steps": ["1. Nhập 'Dự án A'", "2. Lưu"],
+     "expected_result": "Saved | listed", "test_data": {"name": "Dự án A", "tags": ["x", "y"]}, "priority": "P0"},
+    {"id": "TC-SECU-002", "title": "Name - XSS 🛡️", "steps": "1. Enter <script>\n2. Save", "expected": None, "score": 1.5},
+    {"id": "TC-FUNC-003", "title": "Empty nested", "steps": [], "test_data": {}, "notes": ""},
+]
+
+
+@pytest.mark.parametrize("cases", [CASES, CASES[:1], []], ids=["many", "one", "empty"])
+def test_json_writer_matches_json_dump(cases):
+    streamed = io.StringIO()
+    assert write_test_cases_json(iter(cases), streamed) == len(cases)
+    dumped = io.StringIO()
+    json.dump({"test_cases": cases}, dumped, indent=2, ensure_ascii=False)
+    assert streamed.getvalue() == dumped.getvalue()
+
+
+@pytest.mark.parametrize("first, second", [("raw.json", "raw.jsonl"), ("raw.jsonl", "raw.json")])
+def test_json_jsonl_round_trip(tmp_path, first, second):
+    first_path, second_path = str(tmp_path / first), str(tmp_path / second)
+    with open(first_path, "w", encoding="utf-8") as f:
+        assert write_test_cases(CASES, f, first_path) == len(CASES)
+    # Converted by streaming one file into the other
+    with open(second_path, "w", encoding="utf-8") as f:
+        assert write_test_cases(iter_test_cases(first_path), f, second_path) == len(CASES)
+
+    for name in (first, second):
+        path = str(tmp_path / name)
+        assert list(iter_test_cases(path)) == CASES
+        assert load_test_cases_document(path) == {"test_cases": CASES}
+        assert count_test_cases(path) == len(CASES)
+    # Non-ASCII text is written as is, not escaped
+    with open(tmp_path / "raw.jsonl", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == len(CASES) and "Tên dự án" in lines[0] and "🛡️" in lines[1]
+
+
+def test_jsonl_append_and_blank_lines(tmp_path):
+    path = str(tmp_path / "raw.jsonl")
+    assert count_test_cases(path) == 0
+    assert append_test_cases_jsonl(path, CASES[:2]) == 2
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n   \n")
+    assert append_test_cases_jsonl(path, CASES[2:]) == 1
+    assert list(iter_test_cases(path)) == CASES
+    assert count_test_cases(path) == len(CASES)
+
+
+def test_malformed_jsonl_line_reports_its_line_number():
+    stream = io.StringIO(json.dumps(CASES[0]) + "\n\n" + '{"id": "TC-FUNC-002",\n')
+    reader = iter_test_cases_jsonl(stream)
+    assert next(reader) == CASES[0]
+    with pytest.raises(json.JSONDecodeError) as excinfo:
+        next(reader)
+    assert excinfo.value.lineno == 3